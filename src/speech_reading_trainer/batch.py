@@ -0,0 +1,245 @@
+#!/usr/bin/python3
+"""
+Avaliação em lote, sem interface gráfica.
+
+Uso:
+    speech-reading-trainer batch TEXTO.txt PASTA_WAV [opções]
+
+Cada WAV da pasta é a leitura de uma frase do texto; o número no nome
+do arquivo (por exemplo 0007.wav ou aluno_7.wav) é o número da frase,
+contando a partir de 1. Os resultados saem na saída padrão, uma frase
+por linha, em JSON Lines ou CSV, e a vazão vai para a saída de erro.
+"""
+import os
+import re
+import sys
+import csv
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import speech_reading_trainer.about as about
+from speech_reading_trainer.modules.sentences import carregar_frases
+from speech_reading_trainer.modules.audio_buffer import Gravacao
+from speech_reading_trainer.modules.scoring import alinhar
+from speech_reading_trainer.modules.pronunciation import (
+    LexicoPronuncia, abrir_lexico, credito_fonetico, SIMILARIDADE_MINIMA
+)
+from speech_reading_trainer.modules.asr_backends import ErroASR, BACKENDS_ASR, criar_backend_asr
+
+CAMPOS = ["sentence", "text", "recording", "transcription", "matches", "total",
+          "substitutions", "insertions", "deletions", "accuracy", "pronunciation", "near_misses", "missing", "error"]
+
+_NUMERO = re.compile(r"(\d+)(?!.*\d)")
+
+# Backend ASR e léxico de cada processo do pool, abertos uma única vez por processo
+_BACKEND = None
+_LEXICO = None
+_MINIMA = SIMILARIDADE_MINIMA
+
+
+def listar_gravacoes(pasta_wav):
+    """
+    Retorna {número da frase: caminho do WAV} a partir do último número
+    presente no nome de cada arquivo .wav da pasta.
+    """
+    gravacoes = {}
+    for nome in sorted(os.listdir(pasta_wav)):
+        base, ext = os.path.splitext(nome)
+        if ext.lower() != ".wav":
+            continue
+        m = _NUMERO.search(base)
+        if m:
+            gravacoes.setdefault(int(m.group(1)), os.path.join(pasta_wav, nome))
+    return gravacoes
+
+
+def _iniciar_processo(nome_backend, opcoes, caminho_lexico, minima=SIMILARIDADE_MINIMA):
+    global _BACKEND, _LEXICO, _MINIMA
+    _BACKEND = None
+    if nome_backend != "fake":
+        _BACKEND = criar_backend_asr(nome_backend, **opcoes)
+    # O índice já foi compilado pelo processo principal: só mapeia
+    _LEXICO = LexicoPronuncia(caminho_lexico) if caminho_lexico else None
+    _MINIMA = minima
+
+
+def avaliar_frase(tarefa):
+    """
+    Transcreve e pontua uma frase. Executada nos processos do pool.
+    tarefa: (número, Frase, caminho do WAV, transcrição roteirizada ou None).
+    """
+    numero, frase, caminho_wav, roteiro = tarefa
+    linha = dict.fromkeys(CAMPOS, "")
+    linha.update(sentence=numero, text=frase.texto, recording=caminho_wav)
+
+    try:
+        if roteiro is not None:
+            # O motor falso recebe só a sua linha: a ordem do pool não importa
+            backend = criar_backend_asr("fake", roteiro=[roteiro])
+        else:
+            backend = _BACKEND
+        transcricao = backend.transcrever(Gravacao.de_wav(caminho_wav).para_audio_data())
+    except (ErroASR, OSError, EOFError, ValueError) as e:
+        linha["error"] = str(e)
+        return linha
+
+    resultado = alinhar(frase, transcricao)
+    linha.update(
+        transcription=transcricao,
+        matches=resultado.acertos,
+        total=resultado.total,
+        substitutions=resultado.substituicoes,
+        insertions=resultado.insercoes,
+        deletions=resultado.delecoes,
+        accuracy=round(resultado.precisao, 4),
+        missing=" ".join(sorted(resultado.faltantes)),
+    )
+    if _LEXICO is not None:
+        credito, quase_acertos = credito_fonetico(resultado, _LEXICO, _MINIMA)
+        linha["pronunciation"] = (round(credito / resultado.total_pontuado, 4)
+                                  if resultado.total_pontuado else 0.0)
+        linha["near_misses"] = " ".join(f"{o}>{t}" for o, t, _ in quase_acertos)
+    return linha
+
+
+class SaidaJSON:
+    def __init__(self, arquivo):
+        self.arquivo = arquivo
+
+    def escrever(self, linha):
+        self.arquivo.write(json.dumps(linha, ensure_ascii=False) + "\n")
+        self.arquivo.flush()
+
+
+class SaidaCSV:
+    def __init__(self, arquivo):
+        self.arquivo = arquivo
+        self.escritor = csv.DictWriter(arquivo, fieldnames=CAMPOS)
+        self.escritor.writeheader()
+
+    def escrever(self, linha):
+        self.escritor.writerow(linha)
+        self.arquivo.flush()
+
+
+SAIDAS = {"json": SaidaJSON, "csv": SaidaCSV}
+
+
+def _ler_roteiro(caminho):
+    # Uma transcrição por linha, na ordem das frases
+    with open(caminho, "r", encoding="utf-8") as f:
+        return [l.rstrip("\n") for l in f]
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(
+        prog=f"{about.__program_name__} batch",
+        description="Evaluate per-sentence WAV recordings of a text without opening the GUI.",
+    )
+    parser.add_argument("text", help="text file with the sentences that were read")
+    parser.add_argument("recordings", help="directory with one WAV per sentence, numbered from 1")
+    parser.add_argument("--format", choices=sorted(SAIDAS), default="json",
+                        help="output format (default: json, one object per line)")
+    parser.add_argument("--output", default="-",
+                        help="output file (default: standard output)")
+    parser.add_argument("--asr", choices=sorted(BACKENDS_ASR), default="vosk",
+                        help="ASR backend (default: vosk, which needs --vosk-model)")
+    parser.add_argument("--language", default="en-US",
+                        help="language for the google backend (default: en-US)")
+    parser.add_argument("--vosk-model", default="",
+                        help="folder of the Vosk model")
+    parser.add_argument("--fake-script", default="",
+                        help="for the fake backend: file with one transcription per sentence")
+    parser.add_argument("--lexicon", default="",
+                        help="CMUdict-style pronunciation dictionary; adds phoneme-level partial credit")
+    parser.add_argument("--lexicon-cache", default=os.path.join(os.path.expanduser("~"), ".cache",
+                                                                about.__package__, "lexicon"),
+                        help="directory for the compiled lexicon index")
+    parser.add_argument("--min-similarity", type=float, default=SIMILARIDADE_MINIMA,
+                        help="minimum phonetic similarity (0-1) for a misread word to get "
+                             f"partial credit (default: {SIMILARIDADE_MINIMA})")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="number of worker processes (default: CPU count)")
+    parser.add_argument("--max-length", type=int, default=125,
+                        help="maximum sentence length used by the segmenter (default: 125)")
+    return parser
+
+
+def executar(args, saida, log=sys.stderr):
+    """
+    Avalia todas as frases que têm gravação e devolve o número de
+    frases processadas.
+    """
+    frases = carregar_frases(args.text, args.max_length)
+    gravacoes = listar_gravacoes(args.recordings)
+
+    opcoes = {
+        "google": {"idioma": args.language},
+        "vosk": {"caminho_modelo": args.vosk_model},
+    }.get(args.asr, {})
+    roteiro = _ler_roteiro(args.fake_script) if args.asr == "fake" and args.fake_script else []
+
+    tarefas = []
+    for numero, frase in enumerate(frases, start=1):
+        caminho = gravacoes.get(numero)
+        if caminho is None:
+            continue
+        texto_roteiro = None
+        if args.asr == "fake":
+            texto_roteiro = roteiro[numero - 1] if numero <= len(roteiro) else ""
+        tarefas.append((numero, frase, caminho, texto_roteiro))
+
+    faltando = len(frases) - len(tarefas)
+    if faltando:
+        print(f"{faltando} of {len(frases)} sentences have no recording and were skipped.", file=log)
+
+    # Falhas de configuração do motor aparecem aqui, e não dentro do pool
+    if args.asr != "fake":
+        criar_backend_asr(args.asr, **opcoes)
+
+    caminho_lexico = ""
+    if args.lexicon:
+        lexico = abrir_lexico(args.lexicon, args.lexicon_cache)
+        caminho_lexico = lexico.caminho
+        lexico.close()
+
+    inicio = time.perf_counter()
+    processadas = 0
+    with ProcessPoolExecutor(max_workers=max(1, args.workers),
+                             initializer=_iniciar_processo,
+                             initargs=(args.asr, opcoes, caminho_lexico,
+                                       args.min_similarity)) as pool:
+        # map devolve na ordem das frases, à medida que ficam prontas
+        tamanho_lote = min(16, max(1, len(tarefas) // (4 * max(1, args.workers))))
+        for linha in pool.map(avaliar_frase, tarefas, chunksize=tamanho_lote):
+            saida.escrever(linha)
+            processadas += 1
+    duracao = time.perf_counter() - inicio
+
+    vazao = processadas / duracao if duracao > 0 else 0.0
+    print(f"{processadas} sentences in {duracao:.2f} s ({vazao:.1f} sentences/s)", file=log)
+    return processadas
+
+
+def main(argv=None):
+    parser = criar_parser()
+    args = parser.parse_args(argv)
+    if args.asr == "vosk" and not args.vosk_model:
+        parser.error("the vosk backend needs --vosk-model PATH (the folder of a Vosk model); "
+                     "use --asr to pick another backend")
+    try:
+        if args.output == "-":
+            executar(args, SAIDAS[args.format](sys.stdout))
+        else:
+            with open(args.output, "w", encoding="utf-8", newline="") as f:
+                executar(args, SAIDAS[args.format](f))
+    except (ErroASR, OSError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
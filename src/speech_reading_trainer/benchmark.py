@@ -0,0 +1,474 @@
+#!/usr/bin/python3
+"""
+Benchmarks reprodutíveis dos caminhos críticos, sem interface gráfica.
+
+Uso:
+    speech-reading-trainer benchmark [--sizes 1K,1M] [--full] [--save base.json]
+    speech-reading-trainer benchmark --compare base.json [--threshold 0.15]
+
+Mede a segmentação de corpora gerados de 1 KB a 10 MB (100 MB com --full), a pontuação e
+a renderização da transcrição frase a frase, a montagem da fila de
+treino das palavras erradas, e o caminho completo de
+avaliação de uma frase com áudio sintético e o motor ASR falso. Os
+corpora e as transcrições vêm de um gerador com semente fixa, então
+duas execuções medem exatamente o mesmo trabalho.
+"""
+import os
+import gc
+import sys
+import json
+import math
+import time
+import random
+import platform
+import argparse
+import tempfile
+import statistics
+from array import array
+
+import speech_reading_trainer.about as about
+from speech_reading_trainer.modules.asr_backends import BackendFalsoASR
+from speech_reading_trainer.modules.audio_buffer import Gravacao
+from speech_reading_trainer.modules.scoring import alinhar
+
+VERSAO_FORMATO = 1
+
+TAMANHOS = {"1K": 1 << 10, "10K": 10 << 10, "100K": 100 << 10,
+            "1M": 1 << 20, "10M": 10 << 20, "100M": 100 << 20}
+TAMANHOS_RAPIDOS = ("1K", "10K", "100K", "1M")
+# 100M leva minutos e guarda todas as frases na memória: só com --full
+TAMANHOS_PADRAO = ("1K", "10K", "100K", "1M", "10M")
+
+# Casos rápidos repetem até somar este tempo: poucas amostras de 1 ms são ruído
+TEMPO_ALVO = 1.0
+MAX_REPETICOES = 1000
+
+# Pares frase/transcrição por caso de pontuação
+PARES = 2000
+# Frases no caminho completo de avaliação
+FRASES_E2E = 200
+
+TAXA_AUDIO = 16000
+BLOCO_AUDIO = TAXA_AUDIO // 50      # 20 ms, como a captura
+SEGUNDOS_POR_PALAVRA = 0.35
+
+
+# ==========================
+# Dados sintéticos
+# ==========================
+
+_SILABAS = ["ba", "be", "ca", "co", "da", "di", "fe", "ga", "la", "le", "li", "ma", "me",
+            "na", "no", "pa", "pe", "ra", "re", "sa", "se", "ta", "te", "to", "va", "ve",
+            "th", "st", "er", "in", "on", "an", "ou", "ing", "ght", "ion"]
+
+
+class GeradorCorpus:
+    """
+    Texto pseudo-inglês determinístico: vocabulário com frequência de
+    Zipf, frases de tamanhos variados, vírgulas, diálogos e parágrafos.
+    """
+    def __init__(self, semente=0, vocabulario=5000):
+        self.rng = random.Random(semente)
+        palavras = set()
+        while len(palavras) < vocabulario:
+            n = self.rng.choice((1, 1, 2, 2, 2, 3, 3, 4))
+            palavras.add("".join(self.rng.choice(_SILABAS) for _ in range(n)))
+        self.palavras = sorted(palavras)
+        self.rng.shuffle(self.palavras)
+        pesos = [1.0 / (k + 1) for k in range(len(self.palavras))]
+        total = sum(pesos)
+        acumulado = 0.0
+        self._acumulados = []
+        for p in pesos:
+            acumulado += p / total
+            self._acumulados.append(acumulado)
+
+    def palavra(self):
+        return self.rng.choices(self.palavras, cum_weights=self._acumulados)[0]
+
+    def frase(self, minimo=4, maximo=24):
+        n = self.rng.randint(minimo, maximo)
+        palavras = [self.palavra() for _ in range(n)]
+        if n > 8 and self.rng.random() < 0.4:
+            palavras[self.rng.randrange(2, n - 2)] += ","
+        texto = " ".join(palavras)
+        texto = texto[0].upper() + texto[1:] + self.rng.choice(".....?!")
+        if self.rng.random() < 0.05:
+            texto = f'"{texto}"'
+        return texto
+
+    def texto(self, tamanho):
+        """Texto com exatamente `tamanho` bytes (ASCII)."""
+        partes = []
+        total = 0
+        while total < tamanho:
+            paragrafo = " ".join(self.frase() for _ in range(self.rng.randint(2, 8))) + "\n\n"
+            partes.append(paragrafo)
+            total += len(paragrafo)
+        return "".join(partes)[:tamanho]
+
+    def transcricao(self, frase, taxa_erro=0.15):
+        """Leitura com erros: palavras trocadas, omitidas e inseridas."""
+        saida = []
+        for palavra in frase.tokens:
+            sorteio = self.rng.random()
+            if sorteio < taxa_erro / 3:
+                continue
+            if sorteio < 2 * taxa_erro / 3:
+                saida.append(self.palavra())
+            else:
+                saida.append(palavra)
+            if self.rng.random() < taxa_erro / 3:
+                saida.append(self.palavra())
+        return " ".join(saida)
+
+
+def gravar_corpus(gerador, pasta, rotulo, tamanho):
+    """
+    Grava o corpus de `tamanho` bytes. Acima de 1 MB, repete um bloco de
+    1 MB gerado uma vez, o que mantém a geração de 100 MB em segundos.
+    """
+    caminho = os.path.join(pasta, f"corpus_{rotulo}.txt")
+    bloco = gerador.texto(min(tamanho, 1 << 20))
+    with open(caminho, "w", encoding="ascii") as f:
+        restante = tamanho
+        while restante > 0:
+            f.write(bloco[:restante])
+            restante -= len(bloco)
+    return caminho
+
+
+def audio_sintetico(segundos, rng):
+    """Gravacao mono de 16 bits com um tom de frequência sorteada."""
+    n = int(segundos * TAXA_AUDIO)
+    periodo = max(2, round(TAXA_AUDIO / rng.uniform(110, 220)))
+    ciclo = array("h", (int(6000 * math.sin(2 * math.pi * i / periodo)) for i in range(periodo)))
+    amostras = (ciclo * (n // periodo + 1))[:n]
+    return Gravacao(amostras.tobytes(), TAXA_AUDIO)
+
+
+# ==========================
+# Casos
+# ==========================
+
+class Caso:
+    """
+    Um benchmark: executar() faz `operacoes` chamadas da função medida
+    sobre `bytes` bytes de entrada.
+    """
+    __slots__ = ("nome", "executar", "operacoes", "bytes", "aquecer")
+
+    def __init__(self, nome, executar, operacoes=1, bytes=0, aquecer=True):
+        self.nome = nome
+        self.executar = executar
+        self.operacoes = operacoes
+        self.bytes = bytes
+        self.aquecer = aquecer
+
+
+def casos_segmentacao(gerador, pasta, rotulos):
+    from speech_reading_trainer.program import ler_e_separar_texto
+
+    for rotulo in rotulos:
+        tamanho = TAMANHOS[rotulo]
+        caminho = gravar_corpus(gerador, pasta, rotulo, tamanho)
+        yield Caso(f"segment/{rotulo}", lambda c=caminho: ler_e_separar_texto(c),
+                   bytes=tamanho, aquecer=tamanho <= TAMANHOS["1M"])
+
+
+def _pares(gerador, frases):
+    return [(frase, gerador.transcricao(frase)) for frase in frases]
+
+
+def casos_pontuacao(gerador, pasta):
+    from speech_reading_trainer.program import (
+        ler_e_separar_texto, comparar_frases_bag_of_words, palavras_faltantes,
+        transcricao_com_cores
+    )
+
+    caminho = gravar_corpus(gerador, pasta, "score", 1 << 20)
+    frases = [f for f in ler_e_separar_texto(caminho) if f.tokens][:PARES]
+    # Frases longas (parágrafos sem pontuação) passam pelo caminho NumPy
+    longas = ler_e_separar_texto(caminho, tamanho_maximo=2000, separadores=["\n\n"])
+    longas = [f for f in longas if len(f.tokens) > 40][:PARES // 10]
+
+    for grupo, lista in (("short", frases), ("long", longas)):
+        pares = _pares(gerador, lista)
+        for nome, funcao in (("compare_bag_of_words", comparar_frases_bag_of_words),
+                             ("missing_words", palavras_faltantes),
+                             ("colored_transcript", transcricao_com_cores)):
+            if funcao is transcricao_com_cores:
+                executar = lambda p=pares, f=funcao: [f(t, o) for o, t in p]
+            else:
+                executar = lambda p=pares, f=funcao: [f(o, t) for o, t in p]
+            yield Caso(f"{nome}/{grupo}", executar, operacoes=len(pares),
+                       bytes=sum(len(o.texto) for o, _ in pares))
+
+
+def casos_ponta_a_ponta(gerador, pasta):
+    """
+    Avaliar uma frase como a janela faz: o áudio chega em blocos de 20 ms
+    ao fluxo ASR, cada parcial nova é colorida, e no fim a transcrição é
+    alinhada, colorida e pontuada.
+    """
+    from speech_reading_trainer.program import (
+        ler_e_separar_texto, transcricao_com_cores, html_transcricao
+    )
+
+    caminho = gravar_corpus(gerador, pasta, "e2e", 256 << 10)
+    frases = [f for f in ler_e_separar_texto(caminho) if f.tokens][:FRASES_E2E]
+    roteiro = [gerador.transcricao(f) for f in frases]
+    audios = [audio_sintetico(len(f.tokens) * SEGUNDOS_POR_PALAVRA, gerador.rng) for f in frases]
+    passo = BLOCO_AUDIO * 2
+
+    def avaliar_todas():
+        backend = BackendFalsoASR(roteiro)
+        for frase, gravacao in zip(frases, audios):
+            fluxo = backend.iniciar_fluxo(gravacao.taxa, gravacao.largura)
+            ultimo = ""
+            pcm = memoryview(gravacao.pcm)
+            for inicio in range(0, len(pcm), passo):
+                parcial = fluxo.alimentar(bytes(pcm[inicio:inicio + passo]))
+                if parcial and parcial != ultimo:
+                    ultimo = parcial
+                    transcricao_com_cores(parcial, frase)
+            transcricao = fluxo.finalizar()
+            transcricao_com_cores(transcricao, frase)
+            resultado = alinhar(frase, transcricao)
+            html_transcricao(resultado)
+
+    yield Caso("evaluate_sentence/e2e", avaliar_todas, operacoes=len(frases),
+               bytes=sum(len(g.pcm) for g in audios))
+
+
+def casos_treino(gerador, pasta, rotulo):
+    """
+    Montar a fila de treino como a janela faz, sobre um corpus já
+    indexado: abrir o índice, mapear o índice invertido e somar os erros
+    das palavras mais erradas.
+    """
+    from speech_reading_trainer.modules.sentence_index import abrir_indice
+    from speech_reading_trainer.modules.word_index import IndiceInvertido
+
+    tamanho = TAMANHOS[rotulo]
+    caminho = gravar_corpus(gerador, pasta, "drill", tamanho)
+    pasta_indice = os.path.join(pasta, "index")
+    abrir_indice(caminho, pasta_indice).close()
+    contagens = {p: gerador.rng.randint(1, 9) for p in gerador.rng.sample(gerador.palavras, 300)}
+
+    def montar_fila():
+        frases = abrir_indice(caminho, pasta_indice)
+        try:
+            indice = IndiceInvertido()
+            indice.adicionar(caminho, frases.palavras(), len(frases))
+            indice.fila_treino(contagens)
+        finally:
+            frases.close()
+
+    yield Caso(f"drill_queue/{rotulo}", montar_fila, bytes=tamanho)
+
+
+# ==========================
+# Medição
+# ==========================
+
+def medir(caso, repeticoes):
+    """
+    repeticoes é o mínimo: casos aquecidos que rodam rápido repetem até
+    somar TEMPO_ALVO, estimado pela duração do aquecimento.
+    """
+    if caso.aquecer:
+        inicio = time.perf_counter()
+        caso.executar()
+        duracao = time.perf_counter() - inicio
+        if duracao > 0:
+            repeticoes = max(repeticoes, min(MAX_REPETICOES, math.ceil(TEMPO_ALVO / duracao)))
+    tempos = []
+    gc.collect()
+    ativo = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            caso.executar()
+            tempos.append(time.perf_counter() - inicio)
+    finally:
+        if ativo:
+            gc.enable()
+    mediana = statistics.median(tempos)
+    resultado = {
+        "repeat": repeticoes,
+        "operations": caso.operacoes,
+        "median_s": mediana,
+        "min_s": min(tempos),
+        "per_op_s": mediana / caso.operacoes,
+        "min_per_op_s": min(tempos) / caso.operacoes,
+    }
+    if caso.bytes:
+        resultado["bytes"] = caso.bytes
+        resultado["mb_per_s"] = caso.bytes / (1 << 20) / mediana if mediana > 0 else 0.0
+    return resultado
+
+
+def ambiente(semente):
+    return {
+        "format": VERSAO_FORMATO,
+        "package_version": about.__version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "seed": semente,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def _formatar_tempo(segundos):
+    if segundos >= 1:
+        return f"{segundos:8.2f} s "
+    if segundos >= 1e-3:
+        return f"{segundos * 1e3:8.2f} ms"
+    return f"{segundos * 1e6:8.2f} us"
+
+
+def comparar(atual, base, limiar):
+    """
+    Compara o tempo por operação de cada caso presente nos dois, pelo
+    mínimo das execuções (menos sensível a ruído que a mediana); bases
+    antigas, sem o mínimo, são comparadas pela mediana.
+    Retorna [(nome, base, atual, razão, situação)], onde situação é
+    "regression", "improvement" ou "ok".
+    """
+    linhas = []
+    for nome, resultado in atual.items():
+        anterior = base.get(nome)
+        if anterior is None:
+            continue
+        chave = "min_per_op_s" if "min_per_op_s" in anterior else "per_op_s"
+        if not anterior.get(chave):
+            continue
+        razao = resultado[chave] / anterior[chave]
+        if razao > 1 + limiar:
+            situacao = "regression"
+        elif razao < 1 / (1 + limiar):
+            situacao = "improvement"
+        else:
+            situacao = "ok"
+        linhas.append((nome, anterior[chave], resultado[chave], razao, situacao))
+    return linhas
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(
+        prog=f"{about.__program_name__} benchmark",
+        description="Benchmark sentence segmentation, scoring, transcript rendering and "
+                    "the full evaluation of a sentence on generated data.",
+    )
+    parser.add_argument("--sizes", default="",
+                        help=f"corpus sizes for the segmentation benchmark "
+                             f"(default: {','.join(TAMANHOS_PADRAO)})")
+    parser.add_argument("--full", action="store_true",
+                        help="also segment the 100M corpus, which takes minutes and "
+                             "keeps every sentence in memory")
+    parser.add_argument("--quick", action="store_true",
+                        help="only corpora up to 1M and at most 3 repetitions of the slow cases")
+    parser.add_argument("--only", default="",
+                        help="run only benchmarks whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="minimum timed repetitions of each benchmark; fast ones repeat "
+                             "for about a second. The median is reported and the minimum is "
+                             "compared (default: 5)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed of the data generator (default: 0)")
+    parser.add_argument("--save", default="",
+                        help="write the results as a JSON baseline to this file")
+    parser.add_argument("--compare", default="",
+                        help="JSON baseline to compare against; exits with 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="relative slowdown flagged as a regression (default: 0.15)")
+    return parser
+
+
+def executar(args, saida=sys.stdout):
+    """
+    Roda os benchmarks e retorna o documento de resultados.
+    """
+    if args.sizes:
+        rotulos = [r.strip().upper() for r in args.sizes.split(",") if r.strip()]
+    else:
+        rotulos = list(TAMANHOS_PADRAO) + (["100M"] if args.full else [])
+    desconhecidos = [r for r in rotulos if r not in TAMANHOS]
+    if desconhecidos:
+        raise ValueError(f"Unknown sizes: {', '.join(desconhecidos)}. "
+                         f"Options: {', '.join(TAMANHOS)}")
+    repeticoes = max(1, args.repeat)
+    if args.quick:
+        rotulos = [r for r in rotulos if r in TAMANHOS_RAPIDOS]
+        repeticoes = min(repeticoes, 3)
+
+    resultados = {}
+    with tempfile.TemporaryDirectory(prefix="srt-bench-") as pasta:
+        fontes = (
+            lambda: casos_segmentacao(GeradorCorpus(args.seed), pasta, rotulos),
+            lambda: casos_pontuacao(GeradorCorpus(args.seed + 1), pasta),
+            lambda: casos_ponta_a_ponta(GeradorCorpus(args.seed + 2), pasta),
+            lambda: casos_treino(GeradorCorpus(args.seed + 3), pasta,
+                                 "1M" if args.quick else "10M"),
+        )
+        for fonte in fontes:
+            for caso in fonte():
+                if args.only and args.only not in caso.nome:
+                    continue
+                resultado = medir(caso, repeticoes)
+                resultados[caso.nome] = resultado
+                vazao = f"{resultado['mb_per_s']:9.2f} MB/s" if "mb_per_s" in resultado else ""
+                print(f"{caso.nome:<34} {_formatar_tempo(resultado['median_s'])}"
+                      f"  {_formatar_tempo(resultado['per_op_s'])}/op  {vazao}",
+                      file=saida, flush=True)
+                # Corpora grandes não ficam no disco depois de medidos
+                if caso.nome.startswith("segment/"):
+                    os.remove(os.path.join(pasta, f"corpus_{caso.nome.split('/')[1]}.txt"))
+
+    return {"environment": ambiente(args.seed), "results": resultados}
+
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    try:
+        documento = executar(args)
+    except (ValueError, OSError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(documento, f, indent=4)
+
+    if not args.compare:
+        return 0
+
+    try:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            base = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"error: cannot read baseline: {e}", file=sys.stderr)
+        return 1
+
+    linhas = comparar(documento["results"], base.get("results", {}), args.threshold)
+    print(f"\nCompared with {args.compare} (threshold {args.threshold:.0%}):")
+    for nome, anterior, atual, razao, situacao in linhas:
+        marca = {"regression": "REGRESSION", "improvement": "faster"}.get(situacao, "")
+        print(f"{nome:<34} {_formatar_tempo(anterior)} -> {_formatar_tempo(atual)}"
+              f"  {razao - 1:+7.1%}  {marca}")
+    if base.get("environment", {}).get("machine") != documento["environment"]["machine"]:
+        print("warning: the baseline was recorded on a different machine", file=sys.stderr)
+
+    regressoes = [l for l in linhas if l[4] == "regression"]
+    if regressoes:
+        print(f"{len(regressoes)} regression(s) above {args.threshold:.0%}.", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,6 +17,27 @@ def update_desktop_database(desktop_path):
     except FileNotFoundError:
         print("The command 'update-desktop-database' was not found. Verify that the package 'desktop-file-utils' is installed.")
 
+def write_desktop_entry(path, content, overwrite=False, mode=None):
+    """
+    Writes content to path and returns True, unless the file already exists
+    and either overwrite is False or it already has exactly this content.
+    """
+    if os.path.exists(path):
+        if not overwrite:
+            return False
+        try:
+            with open(path, "r") as f:
+                if f.read() == content:
+                    return False
+        except (OSError, UnicodeDecodeError):
+            pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+    if mode is not None:
+        os.chmod(path, mode)
+    return True
+
 def create_desktop_file(desktop_path, overwrite=False, program_name=None):
 
     icon_path = resource_path('icons', 'logo.png')
@@ -43,11 +64,8 @@ StartupWMClass={about.__package__}
 """
     path = os.path.expanduser(os.path.join(desktop_path,f"{__program_name}.desktop"))
     
-    if not os.path.exists(path) or overwrite == True: 
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        with open(path, "w") as f:
-            f.write(desktop_entry)
-        os.chmod(path, 0o755)
+    # Up to date: no write and no update-desktop-database subprocess
+    if write_desktop_entry(path, desktop_entry, overwrite, 0o755):
         print(f"File {__program_name}.desktop created in {path}.")
         update_desktop_database(desktop_path)
     
@@ -66,11 +84,7 @@ Icon={icon}
 """
     path = os.path.expanduser(f"~/.local/share/desktop-directories/{directory_name}.directory")
     
-    if not os.path.exists(path) or overwrite == True:  # Evita sobrescrever
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        with open(path, "w") as f:
-            f.write(desktop_entry)
-        os.chmod(path, 0o755)
+    if write_desktop_entry(path, desktop_entry, overwrite, 0o755):  # Evita sobrescrever
         print(f"File {path} created.")
     
 def create_desktop_menu(directory_name = "ResearchTools",
@@ -91,10 +105,7 @@ def create_desktop_menu(directory_name = "ResearchTools",
 """
     path = os.path.expanduser(f"~/.config/menus/applications-merged/{basename}.menu")
     
-    if not os.path.exists(path) or overwrite == True:  # Evita sobrescrever
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        with open(path, "w") as f:
-            f.write(desktop_entry)
+    if write_desktop_entry(path, desktop_entry, overwrite):  # Evita sobrescrever
         print(f"File {path} created.")
 
 if __name__ == '__main__':
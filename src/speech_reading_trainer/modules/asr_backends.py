@@ -0,0 +1,212 @@
+#!/usr/bin/python3
+import json
+import threading
+
+
+class ErroASR(Exception):
+    """Falha do motor de reconhecimento (rede, modelo, etc.)."""
+
+
+class FluxoASR:
+    """
+    Reconhecimento incremental de uma fala.
+    alimentar recebe blocos PCM à medida que são gravados e pode devolver
+    uma hipótese parcial; finalizar devolve o texto final.
+
+    Esta implementação padrão apenas acumula os blocos e transcreve no
+    final, para motores sem suporte a resultados parciais.
+    """
+    def __init__(self, backend, taxa, largura):
+        self.backend = backend
+        self.taxa = taxa
+        self.largura = largura
+        self._blocos = []
+
+    def alimentar(self, pcm):
+        self._blocos.append(pcm)
+        return None
+
+    def finalizar(self):
+        import speech_recognition as sr
+        audio = sr.AudioData(b"".join(self._blocos), self.taxa, self.largura)
+        return self.backend.transcrever(audio)
+
+
+class BackendASR:
+    """
+    Interface dos motores de reconhecimento de voz.
+    transcrever recebe um speech_recognition.AudioData e devolve o texto,
+    ou "" quando nenhuma fala foi reconhecida.
+    """
+    nome = ""
+    suporta_parciais = False
+
+    def transcrever(self, audio):
+        raise NotImplementedError
+
+    def iniciar_fluxo(self, taxa, largura=2):
+        """
+        Inicia o reconhecimento incremental de uma nova fala.
+        """
+        return FluxoASR(self, taxa, largura)
+
+
+class BackendGoogleASR(BackendASR):
+    """Google Web Speech API (requer rede)."""
+    nome = "google"
+
+    def __init__(self, idioma="en-US"):
+        self.idioma = idioma
+        self._sr = None
+        self._recognizer = None
+
+    def transcrever(self, audio):
+        # O speech_recognition só é importado no primeiro uso
+        if self._recognizer is None:
+            import speech_recognition as sr
+            self._sr = sr
+            self._recognizer = sr.Recognizer()
+        try:
+            return self._recognizer.recognize_google(audio, language=self.idioma)
+        except self._sr.UnknownValueError:
+            return ""
+        except self._sr.RequestError as e:
+            raise ErroASR(f"Google speech recognition request failed: {e}") from e
+
+
+# Modelos Vosk carregados, compartilhados por todo o processo
+_MODELOS_VOSK = {}
+_LOCK_MODELOS_VOSK = threading.Lock()
+
+
+def carregar_modelo_vosk(caminho_modelo):
+    """
+    Carrega o modelo Vosk uma única vez por processo.
+    """
+    with _LOCK_MODELOS_VOSK:
+        modelo = _MODELOS_VOSK.get(caminho_modelo)
+        if modelo is None:
+            try:
+                from vosk import Model, SetLogLevel
+            except ImportError as e:
+                raise ErroASR("The 'vosk' package is not installed.") from e
+            SetLogLevel(-1)
+            try:
+                modelo = Model(caminho_modelo)
+            except Exception as e:
+                raise ErroASR(f"Could not load the Vosk model from '{caminho_modelo}': {e}") from e
+            _MODELOS_VOSK[caminho_modelo] = modelo
+        return modelo
+
+
+class BackendVosk(BackendASR):
+    """Vosk (Kaldi) local, em CPU e sem rede."""
+    nome = "vosk"
+
+    suporta_parciais = True
+
+    TAXA = 16000
+
+    def __init__(self, caminho_modelo=""):
+        if not caminho_modelo:
+            raise ErroASR("Set 'asr_vosk_model' in config.json to the folder of a Vosk model.")
+        self.modelo = carregar_modelo_vosk(caminho_modelo)
+
+    def iniciar_fluxo(self, taxa, largura=2):
+        if largura != 2:
+            raise ErroASR("Vosk needs 16-bit audio.")
+        return FluxoVosk(self, taxa, largura)
+
+    def transcrever(self, audio):
+        from vosk import KaldiRecognizer
+
+        rec = KaldiRecognizer(self.modelo, self.TAXA)
+        rec.AcceptWaveform(audio.get_raw_data(convert_rate=self.TAXA, convert_width=2))
+        return json.loads(rec.FinalResult()).get("text", "")
+
+
+class FluxoVosk(FluxoASR):
+    def __init__(self, backend, taxa, largura):
+        from vosk import KaldiRecognizer
+
+        super().__init__(backend, taxa, largura)
+        self._rec = KaldiRecognizer(backend.modelo, taxa)
+        self._finais = []
+        self._parcial = ""
+
+    def _texto(self):
+        return " ".join(t for t in self._finais + [self._parcial] if t)
+
+    def alimentar(self, pcm):
+        if self._rec.AcceptWaveform(pcm):
+            self._finais.append(json.loads(self._rec.Result()).get("text", ""))
+            self._parcial = ""
+        else:
+            self._parcial = json.loads(self._rec.PartialResult()).get("partial", "")
+        return self._texto()
+
+    def finalizar(self):
+        self._finais.append(json.loads(self._rec.FinalResult()).get("text", ""))
+        self._parcial = ""
+        return self._texto()
+
+
+class BackendFalsoASR(BackendASR):
+    """
+    Motor roteirizado para testes e benchmarks: devolve as transcrições
+    de roteiro em ordem, sem microfone nem rede.
+    """
+    nome = "fake"
+    suporta_parciais = True
+
+    def __init__(self, roteiro=None):
+        self.roteiro = list(roteiro or [])
+        self._lock = threading.Lock()
+        self._posicao = 0
+
+    def _proximo(self):
+        with self._lock:
+            if self._posicao >= len(self.roteiro):
+                return ""
+            texto = self.roteiro[self._posicao]
+            self._posicao += 1
+            return texto
+
+    def transcrever(self, audio):
+        return self._proximo()
+
+    def iniciar_fluxo(self, taxa, largura=2):
+        return FluxoFalso(self._proximo(), taxa, largura)
+
+
+class FluxoFalso(FluxoASR):
+    """Revela uma palavra do roteiro a cada bloco recebido."""
+    def __init__(self, texto, taxa, largura):
+        super().__init__(None, taxa, largura)
+        self._palavras = texto.split()
+        self._reveladas = 0
+
+    def alimentar(self, pcm):
+        self._reveladas = min(self._reveladas + 1, len(self._palavras))
+        return " ".join(self._palavras[:self._reveladas])
+
+    def finalizar(self):
+        return " ".join(self._palavras)
+
+
+BACKENDS_ASR = {
+    BackendGoogleASR.nome: BackendGoogleASR,
+    BackendVosk.nome: BackendVosk,
+    BackendFalsoASR.nome: BackendFalsoASR,
+}
+
+
+def criar_backend_asr(nome, **opcoes):
+    """
+    Cria o backend ASR pelo nome usado no config.json.
+    """
+    try:
+        classe = BACKENDS_ASR[nome]
+    except KeyError:
+        raise ValueError(f"Unknown ASR backend '{nome}'. Options: {', '.join(BACKENDS_ASR)}")
+    return classe(**opcoes)
@@ -0,0 +1,76 @@
+#!/usr/bin/python3
+import wave
+
+
+class Gravacao:
+    """
+    Áudio PCM capturado do microfone, mantido na memória.
+    O mesmo buffer é usado pelo ASR e pela reprodução, sem cópias
+    e sem passar por arquivo.
+    """
+    __slots__ = ("pcm", "taxa", "largura", "canais")
+
+    def __init__(self, pcm, taxa, largura=2, canais=1):
+        self.pcm = pcm            # bytes, PCM little-endian intercalado
+        self.taxa = taxa          # amostras por segundo
+        self.largura = largura    # bytes por amostra
+        self.canais = canais
+
+    @classmethod
+    def de_audio_data(cls, audio):
+        """Cria a partir de um speech_recognition.AudioData."""
+        return cls(audio.frame_data, audio.sample_rate, audio.sample_width)
+
+    @classmethod
+    def de_wav(cls, caminho):
+        """Lê um arquivo WAV PCM inteiro para a memória."""
+        with wave.open(caminho, "rb") as w:
+            return cls(w.readframes(w.getnframes()), w.getframerate(),
+                       w.getsampwidth(), w.getnchannels())
+
+    @property
+    def duracao(self):
+        return len(self.pcm) / float(self.taxa * self.largura * self.canais)
+
+    def __len__(self):
+        return len(self.pcm)
+
+    def para_mono(self):
+        """
+        Gravacao com os canais misturados pela média, para o ASR, que só
+        entende áudio mono. Uma gravação mono é devolvida sem cópia.
+        """
+        if self.canais == 1:
+            return self
+        import numpy as np
+
+        tipos = {1: np.uint8, 2: "<i2", 4: "<i4"}
+        if self.largura not in tipos:
+            raise ValueError(f"Cannot downmix {self.largura * 8}-bit audio with "
+                             f"{self.canais} channels; convert it to mono first.")
+        amostras = np.frombuffer(self.pcm, dtype=tipos[self.largura])
+        quadros = amostras[:len(amostras) - len(amostras) % self.canais].reshape(-1, self.canais)
+        mono = np.rint(quadros.mean(axis=1)).astype(tipos[self.largura])
+        return Gravacao(mono.tobytes(), self.taxa, self.largura, 1)
+
+    def para_audio_data(self):
+        """
+        speech_recognition.AudioData apontando para o mesmo buffer
+        (ou para a mistura mono, se a gravação tiver mais canais).
+        """
+        import speech_recognition as sr
+        mono = self.para_mono()
+        return sr.AudioData(mono.pcm, mono.taxa, mono.largura)
+
+    def para_segmento(self):
+        """pydub.AudioSegment apontando para o mesmo buffer."""
+        from pydub import AudioSegment
+        return AudioSegment(data=self.pcm, sample_width=self.largura,
+                            frame_rate=self.taxa, channels=self.canais)
+
+    def salvar_wav(self, caminho):
+        with wave.open(caminho, "wb") as w:
+            w.setnchannels(self.canais)
+            w.setsampwidth(self.largura)
+            w.setframerate(self.taxa)
+            w.writeframes(self.pcm)
@@ -0,0 +1,139 @@
+#!/usr/bin/python3
+import io
+
+import numpy as np
+
+# Parâmetros do WSOLA, em segundos
+_JANELA = 0.030
+_TOLERANCIA = 0.010
+
+
+def segmento_para_array(segmento):
+    """
+    Amostras de um AudioSegment como int16 no formato (n, canais).
+    """
+    if segmento.sample_width != 2:
+        segmento = segmento.set_sample_width(2)
+    amostras = np.frombuffer(segmento.raw_data, dtype="<i2")
+    return amostras.reshape(-1, segmento.channels)
+
+
+def array_para_segmento(amostras, taxa):
+    """
+    AudioSegment a partir de amostras int16 (n,) ou (n, canais).
+    """
+    from pydub import AudioSegment
+
+    amostras = np.asarray(amostras)
+    canais = 1 if amostras.ndim == 1 else amostras.shape[1]
+    return AudioSegment(data=amostras.astype("<i2", copy=False).tobytes(),
+                        sample_width=2, frame_rate=taxa, channels=canais)
+
+
+def decodificar_mp3(dados):
+    """
+    Decodifica MP3 na memória, sem processo externo, e devolve
+    (amostras int16 (n, canais), taxa).
+
+    Usa miniaudio ou soundfile (libsndfile >= 1.1), o que estiver
+    instalado; sem nenhum dos dois recorre ao ffmpeg do pydub.
+    """
+    try:
+        import miniaudio
+    except ImportError:
+        miniaudio = None
+    if miniaudio is not None:
+        decodificado = miniaudio.mp3_read_s16(dados)
+        amostras = np.frombuffer(decodificado.samples, dtype=np.int16)
+        return amostras.reshape(-1, decodificado.nchannels), decodificado.sample_rate
+
+    try:
+        import soundfile
+    except ImportError:
+        soundfile = None
+    if soundfile is not None:
+        try:
+            amostras, taxa = soundfile.read(io.BytesIO(dados), dtype="int16", always_2d=True)
+            return amostras, taxa
+        except (RuntimeError, soundfile.LibsndfileError):
+            pass
+
+    from pydub import AudioSegment
+    segmento = AudioSegment.from_file(io.BytesIO(dados), format="mp3")
+    return segmento_para_array(segmento), segmento.frame_rate
+
+
+def _hann(n):
+    # Janela periódica: cópias deslocadas de n/2 somam exatamente 1
+    return (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(n) / n)).astype(np.float32)
+
+
+def alongar_tempo(amostras, taxa, fator):
+    """
+    Muda a velocidade sem mudar a altura (WSOLA). fator > 1 acelera.
+    amostras: int16 (n,) ou (n, canais). Retorna int16 no mesmo formato,
+    com cerca de n / fator amostras.
+
+    A busca do melhor encaixe de cada quadro é uma correlação NumPy e a
+    sobreposição-soma final é feita de uma vez, sem laço por amostra.
+    """
+    if fator == 1.0 or len(amostras) == 0:
+        return amostras
+    if fator <= 0:
+        raise ValueError("speed factor must be positive")
+
+    entrada = np.asarray(amostras, dtype=np.float32)
+    mono = entrada.ndim == 1
+    if mono:
+        entrada = entrada[:, None]
+    n = entrada.shape[0]
+
+    tamanho = max(4, int(_JANELA * taxa) // 2 * 2)
+    passo_saida = tamanho // 2
+    passo_entrada = passo_saida * fator
+    tolerancia = max(1, int(_TOLERANCIA * taxa))
+
+    n_saida = int(round(n / fator))
+    quadros = n_saida // passo_saida + 2
+
+    # Margens para que toda busca caia dentro do sinal
+    margem = tolerancia + passo_saida
+    fim = int(np.ceil(quadros * passo_entrada)) + tamanho + 2 * tolerancia + passo_saida
+    sinal = np.zeros((margem + max(n, 0) + fim, entrada.shape[1]), dtype=np.float32)
+    sinal[margem:margem + n] = entrada
+    guia = sinal.mean(axis=1)
+
+    posicoes = np.empty(quadros, dtype=np.int64)
+    posicoes[0] = margem - passo_saida
+    for k in range(1, quadros):
+        # O quadro escolhido deve continuar o anterior da forma mais natural
+        natural = posicoes[k - 1] + passo_saida
+        modelo = guia[natural:natural + tamanho]
+        nominal = margem - passo_saida + int(round(k * passo_entrada))
+        inicio = max(0, nominal - tolerancia)
+        regiao = guia[inicio:nominal + tolerancia + tamanho]
+        correlacao = np.correlate(regiao, modelo, mode="valid")
+        posicoes[k] = inicio + int(np.argmax(correlacao))
+
+    indices = posicoes[:, None] + np.arange(tamanho)
+    janela = _hann(tamanho)[None, :, None]
+    blocos = sinal[indices] * janela                        # (quadros, tamanho, canais)
+
+    saida = np.zeros(((quadros + 1) * passo_saida, entrada.shape[1]), dtype=np.float32)
+    saida[:quadros * passo_saida] += blocos[:, :passo_saida].reshape(-1, entrada.shape[1])
+    saida[passo_saida:] += blocos[:, passo_saida:].reshape(-1, entrada.shape[1])
+
+    # O primeiro quadro começa meio passo antes do sinal
+    saida = saida[passo_saida:passo_saida + n_saida]
+    saida = np.clip(np.rint(saida), -32768, 32767).astype(np.int16)
+    return saida[:, 0] if mono else saida
+
+
+def alongar_segmento(segmento, fator):
+    """
+    alongar_tempo para um AudioSegment.
+    """
+    if fator == 1.0:
+        return segmento
+    amostras = alongar_tempo(segmento_para_array(segmento), segmento.frame_rate, fator)
+    return array_para_segmento(amostras, segmento.frame_rate)
@@ -0,0 +1,312 @@
+#!/usr/bin/python3
+import math
+import sys
+import queue
+import threading
+from array import array
+from collections import deque
+
+from speech_reading_trainer.modules.audio_buffer import Gravacao
+
+
+def energia_rms(pcm, largura=2):
+    """
+    Energia RMS de um bloco PCM de 16 bits.
+    """
+    if largura != 2 or not pcm:
+        return 0.0
+    amostras = array("h", pcm[:len(pcm) - len(pcm) % 2])
+    if sys.byteorder == "big":
+        amostras.byteswap()
+    return math.sqrt(sum(a * a for a in amostras) / len(amostras))
+
+
+class DetectorVoz:
+    """
+    VAD por energia: calibra o ruído ambiente nos primeiros blocos,
+    detecta o início da fala e encerra após um silêncio contínuo.
+    """
+    def __init__(self, limiar=0, calibracao=0.3, silencio_final=0.9,
+                 fala_minima=0.15, fator_ruido=2.5, limiar_minimo=150):
+        self.limiar = limiar              # 0 = calibrar automaticamente
+        self.calibracao = calibracao      # segundos
+        self.silencio_final = silencio_final
+        self.fala_minima = fala_minima
+        self.fator_ruido = fator_ruido
+        self.limiar_minimo = limiar_minimo
+
+        self._ruido = []
+        self._tempo = 0.0
+        self._tempo_fala = 0.0
+        self._tempo_silencio = 0.0
+        self.falando = False
+
+    def processar(self, energia, duracao):
+        """
+        Recebe a energia de um bloco e a sua duração em segundos.
+        Retorna True quando a fala terminou.
+        """
+        self._tempo += duracao
+
+        if not self.limiar:
+            if self._tempo <= self.calibracao:
+                self._ruido.append(energia)
+                return False
+            media = sum(self._ruido) / len(self._ruido) if self._ruido else 0.0
+            self.limiar = max(self.limiar_minimo, media * self.fator_ruido)
+
+        if energia > self.limiar:
+            self._tempo_fala += duracao
+            self._tempo_silencio = 0.0
+            if self._tempo_fala >= self.fala_minima:
+                self.falando = True
+        else:
+            self._tempo_silencio += duracao
+            if not self.falando:
+                self._tempo_fala = 0.0
+
+        return self.falando and self._tempo_silencio >= self.silencio_final
+
+
+class SessaoGravacao:
+    """
+    Uma gravação do microfone, com ciclo de vida explícito:
+    CRIADA -> GRAVANDO -> FINALIZADA | CANCELADA | FALHOU.
+
+    executar() bloqueia a thread que o chamar até a gravação terminar,
+    seja por parar(), pelo VAD, pelo tempo máximo ou por cancelar().
+    Se abrir a fonte ou processar um bloco falhar, a sessão termina em
+    FALHOU, com a exceção em erro, e executar() a relança.
+    """
+    CRIADA = "created"
+    GRAVANDO = "recording"
+    FINALIZADA = "finished"
+    CANCELADA = "cancelled"
+    FALHOU = "failed"
+
+    def __init__(self, abrir_fonte, detector=None, duracao_maxima=30.0,
+                 espera_maxima=8.0, ao_bloco=None):
+        self.abrir_fonte = abrir_fonte      # () -> AudioSource do speech_recognition
+        self.detector = detector
+        self.duracao_maxima = duracao_maxima
+        self.espera_maxima = espera_maxima  # segundos sem fala antes de desistir
+        self.ao_bloco = ao_bloco            # ao_bloco(pcm), na thread de gravação
+
+        self.estado = self.CRIADA
+        self.motivo = None
+        self.erro = None
+        self.gravacao = None
+        self.taxa = None                    # conhecidos ao abrir a fonte
+        self.largura = None
+        self._parar = threading.Event()
+        self._cancelar = threading.Event()
+
+    @property
+    def ativa(self):
+        return self.estado in (self.CRIADA, self.GRAVANDO)
+
+    def parar(self):
+        """Encerra a captura e mantém o que foi gravado."""
+        self._parar.set()
+
+    def cancelar(self):
+        """Encerra a captura e descarta o áudio."""
+        self._cancelar.set()
+        self._parar.set()
+
+    def executar(self):
+        if self.estado != self.CRIADA:
+            raise RuntimeError("a recording session can only run once")
+        self.estado = self.GRAVANDO
+
+        try:
+            blocos, taxa, largura = self._capturar()
+        except BaseException as e:
+            # Nunca fica em GRAVANDO: quem espera por `ativa` poderia gravar de novo
+            self.erro = e
+            self.motivo = "error"
+            self.estado = self.CANCELADA if self._cancelar.is_set() else self.FALHOU
+            raise
+
+        if self._cancelar.is_set():
+            self.estado = self.CANCELADA
+            return None
+
+        self.gravacao = Gravacao(b"".join(blocos), taxa, largura)
+        self.estado = self.FINALIZADA
+        return self.gravacao
+
+    def _capturar(self):
+        blocos = []
+        duracao = 0.0
+        with self.abrir_fonte() as source:
+            taxa, largura = source.SAMPLE_RATE, source.SAMPLE_WIDTH
+            self.taxa, self.largura = taxa, largura
+            duracao_bloco = source.CHUNK / float(taxa)
+
+            while True:
+                if self._parar.is_set():
+                    self.motivo = "cancelled" if self._cancelar.is_set() else "stopped"
+                    break
+                pcm = source.stream.read(source.CHUNK)
+                if not pcm:
+                    self.motivo = "end_of_stream"
+                    break
+                blocos.append(pcm)
+                duracao += duracao_bloco
+
+                if self.ao_bloco is not None:
+                    self.ao_bloco(pcm)
+
+                if duracao >= self.duracao_maxima:
+                    self.motivo = "max_duration"
+                    break
+                if self.detector is not None:
+                    if self.detector.processar(energia_rms(pcm, largura), duracao_bloco):
+                        self.motivo = "silence"
+                        break
+                    if not self.detector.falando and duracao >= self.espera_maxima:
+                        self.motivo = "no_speech"
+                        break
+        return blocos, taxa, largura
+
+
+class _FonteServico:
+    """
+    Fonte de áudio compatível com SessaoGravacao que lê os blocos do
+    ServicoCaptura, começando pelo pré-roll.
+    """
+    def __init__(self, servico):
+        self.servico = servico
+        self.SAMPLE_RATE = servico.taxa
+        self.SAMPLE_WIDTH = servico.largura
+        self.CHUNK = servico.chunk
+        self.stream = self
+        self._fila = None
+
+    def __enter__(self):
+        self._fila = self.servico._assinar()
+        return self
+
+    def __exit__(self, *args):
+        self.servico._desassinar(self._fila)
+        self._fila = None
+
+    def read(self, tamanho=None):
+        # b"" sinaliza que o serviço foi encerrado
+        return self._fila.get()
+
+
+class ServicoCaptura:
+    """
+    Mantém o microfone aberto em uma thread própria, guardando os últimos
+    blocos em um buffer circular (pré-roll) e estimando o ruído ambiente
+    enquanto ninguém está gravando.
+
+    abrir_fonte() devolve uma fonte para SessaoGravacao que já começa com
+    o pré-roll, de modo que a primeira sílaba não é cortada.
+    """
+    def __init__(self, abrir_microfone, preroll=0.3, suavizacao=0.95):
+        self.abrir_microfone = abrir_microfone
+        self.preroll = preroll            # segundos mantidos antes do Record
+        self.suavizacao = suavizacao      # média móvel do ruído ambiente
+
+        self.taxa = None
+        self.largura = None
+        self.chunk = None
+        self.ruido = None
+
+        self._lock = threading.Lock()
+        self._buffer = None
+        self._fila = None
+        self._parar = threading.Event()
+        self._thread = None
+        self._source = None
+
+    @property
+    def ativo(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def iniciar(self):
+        """
+        Abre o microfone e começa a captura contínua.
+        """
+        if self.ativo:
+            return
+        self._source = self.abrir_microfone()
+        self._source.__enter__()
+        self.taxa = self._source.SAMPLE_RATE
+        self.largura = self._source.SAMPLE_WIDTH
+        self.chunk = self._source.CHUNK
+
+        blocos_preroll = max(1, int(round(self.preroll * self.taxa / self.chunk)))
+        self._buffer = deque(maxlen=blocos_preroll)
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._capturar, name="capture-service", daemon=True)
+        self._thread.start()
+
+    def _capturar(self):
+        try:
+            while not self._parar.is_set():
+                pcm = self._source.stream.read(self.chunk)
+                if not pcm:
+                    break
+                with self._lock:
+                    self._buffer.append(pcm)
+                    fila = self._fila
+                if fila is not None:
+                    fila.put(pcm)
+                else:
+                    energia = energia_rms(pcm, self.largura)
+                    if self.ruido is None:
+                        self.ruido = energia
+                    else:
+                        self.ruido = self.suavizacao * self.ruido + (1 - self.suavizacao) * energia
+        except Exception as e:
+            print(f"Capture service stopped: {e}")
+        finally:
+            with self._lock:
+                fila, self._fila = self._fila, None
+            if fila is not None:
+                fila.put(b"")
+            try:
+                self._source.__exit__(None, None, None)
+            except Exception:
+                pass
+
+    def limiar(self, fator_ruido=2.5, limiar_minimo=150):
+        """
+        Limiar de fala calibrado com o ruído medido entre as gravações,
+        ou 0 se ainda não houver medida.
+        """
+        if self.ruido is None:
+            return 0
+        return max(limiar_minimo, self.ruido * fator_ruido)
+
+    def _assinar(self):
+        fila = queue.Queue()
+        with self._lock:
+            if self._fila is not None:
+                raise RuntimeError("the capture service already has an active recording")
+            for pcm in self._buffer:
+                fila.put(pcm)
+            self._buffer.clear()
+            if not self.ativo:
+                fila.put(b"")
+            self._fila = fila
+        return fila
+
+    def _desassinar(self, fila):
+        with self._lock:
+            if self._fila is fila:
+                self._fila = None
+
+    def abrir_fonte(self):
+        self.iniciar()
+        return _FonteServico(self)
+
+    def encerrar(self):
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        self._thread = None
@@ -0,0 +1,233 @@
+#!/usr/bin/python3
+import heapq
+import itertools
+import threading
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+# Prioridades do QThreadPool: maior sai primeiro da fila
+PRIORIDADE_GRAVACAO = 30
+PRIORIDADE_TTS = 10
+PRIORIDADE_PREFETCH = 0
+
+
+class TarefaCancelada(Exception):
+    """Lançada por uma tarefa que percebeu o cancelamento no meio do caminho."""
+
+
+class TokenCancelamento:
+    """
+    Sinalizador compartilhado entre quem pede o cancelamento e a tarefa,
+    que o consulta nos pontos em que pode parar.
+    """
+    __slots__ = ("_evento",)
+
+    def __init__(self):
+        self._evento = threading.Event()
+
+    def cancelar(self):
+        self._evento.set()
+
+    @property
+    def cancelado(self):
+        return self._evento.is_set()
+
+    def verificar(self):
+        if self._evento.is_set():
+            raise TarefaCancelada()
+
+
+class SinaisTarefa(QObject):
+    """
+    Resultado de uma tarefa, entregue na thread da GUI pelos sinais do Qt.
+    """
+    concluida = pyqtSignal(object)
+    falhou = pyqtSignal(object)
+    cancelada = pyqtSignal()
+
+
+class Tarefa(QRunnable):
+    """
+    Função executada no pool. Emite exatamente um dos sinais de
+    SinaisTarefa: concluida(resultado), falhou(exceção) ou cancelada().
+    """
+    def __init__(self, agendador, funcao, args, kwargs, prioridade, grupo, token):
+        super().__init__()
+        # O agendador guarda a referência Python até o fim da execução
+        self.setAutoDelete(False)
+        self.agendador = agendador
+        self.funcao = funcao
+        self.args = args
+        self.kwargs = kwargs
+        self.prioridade = prioridade
+        self.grupo = grupo
+        self.token = token
+        self.sinais = SinaisTarefa()
+        self._terminou = threading.Event()
+
+    def run(self):
+        try:
+            if self.token.cancelado:
+                self.sinais.cancelada.emit()
+                return
+            try:
+                resultado = self.funcao(*self.args, **self.kwargs)
+            except TarefaCancelada:
+                self.sinais.cancelada.emit()
+            except Exception as e:
+                if self.token.cancelado:
+                    self.sinais.cancelada.emit()
+                else:
+                    self.sinais.falhou.emit(e)
+            else:
+                if self.token.cancelado:
+                    self.sinais.cancelada.emit()
+                else:
+                    self.sinais.concluida.emit(resultado)
+        finally:
+            self._terminou.set()
+            self.agendador._finalizar(self)
+
+    def terminou(self):
+        return self._terminou.is_set()
+
+    def esperar(self, timeout=None):
+        return self._terminou.wait(timeout)
+
+    def cancelar(self):
+        """
+        Cancela a tarefa. Retorna True se ela ainda não tinha começado e
+        foi retirada da fila; se já está rodando, só o token é marcado.
+        """
+        self.token.cancelar()
+        return self.agendador._retirar(self)
+
+
+class AgendadorTarefas:
+    """
+    Agendador único para todo o trabalho de áudio, ASR e TTS, sobre um
+    QThreadPool com número limitado de threads.
+
+    Cada grupo (por exemplo "prefetch") pode ter o seu próprio limite de
+    tarefas simultâneas; as excedentes esperam em uma fila por prioridade,
+    sem ocupar threads do pool.
+    """
+    def __init__(self, max_threads=4, limites=None):
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(max_threads)
+        self.limites = dict(limites or {})
+
+        self._lock = threading.Lock()
+        self._ativas = set()        # tarefas entregues ao pool
+        self._rodando = {}          # grupo -> tarefas no pool
+        self._pendentes = {}        # grupo -> heap (-prioridade, seq, tarefa)
+        self._seq = itertools.count()
+        self._encerrado = False
+
+    def submeter(self, funcao, *args, prioridade=PRIORIDADE_TTS, grupo=None, token=None,
+                 ao_concluir=None, ao_falhar=None, ao_cancelar=None, **kwargs):
+        """
+        Agenda funcao(*args, **kwargs) e retorna a Tarefa.
+        ao_concluir(resultado), ao_falhar(exceção) e ao_cancelar() são
+        conectados antes de a tarefa começar e chamados na thread de quem
+        submeteu (a da GUI).
+        """
+        tarefa = Tarefa(self, funcao, args, kwargs, prioridade, grupo,
+                        token if token is not None else TokenCancelamento())
+        if ao_concluir is not None:
+            tarefa.sinais.concluida.connect(ao_concluir)
+        if ao_falhar is not None:
+            tarefa.sinais.falhou.connect(ao_falhar)
+        if ao_cancelar is not None:
+            tarefa.sinais.cancelada.connect(ao_cancelar)
+        with self._lock:
+            if self._encerrado:
+                tarefa.token.cancelar()
+                tarefa._terminou.set()
+                return tarefa
+            limite = self.limites.get(grupo)
+            if limite is not None and self._rodando.get(grupo, 0) >= limite:
+                heapq.heappush(self._pendentes.setdefault(grupo, []),
+                               (-prioridade, next(self._seq), tarefa))
+                return tarefa
+            self._iniciar(tarefa)
+        return tarefa
+
+    def _iniciar(self, tarefa):
+        # Chamado com self._lock
+        self._ativas.add(tarefa)
+        self._rodando[tarefa.grupo] = self._rodando.get(tarefa.grupo, 0) + 1
+        self.pool.start(tarefa, tarefa.prioridade)
+
+    def _finalizar(self, tarefa):
+        with self._lock:
+            if tarefa not in self._ativas:
+                return
+            self._ativas.discard(tarefa)
+            self._rodando[tarefa.grupo] -= 1
+            descartadas = self._proxima(tarefa.grupo)
+        self._avisar_canceladas(descartadas)
+
+    def _proxima(self, grupo):
+        """
+        Chamado com self._lock: libera a próxima pendente do grupo.
+        Retorna as pendentes descartadas por já estarem canceladas; quem
+        chamou emite cancelada() por elas depois de soltar o lock.
+        """
+        descartadas = []
+        fila = self._pendentes.get(grupo)
+        while fila and not self._encerrado:
+            _, _, proxima = heapq.heappop(fila)
+            if proxima.token.cancelado:
+                descartadas.append(proxima)
+                continue
+            self._iniciar(proxima)
+            break
+        return descartadas
+
+    @staticmethod
+    def _avisar_canceladas(tarefas):
+        # Fora do lock: um slot conectado diretamente pode submeter ou cancelar
+        for tarefa in tarefas:
+            tarefa._terminou.set()
+            tarefa.sinais.cancelada.emit()
+
+    def _retirar(self, tarefa):
+        descartadas = []
+        with self._lock:
+            fila = self._pendentes.get(tarefa.grupo, [])
+            for k, item in enumerate(fila):
+                if item[2] is tarefa:
+                    fila.pop(k)
+                    heapq.heapify(fila)
+                    break
+            else:
+                if tarefa not in self._ativas or not self.pool.tryTake(tarefa):
+                    return False
+                self._ativas.discard(tarefa)
+                self._rodando[tarefa.grupo] -= 1
+                descartadas = self._proxima(tarefa.grupo)
+        self._avisar_canceladas([tarefa] + descartadas)
+        return True
+
+    def cancelar_grupo(self, grupo):
+        """Cancela todas as tarefas, pendentes ou rodando, do grupo."""
+        with self._lock:
+            tarefas = [t for t in self._ativas if t.grupo == grupo]
+            tarefas += [item[2] for item in self._pendentes.get(grupo, [])]
+        for tarefa in tarefas:
+            tarefa.cancelar()
+
+    def encerrar(self, espera_ms=2000):
+        """
+        Cancela tudo e espera, por no máximo espera_ms, as tarefas em execução.
+        """
+        with self._lock:
+            self._encerrado = True
+            tarefas = list(self._ativas)
+            tarefas += [item[2] for fila in self._pendentes.values() for item in fila]
+            self._pendentes.clear()
+        for tarefa in tarefas:
+            tarefa.token.cancelar()
+        self.pool.clear()
+        self.pool.waitForDone(espera_ms)
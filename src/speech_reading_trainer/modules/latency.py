@@ -0,0 +1,192 @@
+#!/usr/bin/python3
+import os
+import json
+import time
+import threading
+from array import array
+
+# Etapas medidas pelo programa, na ordem em que aparecem no relatório
+ETAPA_GRAVACAO = "record"
+ETAPA_ASR = "asr"
+ETAPA_RENDERIZACAO = "render"
+ETAPA_GRAVAR_ATE_TRANSCRICAO = "record_to_transcript"
+ETAPA_PONTUACAO = "score"
+ETAPA_SINTESE_TTS = "tts_synthesis"
+ETAPA_DECODIFICACAO_MP3 = "mp3_decode"
+ETAPA_ALONGAMENTO = "tts_stretch"
+ETAPA_INICIO_REPRODUCAO = "playback_start"
+
+ETAPAS = (
+    ETAPA_GRAVACAO, ETAPA_ASR, ETAPA_RENDERIZACAO, ETAPA_GRAVAR_ATE_TRANSCRICAO,
+    ETAPA_PONTUACAO, ETAPA_SINTESE_TTS, ETAPA_DECODIFICACAO_MP3, ETAPA_ALONGAMENTO,
+    ETAPA_INICIO_REPRODUCAO,
+)
+
+PERCENTIS = (50, 95, 99)
+
+_METRICA_PROMETHEUS = "speech_reading_trainer_stage_latency_seconds"
+
+
+class HistogramaLatencia:
+    """
+    Últimas `capacidade` durações de uma etapa, num buffer circular.
+    Registrar é O(1) e sem alocação; os percentis são calculados só
+    quando pedidos, sobre uma cópia ordenada.
+    """
+    __slots__ = ("capacidade", "_valores", "_proximo", "contagem", "soma", "maximo")
+
+    def __init__(self, capacidade=1024):
+        self.capacidade = max(1, int(capacidade))
+        self._valores = array("d", bytes(8 * self.capacidade))
+        self._proximo = 0
+        self.contagem = 0       # desde o início, não só as da janela
+        self.soma = 0.0
+        self.maximo = 0.0
+
+    def registrar(self, segundos):
+        self._valores[self._proximo] = segundos
+        self._proximo = (self._proximo + 1) % self.capacidade
+        self.contagem += 1
+        self.soma += segundos
+        if segundos > self.maximo:
+            self.maximo = segundos
+
+    def valores(self):
+        """Durações na janela atual, da mais antiga para a mais recente."""
+        if self.contagem < self.capacidade:
+            return self._valores[:self.contagem].tolist()
+        return (self._valores[self._proximo:] + self._valores[:self._proximo]).tolist()
+
+    def percentis(self, percentis=PERCENTIS):
+        """{p: duração} pelo método do posto mais próximo, ou {} se vazio."""
+        ordenados = sorted(self.valores())
+        if not ordenados:
+            return {}
+        n = len(ordenados)
+        return {p: ordenados[min(n - 1, max(0, -(-p * n // 100) - 1))] for p in percentis}
+
+    def resumo(self):
+        resultado = {
+            "count": self.contagem,
+            "sum": self.soma,
+            "mean": self.soma / self.contagem if self.contagem else 0.0,
+            "max": self.maximo,
+        }
+        for p, valor in self.percentis().items():
+            resultado[f"p{p}"] = valor
+        return resultado
+
+
+class _Cronometro:
+    __slots__ = ("medidor", "etapa", "inicio")
+
+    def __init__(self, medidor, etapa):
+        self.medidor = medidor
+        self.etapa = etapa
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, valor, rastro):
+        # Etapas que falharam não entram na distribuição
+        if tipo is None:
+            self.medidor.registrar(self.etapa, time.perf_counter() - self.inicio)
+        return False
+
+
+class MedidorLatencia:
+    """
+    Histogramas de latência por etapa, compartilhados entre threads.
+
+        with MEDIDOR.medir(ETAPA_ASR):
+            texto = backend.transcrever(audio)
+    """
+    def __init__(self, capacidade=1024):
+        self.capacidade = capacidade
+        self.ativo = True
+        self._lock = threading.Lock()
+        self._histogramas = {}
+
+    def configurar(self, capacidade=None, ativo=None):
+        """Muda o tamanho das janelas (descartando o histórico) e/ou liga e desliga."""
+        with self._lock:
+            if capacidade is not None and capacidade != self.capacidade:
+                self.capacidade = capacidade
+                self._histogramas = {}
+            if ativo is not None:
+                self.ativo = ativo
+
+    def medir(self, etapa):
+        return _Cronometro(self, etapa)
+
+    def registrar(self, etapa, segundos):
+        if not self.ativo:
+            return
+        with self._lock:
+            histograma = self._histogramas.get(etapa)
+            if histograma is None:
+                histograma = self._histogramas[etapa] = HistogramaLatencia(self.capacidade)
+            histograma.registrar(segundos)
+
+    def limpar(self):
+        with self._lock:
+            self._histogramas = {}
+
+    def resumo(self):
+        """
+        {etapa: {"count", "sum", "mean", "max", "p50", "p95", "p99"}} em segundos,
+        com as etapas conhecidas primeiro.
+        """
+        with self._lock:
+            histogramas = dict(self._histogramas)
+            resumos = {etapa: h.resumo() for etapa, h in histogramas.items()}
+        ordem = [e for e in ETAPAS if e in resumos]
+        ordem += sorted(e for e in resumos if e not in ETAPAS)
+        return {etapa: resumos[etapa] for etapa in ordem}
+
+    # ---------- exportação ----------
+
+    def para_json(self):
+        return json.dumps({"unit": "seconds", "stages": self.resumo()}, indent=4)
+
+    def para_prometheus(self):
+        """Formato de texto do Prometheus (um summary com rótulo stage)."""
+        linhas = [
+            f"# HELP {_METRICA_PROMETHEUS} Latency of each processing stage.",
+            f"# TYPE {_METRICA_PROMETHEUS} summary",
+        ]
+        for etapa, resumo in self.resumo().items():
+            for p in PERCENTIS:
+                if f"p{p}" in resumo:
+                    linhas.append(f'{_METRICA_PROMETHEUS}{{stage="{etapa}",quantile="{p / 100:g}"}} '
+                                  f'{resumo[f"p{p}"]:.6f}')
+            linhas.append(f'{_METRICA_PROMETHEUS}_sum{{stage="{etapa}"}} '
+                          f'{resumo["sum"]:.6f}')
+            linhas.append(f'{_METRICA_PROMETHEUS}_count{{stage="{etapa}"}} {resumo["count"]}')
+        return "\n".join(linhas) + "\n"
+
+    def exportar(self, caminho, formato=None):
+        """
+        Grava o resumo em caminho, de forma atômica. formato é "json" ou
+        "prometheus"; sem ele, é deduzido da extensão (.json ou não).
+        """
+        if formato is None:
+            formato = "json" if caminho.lower().endswith(".json") else "prometheus"
+        if formato == "json":
+            conteudo = self.para_json()
+        elif formato == "prometheus":
+            conteudo = self.para_prometheus()
+        else:
+            raise ValueError(f"Unknown latency export format: {formato}")
+
+        caminho = os.path.expanduser(caminho)
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        temp = caminho + ".tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            f.write(conteudo)
+        os.replace(temp, caminho)
+
+
+# Medidor do processo: os módulos registram aqui, a janela lê e exporta
+MEDIDOR = MedidorLatencia()
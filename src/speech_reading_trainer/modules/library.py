@@ -0,0 +1,221 @@
+#!/usr/bin/python3
+import os
+import time
+import threading
+
+from speech_reading_trainer.modules.sentence_index import metadados_indice
+from speech_reading_trainer.modules.sqlite_writer import EscritorSQLite, conectar
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    path           TEXT PRIMARY KEY,
+    folder         TEXT NOT NULL,
+    size           INTEGER NOT NULL,
+    mtime_ns       INTEGER NOT NULL,
+    sentences      INTEGER NOT NULL,
+    words          INTEGER NOT NULL,
+    position       INTEGER NOT NULL DEFAULT 0,
+    best_accuracy  REAL,
+    opened_at      REAL
+);
+CREATE INDEX IF NOT EXISTS documents_folder ON documents(folder);
+"""
+
+_COLUNAS = "path, sentences, words, position, best_accuracy, opened_at"
+
+EXTENSOES = (".txt",)
+
+
+class DocumentoBiblioteca:
+    """
+    Metadados de um texto da biblioteca.
+    """
+    __slots__ = ("caminho", "frases", "palavras", "posicao", "melhor_acuracia", "aberto_em")
+
+    def __init__(self, caminho, frases, palavras, posicao=0, melhor_acuracia=None, aberto_em=None):
+        self.caminho = caminho
+        self.frases = frases
+        self.palavras = palavras
+        self.posicao = posicao
+        self.melhor_acuracia = melhor_acuracia   # em %, ou None se nunca concluído
+        self.aberto_em = aberto_em
+
+    @property
+    def progresso(self):
+        """Fração das frases já lidas, de 0 a 1."""
+        return min(1.0, self.posicao / self.frases) if self.frases else 0.0
+
+
+class ResultadoSincronizacao:
+    __slots__ = ("pasta", "documentos", "lidos", "removidos", "falhas")
+
+    def __init__(self, pasta, documentos, lidos, removidos, falhas):
+        self.pasta = pasta
+        self.documentos = documentos    # [DocumentoBiblioteca], ordenados pelo caminho
+        self.lidos = lidos              # arquivos novos ou modificados
+        self.removidos = removidos
+        self.falhas = falhas            # [(caminho, mensagem)]
+
+
+def listar_textos(pasta, extensoes=EXTENSOES):
+    """
+    {caminho absoluto: (tamanho, mtime_ns)} dos textos da pasta e das
+    subpastas. Usa só os dados de os.scandir: nenhum arquivo é aberto.
+    """
+    encontrados = {}
+    pendentes = [os.path.abspath(pasta)]
+    while pendentes:
+        atual = pendentes.pop()
+        try:
+            entradas = os.scandir(atual)
+        except OSError:
+            continue
+        with entradas:
+            for entrada in entradas:
+                try:
+                    if entrada.is_dir(follow_symlinks=False):
+                        if not entrada.name.startswith("."):
+                            pendentes.append(entrada.path)
+                    elif entrada.name.lower().endswith(extensoes) and entrada.is_file():
+                        st = entrada.stat()
+                        encontrados[entrada.path] = (st.st_size, st.st_mtime_ns)
+                except OSError:
+                    continue
+    return encontrados
+
+
+class Biblioteca:
+    """
+    Índice persistente (SQLite) dos textos de uma ou mais pastas, com o
+    número de frases e de palavras, a posição de leitura e a melhor
+    acurácia de cada um.
+
+    A sincronização compara tamanho e data de modificação de cada arquivo
+    com o que está no índice e só segmenta os novos ou modificados; os
+    demais nem são abertos. Pode rodar fora da thread da GUI.
+
+    Progresso, aberturas e acurácias vão para um EscritorSQLite: a thread
+    da GUI registra sem esperar pelo commit.
+    """
+    def __init__(self, caminho, pasta_indice, tamanho_maximo=125):
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        self.caminho = caminho
+        self.pasta_indice = pasta_indice
+        self.tamanho_maximo = tamanho_maximo
+
+        self._lock = threading.Lock()
+        self._con = conectar(caminho)
+        self._con.executescript(_ESQUEMA)
+        self._con.commit()
+        self._escritor = EscritorSQLite(caminho, "library")
+
+    # ---------- leitura ----------
+
+    def documentos(self, pasta):
+        """Documentos já indexados da pasta (e subpastas), sem tocar no disco."""
+        pasta = os.path.abspath(pasta)
+        with self._lock:
+            linhas = self._con.execute(
+                f"SELECT {_COLUNAS} FROM documents WHERE folder = ? ORDER BY path",
+                (pasta,)).fetchall()
+        return [DocumentoBiblioteca(*linha) for linha in linhas]
+
+    def documento(self, caminho):
+        with self._lock:
+            linha = self._con.execute(
+                f"SELECT {_COLUNAS} FROM documents WHERE path = ?",
+                (os.path.abspath(caminho),)).fetchone()
+        return DocumentoBiblioteca(*linha) if linha else None
+
+    # ---------- sincronização ----------
+
+    def sincronizar(self, pasta, token=None, sessoes=None):
+        """
+        Atualiza o índice da pasta e retorna um ResultadoSincronizacao.
+        token (TokenCancelamento) é consultado entre um arquivo e outro;
+        sessoes, se dado, é passado para importar_sessoes.
+        """
+        pasta = os.path.abspath(pasta)
+        no_disco = listar_textos(pasta)
+        with self._lock:
+            conhecidos = {caminho: (tamanho, mtime_ns) for caminho, tamanho, mtime_ns
+                          in self._con.execute(
+                              "SELECT path, size, mtime_ns FROM documents WHERE folder = ?",
+                              (pasta,))}
+
+        mudados = sorted(c for c, assinatura in no_disco.items()
+                         if conhecidos.get(c) != assinatura)
+        removidos = [c for c in conhecidos if c not in no_disco]
+
+        # A segmentação fica fora do lock: a GUI continua podendo ler a biblioteca
+        linhas = []
+        falhas = []
+        for caminho in mudados:
+            if token is not None:
+                token.verificar()
+            try:
+                meta = metadados_indice(caminho, self.pasta_indice, self.tamanho_maximo)
+            except (OSError, UnicodeDecodeError) as e:
+                falhas.append((caminho, str(e)))
+                continue
+            linhas.append((caminho, pasta, meta["size"], meta["mtime_ns"], meta["count"],
+                           meta.get("words", 0), min(meta.get("position", 0), meta["count"])))
+
+        with self._lock, self._con:
+            self._con.executemany(
+                "INSERT INTO documents (path, folder, size, mtime_ns, sentences, words, position)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(path) DO UPDATE SET folder = excluded.folder,"
+                " size = excluded.size, mtime_ns = excluded.mtime_ns,"
+                " sentences = excluded.sentences, words = excluded.words,"
+                " position = excluded.position",
+                linhas)
+            self._con.executemany("DELETE FROM documents WHERE path = ?",
+                                  [(c,) for c in removidos])
+
+        if sessoes:
+            self.importar_sessoes(sessoes)
+        # O resultado já inclui o progresso que ainda estava na fila
+        self._escritor.esperar()
+        return ResultadoSincronizacao(pasta, self.documentos(pasta), len(linhas),
+                                      len(removidos), falhas)
+
+    # ---------- progresso ----------
+
+    def registrar_progresso(self, caminho, posicao):
+        """Guarda a posição de leitura (só de textos que estão na biblioteca)."""
+        self._escritor.enfileirar("UPDATE documents SET position = ? WHERE path = ?",
+                                  (posicao, os.path.abspath(caminho)))
+
+    def registrar_abertura(self, caminho):
+        self._escritor.enfileirar("UPDATE documents SET opened_at = ? WHERE path = ?",
+                                  (time.time(), os.path.abspath(caminho)))
+
+    def registrar_acuracias(self, acuracias):
+        """
+        Mantém a maior acurácia de cada texto. acuracias é
+        [(caminho, acurácia em %)] de passadas completas.
+        """
+        for caminho, acuracia in acuracias:
+            self._escritor.enfileirar(
+                "UPDATE documents SET best_accuracy = MAX(COALESCE(best_accuracy, 0), ?)"
+                " WHERE path = ?",
+                (acuracia, os.path.abspath(caminho)))
+
+    def importar_sessoes(self, sessoes):
+        """
+        Preenche a melhor acurácia a partir do registro de sessões
+        (RegistroSessao.acuracias_sessoes): contam só as sessões que
+        avaliaram todas as frases do texto.
+        """
+        with self._lock:
+            frases = dict(self._con.execute("SELECT path, sentences FROM documents"))
+        completas = [(arquivo, acuracia) for arquivo, avaliadas, acuracia in sessoes
+                     if arquivo in frases and frases[arquivo] and avaliadas >= frases[arquivo]]
+        if completas:
+            self.registrar_acuracias(completas)
+
+    def close(self):
+        self._escritor.encerrar()
+        with self._lock:
+            self._con.close()
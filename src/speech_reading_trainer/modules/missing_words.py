@@ -0,0 +1,193 @@
+#!/usr/bin/python3
+import os
+import bisect
+
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex
+
+# Com mais linhas que isto por palavra, o diário é compactado na abertura
+_FATOR_COMPACTACAO = 4
+
+
+class DiarioPalavras:
+    """
+    Contagens de erros por palavra, persistidas por acréscimo: cada
+    mudança vira uma linha "palavra<TAB>incremento" (negativo quando um
+    erro é descontado) no fim do arquivo.
+    """
+    def __init__(self, caminho):
+        self.caminho = caminho
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        self._arquivo = None
+
+    def existe(self):
+        return os.path.exists(self.caminho)
+
+    def carregar(self):
+        """
+        Reproduz o diário e retorna {palavra: contagem}.
+        """
+        contagens = {}
+        linhas = 0
+        if self.existe():
+            with open(self.caminho, "r", encoding="utf-8") as f:
+                for linha in f:
+                    palavra, _, incremento = linha.rstrip("\n").partition("\t")
+                    if not palavra:
+                        continue
+                    try:
+                        contagens[palavra] = contagens.get(palavra, 0) + int(incremento or 1)
+                    except ValueError:
+                        continue
+                    linhas += 1
+        if linhas > _FATOR_COMPACTACAO * max(len(contagens), 1):
+            # Palavras descontadas até zero não voltam para o arquivo
+            contagens = {p: n for p, n in contagens.items() if n > 0}
+            self.reescrever(contagens)
+        return contagens
+
+    def _aberto(self):
+        if self._arquivo is None:
+            self._arquivo = open(self.caminho, "a", encoding="utf-8")
+        return self._arquivo
+
+    def acrescentar(self, incrementos):
+        """Grava [(palavra, incremento), ...] no fim do diário."""
+        f = self._aberto()
+        f.write("".join(f"{p}\t{n}\n" for p, n in incrementos))
+        f.flush()
+
+    def reescrever(self, contagens):
+        self.fechar()
+        temp = self.caminho + ".tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            for palavra, n in contagens.items():
+                f.write(f"{palavra}\t{n}\n")
+        os.replace(temp, self.caminho)
+
+    def fechar(self):
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+
+
+class ModeloPalavrasFaltantes(QAbstractListModel):
+    """
+    Lista ordenada das palavras faltantes com o número de erros de cada uma.
+    Palavras novas entram como linhas inseridas na posição certa e as já
+    existentes só têm a contagem atualizada: a view nunca é reiniciada e
+    mantém a rolagem.
+    """
+    ContagemRole = Qt.UserRole + 1
+
+    def __init__(self, diario=None, parent=None):
+        super().__init__(parent)
+        self.diario = diario
+        self._palavras = []      # ordenada
+        self._contagens = {}
+        if diario is not None:
+            self._carregar(diario.carregar())
+
+    def _carregar(self, contagens):
+        self.beginResetModel()
+        self._contagens = {p: n for p, n in contagens.items() if n > 0}
+        self._palavras = sorted(self._contagens)
+        self.endResetModel()
+
+    # ---------- QAbstractListModel ----------
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._palavras)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._palavras):
+            return None
+        palavra = self._palavras[index.row()]
+        if role == Qt.DisplayRole:
+            n = self._contagens[palavra]
+            return f"{palavra} ({n})" if n > 1 else palavra
+        if role == Qt.ToolTipRole or role == self.ContagemRole:
+            return self._contagens[palavra]
+        return None
+
+    # ---------- operações ----------
+
+    def __len__(self):
+        return len(self._palavras)
+
+    def __bool__(self):
+        return bool(self._palavras)
+
+    def __contains__(self, palavra):
+        return palavra in self._contagens
+
+    def __iter__(self):
+        return iter(self._palavras)
+
+    def contagem(self, palavra):
+        return self._contagens.get(palavra, 0)
+
+    def adicionar(self, palavras):
+        """
+        Conta mais um erro para cada palavra, inserindo as novas em ordem.
+        """
+        incrementos = []
+        for palavra in palavras:
+            if not palavra:
+                continue
+            incrementos.append((palavra, 1))
+            if palavra in self._contagens:
+                self._contagens[palavra] += 1
+                linha = bisect.bisect_left(self._palavras, palavra)
+                indice = self.index(linha)
+                self.dataChanged.emit(indice, indice, [Qt.DisplayRole, Qt.ToolTipRole])
+            else:
+                linha = bisect.bisect_left(self._palavras, palavra)
+                self.beginInsertRows(QModelIndex(), linha, linha)
+                self._palavras.insert(linha, palavra)
+                self._contagens[palavra] = 1
+                self.endInsertRows()
+        if incrementos and self.diario is not None:
+            self.diario.acrescentar(incrementos)
+
+    def descontar(self, palavras):
+        """
+        Tira um erro de cada palavra da lista (as que não estão nela são
+        ignoradas); a que chega a zero sai da lista.
+        """
+        incrementos = []
+        for palavra in palavras:
+            if palavra not in self._contagens:
+                continue
+            incrementos.append((palavra, -1))
+            linha = bisect.bisect_left(self._palavras, palavra)
+            if self._contagens[palavra] > 1:
+                self._contagens[palavra] -= 1
+                indice = self.index(linha)
+                self.dataChanged.emit(indice, indice, [Qt.DisplayRole, Qt.ToolTipRole])
+            else:
+                self.beginRemoveRows(QModelIndex(), linha, linha)
+                del self._palavras[linha]
+                del self._contagens[palavra]
+                self.endRemoveRows()
+        if incrementos and self.diario is not None:
+            self.diario.acrescentar(incrementos)
+
+    def contagens(self):
+        """{palavra: erros}."""
+        return dict(self._contagens)
+
+    def limpar(self):
+        self._carregar({})
+        if self.diario is not None:
+            self.diario.reescrever({})
+
+    def salvar_lista(self, caminho):
+        """Exporta as palavras em ordem alfabética, uma por linha."""
+        with open(caminho, "w", encoding="utf-8") as f:
+            f.writelines(p + "\n" for p in self._palavras)
+
+    def fechar(self):
+        if self.diario is not None:
+            self.diario.fechar()
@@ -0,0 +1,191 @@
+#!/usr/bin/python3
+import time
+import itertools
+import threading
+from collections import deque
+
+from speech_reading_trainer.modules.latency import MEDIDOR, ETAPA_INICIO_REPRODUCAO
+
+
+class SaidaPyAudio:
+    """
+    Stream de saída PyAudio mantido aberto entre as reproduções.
+    """
+    def __init__(self, taxa, canais, largura, frames_por_bloco):
+        import pyaudio
+
+        self._pa = pyaudio.PyAudio()
+        self._stream = self._pa.open(format=self._pa.get_format_from_width(largura),
+                                     channels=canais, rate=taxa, output=True,
+                                     frames_per_buffer=frames_por_bloco)
+
+    def write(self, pcm):
+        self._stream.write(pcm)
+
+    def close(self):
+        try:
+            self._stream.stop_stream()
+            self._stream.close()
+        finally:
+            self._pa.terminate()
+
+
+class ItemReproducao:
+    __slots__ = ("id", "audio", "pcm", "tocados", "interrompido", "pedido")
+
+    def __init__(self, id, audio):
+        self.id = id
+        self.audio = audio          # AudioSegment ou Gravacao
+        self.pcm = None             # já no formato do dispositivo
+        self.tocados = 0            # bytes entregues ao dispositivo
+        self.interrompido = False
+        self.pedido = time.perf_counter()
+
+
+class MotorReproducao:
+    """
+    Reprodução por um único dispositivo de saída, aberto uma vez e mantido
+    por uma thread própria, com fila, parada e preempção.
+
+    Todo áudio é convertido para o formato do dispositivo (taxa, canais,
+    largura) e escrito em blocos curtos: parar ou preemptar interrompe a
+    reprodução no próximo bloco, e começar a tocar não abre processo nem
+    stream novo.
+    """
+    def __init__(self, abrir_saida=SaidaPyAudio, taxa=44100, canais=1, largura=2, bloco_ms=20):
+        self.abrir_saida = abrir_saida
+        self.taxa = taxa
+        self.canais = canais
+        self.largura = largura
+        self.frames_por_bloco = max(1, taxa * bloco_ms // 1000)
+
+        self._cond = threading.Condition()
+        self._fila = deque()
+        self._atual = None
+        self._ids = itertools.count(1)
+        self._encerrar = False
+        self._thread = None
+        self._saida = None
+
+    @property
+    def bytes_por_segundo(self):
+        return self.taxa * self.canais * self.largura
+
+    def _iniciar(self):
+        # Chamado com self._cond
+        if self._thread is None or not self._thread.is_alive():
+            self._encerrar = False
+            self._thread = threading.Thread(target=self._reproduzir,
+                                            name="playback-engine", daemon=True)
+            self._thread.start()
+
+    def tocar(self, audio, preemptar=True):
+        """
+        Toca um AudioSegment ou uma Gravacao e retorna o id da reprodução.
+        Com preemptar, o que está tocando e o que está na fila são
+        descartados; sem, o áudio entra no fim da fila.
+        """
+        with self._cond:
+            if preemptar:
+                self._descartar()
+            item = ItemReproducao(next(self._ids), audio)
+            self._fila.append(item)
+            self._iniciar()
+            self._cond.notify()
+            return item.id
+
+    def enfileirar(self, audio):
+        return self.tocar(audio, preemptar=False)
+
+    def _descartar(self):
+        # Chamado com self._cond
+        self._fila.clear()
+        if self._atual is not None:
+            self._atual.interrompido = True
+
+    def parar(self):
+        """Interrompe a reprodução atual e esvazia a fila."""
+        with self._cond:
+            self._descartar()
+
+    @property
+    def tocando(self):
+        with self._cond:
+            return self._atual is not None or bool(self._fila)
+
+    def posicao(self):
+        """
+        (id, segundos tocados, duração em segundos) da reprodução atual,
+        ou None se nada está tocando.
+        """
+        with self._cond:
+            item = self._atual
+        if item is None or item.pcm is None:
+            return None
+        return (item.id, item.tocados / self.bytes_por_segundo,
+                len(item.pcm) / self.bytes_por_segundo)
+
+    def _converter(self, audio):
+        if hasattr(audio, "para_segmento"):
+            audio = audio.para_segmento()
+        segmento = audio
+        if segmento.frame_rate != self.taxa:
+            segmento = segmento.set_frame_rate(self.taxa)
+        if segmento.channels != self.canais:
+            segmento = segmento.set_channels(self.canais)
+        if segmento.sample_width != self.largura:
+            segmento = segmento.set_sample_width(self.largura)
+        return segmento.raw_data
+
+    def _reproduzir(self):
+        bloco = self.frames_por_bloco * self.canais * self.largura
+        while True:
+            with self._cond:
+                while not self._fila and not self._encerrar:
+                    self._cond.wait()
+                if self._encerrar:
+                    break
+                item = self._fila.popleft()
+                self._atual = item
+
+            try:
+                item.pcm = self._converter(item.audio)
+                if self._saida is None:
+                    self._saida = self.abrir_saida(self.taxa, self.canais, self.largura,
+                                                   self.frames_por_bloco)
+                pcm = memoryview(item.pcm)
+                for inicio in range(0, len(pcm), bloco):
+                    if item.interrompido or self._encerrar:
+                        break
+                    self._saida.write(bytes(pcm[inicio:inicio + bloco]))
+                    if inicio == 0:
+                        # Do pedido até o primeiro bloco aceito pelo dispositivo
+                        MEDIDOR.registrar(ETAPA_INICIO_REPRODUCAO,
+                                          time.perf_counter() - item.pedido)
+                    item.tocados = min(inicio + bloco, len(pcm))
+            except Exception as e:
+                print(f"Playback failed: {e}")
+                self._fechar_saida()
+            finally:
+                with self._cond:
+                    self._atual = None
+
+        self._fechar_saida()
+
+    def _fechar_saida(self):
+        if self._saida is not None:
+            try:
+                self._saida.close()
+            except Exception:
+                pass
+            self._saida = None
+
+    def encerrar(self):
+        with self._cond:
+            self._descartar()
+            self._encerrar = True
+            self._cond.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout=1.0)
+        self._thread = None
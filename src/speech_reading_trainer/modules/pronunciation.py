@@ -0,0 +1,281 @@
+#!/usr/bin/python3
+import os
+import re
+import mmap
+import zlib
+import struct
+import hashlib
+
+from speech_reading_trainer.modules.scoring import normalizar_palavra, SUBSTITUICAO
+
+# Incrementar quando o formato do índice mudar
+VERSAO_LEXICO = 1
+
+_MAGICA = b"SRTLEX01"
+# magica, versão, tamanho e mtime_ns do dicionário de origem, número de
+# slots, número de palavras, tamanhos das tabelas de fonemas, palavras
+# e pronúncias
+_CABECALHO = struct.Struct("<8sIQqIIIII")
+# hash da palavra, offset da palavra, offset das pronúncias
+_SLOT = struct.Struct("<III")
+_VAZIO = 0xFFFFFFFF
+
+_VARIANTE = re.compile(r"\(\d+\)$")
+_ACENTO = re.compile(r"\d")
+
+# Pares que só diferem pelo vozeamento custam meia substituição
+_PARES_VOZEAMENTO = [("P", "B"), ("T", "D"), ("K", "G"), ("F", "V"),
+                     ("TH", "DH"), ("S", "Z"), ("SH", "ZH"), ("CH", "JH")]
+# Fonemas da mesma classe também. As vogais ficam em três classes
+# (anteriores, centrais/posteriores e ditongos): trocar uma vogal por
+# qualquer outra não é, por si só, uma troca próxima
+_CLASSES = [
+    {"IY", "IH", "EY", "EH", "AE"},
+    {"AA", "AO", "AH", "ER", "UH", "UW", "OW"},
+    {"AY", "AW", "OY"},
+    {"M", "N", "NG"},
+    {"L", "R"},
+    {"W", "Y"},
+]
+_CUSTO_PROXIMO = 0.5
+
+# Abaixo desta similaridade a substituição é um erro comum, sem crédito
+SIMILARIDADE_MINIMA = 0.6
+
+_PROXIMOS = set()
+for _a, _b in _PARES_VOZEAMENTO:
+    _PROXIMOS.add((_a, _b))
+    _PROXIMOS.add((_b, _a))
+for _classe in _CLASSES:
+    _PROXIMOS.update((_a, _b) for _a in _classe for _b in _classe if _a != _b)
+
+
+def _hash(chave):
+    return zlib.crc32(chave)
+
+
+def _chave(caminho_arquivo):
+    caminho = os.path.abspath(caminho_arquivo)
+    return hashlib.sha1(caminho.encode("utf-8")).hexdigest()
+
+
+def ler_dicionario(caminho_dicionario):
+    """
+    Lê um dicionário no formato do CMUdict ("PALAVRA  F1 F2 ...", com
+    variantes "PALAVRA(2)" e comentários ";;;") e gera (palavra, fonemas),
+    com a palavra normalizada como no alinhamento e sem as marcas de acento.
+    """
+    with open(caminho_dicionario, "r", encoding="latin-1") as f:
+        for linha in f:
+            if not linha.strip() or linha.startswith(";;;"):
+                continue
+            partes = linha.split()
+            palavra = normalizar_palavra(_VARIANTE.sub("", partes[0]))
+            fonemas = tuple(_ACENTO.sub("", p) for p in partes[1:])
+            if palavra and fonemas:
+                yield palavra, fonemas
+
+
+def compilar_lexico(caminho_dicionario, caminho_indice):
+    """
+    Compila o dicionário em um índice binário com uma tabela hash de
+    endereçamento aberto, pronto para ser mapeado na memória.
+    """
+    entradas = {}
+    for palavra, fonemas in ler_dicionario(caminho_dicionario):
+        variantes = entradas.setdefault(palavra, [])
+        if fonemas not in variantes:
+            variantes.append(fonemas)
+
+    simbolos = sorted({f for variantes in entradas.values() for v in variantes for f in v})
+    ids = {s: i for i, s in enumerate(simbolos)}
+    tabela_fonemas = " ".join(simbolos).encode("ascii")
+
+    # Fator de carga de no máximo 1/2: sondagens curtas
+    n_slots = 1
+    while n_slots < 2 * len(entradas):
+        n_slots <<= 1
+    slots = [(0, _VAZIO, _VAZIO)] * n_slots
+
+    palavras = bytearray()
+    pronuncias = bytearray()
+    for palavra, variantes in entradas.items():
+        dados = palavra.encode("utf-8")[:255]
+        h = _hash(dados)
+        k = h & (n_slots - 1)
+        while slots[k][1] != _VAZIO:
+            k = (k + 1) & (n_slots - 1)
+        slots[k] = (h, len(palavras), len(pronuncias))
+
+        palavras.append(len(dados))
+        palavras += dados
+        variantes = [v[:255] for v in variantes[:255]]
+        pronuncias.append(len(variantes))
+        for v in variantes:
+            pronuncias.append(len(v))
+            pronuncias += bytes(ids[f] for f in v)
+
+    st = os.stat(caminho_dicionario)
+    cabecalho = _CABECALHO.pack(_MAGICA, VERSAO_LEXICO, st.st_size, st.st_mtime_ns,
+                                n_slots, len(entradas), len(tabela_fonemas),
+                                len(palavras), len(pronuncias))
+
+    os.makedirs(os.path.dirname(os.path.abspath(caminho_indice)), exist_ok=True)
+    with open(caminho_indice + ".tmp", "wb") as f:
+        f.write(cabecalho)
+        f.write(tabela_fonemas)
+        for slot in slots:
+            f.write(_SLOT.pack(*slot))
+        f.write(palavras)
+        f.write(pronuncias)
+    os.replace(caminho_indice + ".tmp", caminho_indice)
+
+
+class LexicoPronuncia:
+    """
+    Dicionário de pronúncias apoiado em um índice mapeado na memória.
+    Abrir não lê nem analisa o dicionário; cada consulta é O(1).
+    """
+    def __init__(self, caminho_indice):
+        self.caminho = caminho_indice
+        self._f = open(caminho_indice, "rb")
+        self._dados = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (_, self.versao, self.tamanho_origem, self.mtime_origem, self._n_slots,
+         self._n_palavras, t_fonemas, t_palavras, _) = _CABECALHO.unpack_from(self._dados, 0)
+
+        inicio = _CABECALHO.size
+        self.fonemas = self._dados[inicio:inicio + t_fonemas].decode("ascii").split()
+        self._inicio_slots = inicio + t_fonemas
+        self._inicio_palavras = self._inicio_slots + self._n_slots * _SLOT.size
+        self._inicio_pronuncias = self._inicio_palavras + t_palavras
+
+    def __len__(self):
+        return self._n_palavras
+
+    def __contains__(self, palavra):
+        return self._procurar(palavra) is not None
+
+    def _procurar(self, palavra):
+        dados = palavra.encode("utf-8")[:255]
+        h = _hash(dados)
+        mascara = self._n_slots - 1
+        k = h & mascara
+        while True:
+            hs, op, oq = _SLOT.unpack_from(self._dados, self._inicio_slots + k * _SLOT.size)
+            if op == _VAZIO:
+                return None
+            if hs == h:
+                p = self._inicio_palavras + op
+                n = self._dados[p]
+                if self._dados[p + 1:p + 1 + n] == dados:
+                    return oq
+            k = (k + 1) & mascara
+
+    def pronuncias(self, palavra):
+        """
+        Variantes de pronúncia da palavra normalizada, como tuplas de
+        fonemas ARPAbet sem acento, ou lista vazia se não houver.
+        """
+        oq = self._procurar(palavra)
+        if oq is None:
+            return []
+        p = self._inicio_pronuncias + oq
+        variantes = []
+        for _ in range(self._dados[p]):
+            n = self._dados[p + 1]
+            variantes.append(tuple(self.fonemas[i] for i in self._dados[p + 2:p + 2 + n]))
+            p += 1 + n
+        return variantes
+
+    def similaridade(self, palavra_a, palavra_b):
+        """
+        Entre 0 e 1: 1 para pronúncias iguais. Retorna None se alguma das
+        palavras não está no dicionário.
+        """
+        pa = self.pronuncias(palavra_a)
+        pb = self.pronuncias(palavra_b)
+        if not pa or not pb:
+            return None
+        return max(similaridade_fonemas(a, b) for a in pa for b in pb)
+
+    def close(self):
+        self._dados.close()
+        self._f.close()
+
+
+def abrir_lexico(caminho_dicionario, pasta_indice):
+    """
+    Abre o índice do dicionário, compilando-o apenas se ainda não
+    existir ou se o dicionário mudou (tamanho ou data de modificação).
+    """
+    caminho_indice = os.path.join(pasta_indice, _chave(caminho_dicionario) + ".lex")
+    st = os.stat(caminho_dicionario)
+
+    if os.path.exists(caminho_indice):
+        try:
+            with open(caminho_indice, "rb") as f:
+                cabecalho = _CABECALHO.unpack(f.read(_CABECALHO.size))
+            if cabecalho[:4] == (_MAGICA, VERSAO_LEXICO, st.st_size, st.st_mtime_ns):
+                return LexicoPronuncia(caminho_indice)
+        except (OSError, struct.error):
+            pass
+
+    compilar_lexico(caminho_dicionario, caminho_indice)
+    return LexicoPronuncia(caminho_indice)
+
+
+def _custo_substituicao(a, b):
+    if a == b:
+        return 0.0
+    if (a, b) in _PROXIMOS:
+        return _CUSTO_PROXIMO
+    return 1.0
+
+
+def distancia_fonemas(a, b):
+    """
+    Distância de edição entre duas sequências de fonemas. Trocar um
+    fonema por outro próximo (mesma classe ou só vozeamento) custa 0.5.
+    """
+    anterior = [float(j) for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        atual = [float(i)] + [0.0] * len(b)
+        for j in range(1, len(b) + 1):
+            atual[j] = min(anterior[j] + 1.0,
+                           atual[j - 1] + 1.0,
+                           anterior[j - 1] + _custo_substituicao(a[i - 1], b[j - 1]))
+        anterior = atual
+    return anterior[-1]
+
+
+def similaridade_fonemas(a, b):
+    maior = max(len(a), len(b))
+    if maior == 0:
+        return 1.0
+    return max(0.0, 1.0 - distancia_fonemas(a, b) / maior)
+
+
+def credito_fonetico(resultado, lexico, minima=SIMILARIDADE_MINIMA):
+    """
+    Crédito de um ResultadoAlinhamento com notas parciais: cada acerto vale
+    1 e cada substituição vale a similaridade fonética entre a palavra
+    original e a transcrita ("leaves" lida como "leafs" vale 0.75), desde
+    que ela seja de pelo menos `minima`; abaixo disso vale 0 ("big" lida
+    como "pin", 0.5, é só um erro).
+
+    Retorna (crédito, quase_acertos), com quase_acertos uma lista de
+    (palavra original, palavra transcrita, similaridade).
+    """
+    credito = float(resultado.acertos)
+    quase_acertos = []
+    for tipo, i, j in resultado.operacoes:
+        if tipo != SUBSTITUICAO:
+            continue
+        original = resultado.original[i]
+        transcrita = resultado.transcrito[j]
+        similaridade = lexico.similaridade(original, transcrita)
+        if similaridade and similaridade >= minima:
+            credito += similaridade
+            quase_acertos.append((original, transcrita, similaridade))
+    return credito, quase_acertos
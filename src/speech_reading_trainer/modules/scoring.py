@@ -0,0 +1,189 @@
+#!/usr/bin/python3
+import string
+
+_TRAD = str.maketrans("", "", string.punctuation)
+
+# Acima deste número de células a matriz é calculada com NumPy
+_LIMIAR_NUMPY = 256
+
+# Custos do alinhamento. A substituição custa menos que uma deleção mais
+# uma inserção, mas mais que cada uma delas, para que, entre caminhos de
+# mesmo número de erros, o alinhamento prefira o que tem mais acertos.
+_CUSTO_INDEL = 2
+_CUSTO_SUB = 3
+
+ACERTO = "ok"
+SUBSTITUICAO = "sub"
+INSERCAO = "ins"
+DELECAO = "del"
+
+
+def normalizar_palavra(palavra):
+    return palavra.translate(_TRAD).lower()
+
+
+def tokens_normalizados(texto):
+    """
+    Palavras do texto sem pontuação e em minúsculas, na ordem original.
+    """
+    return [t for t in (normalizar_palavra(p) for p in texto.split()) if t]
+
+
+class ResultadoAlinhamento:
+    """
+    Resultado do alinhamento palavra a palavra entre a frase original
+    e a transcrição.
+
+    operacoes: lista de (tipo, indice_original, indice_transcrito), com
+    tipo ACERTO, SUBSTITUICAO, INSERCAO ou DELECAO e -1 no índice ausente.
+    spans: lista de (palavra transcrita, correta) na ordem da transcrição.
+    """
+    __slots__ = ("original", "transcrito", "operacoes", "acertos",
+                 "substituicoes", "insercoes", "delecoes", "faltantes", "spans")
+
+    def __init__(self, original, transcrito, operacoes, faltantes, spans):
+        self.original = original        # tokens normalizados da frase
+        self.transcrito = transcrito    # tokens normalizados da transcrição
+        self.operacoes = operacoes
+        self.faltantes = faltantes
+        self.spans = spans
+
+        contagem = {ACERTO: 0, SUBSTITUICAO: 0, INSERCAO: 0, DELECAO: 0}
+        for tipo, _, _ in operacoes:
+            contagem[tipo] += 1
+        self.acertos = contagem[ACERTO]
+        self.substituicoes = contagem[SUBSTITUICAO]
+        self.insercoes = contagem[INSERCAO]
+        self.delecoes = contagem[DELECAO]
+
+    @property
+    def total(self):
+        return len(self.original)
+
+    @property
+    def distancia(self):
+        return self.substituicoes + self.insercoes + self.delecoes
+
+    @property
+    def total_pontuado(self):
+        """Palavras da frase mais as inseridas: dizer palavras a mais também custa."""
+        return self.total + self.insercoes
+
+    @property
+    def precisao(self):
+        return self.acertos / self.total_pontuado if self.total_pontuado else 0.0
+
+
+def _matriz_python(a, b):
+    n, m = len(a), len(b)
+    anterior = [j * _CUSTO_INDEL for j in range(m + 1)]
+    matriz = [anterior]
+    for i in range(1, n + 1):
+        atual = [i * _CUSTO_INDEL] + [0] * m
+        ai = a[i - 1]
+        for j in range(1, m + 1):
+            atual[j] = min(anterior[j] + _CUSTO_INDEL,
+                           atual[j - 1] + _CUSTO_INDEL,
+                           anterior[j - 1] + (_CUSTO_SUB if ai != b[j - 1] else 0))
+        matriz.append(atual)
+        anterior = atual
+    return matriz
+
+
+def _matriz_numpy(a, b):
+    # Importado só aqui: frases curtas nunca carregam o NumPy
+    import numpy as np
+
+    # Palavras viram inteiros para comparar linhas inteiras de uma vez
+    ids = {}
+    va = np.array([ids.setdefault(p, len(ids)) for p in a], dtype=np.int32)
+    vb = np.array([ids.setdefault(p, len(ids)) for p in b], dtype=np.int32)
+
+    n, m = len(va), len(vb)
+    colunas = np.arange(m + 1, dtype=np.int32) * _CUSTO_INDEL
+    matriz = np.empty((n + 1, m + 1), dtype=np.int32)
+    matriz[0] = colunas
+    linha = np.empty(m + 1, dtype=np.int32)
+    for i in range(1, n + 1):
+        anterior = matriz[i - 1]
+        linha[0] = i * _CUSTO_INDEL
+        np.minimum(anterior[1:] + _CUSTO_INDEL,
+                   anterior[:-1] + (vb != va[i - 1]) * _CUSTO_SUB,
+                   out=linha[1:])
+        # Inserções: D[i,j] = min_k (linha[k] + (j - k) * _CUSTO_INDEL)
+        matriz[i] = np.minimum.accumulate(linha - colunas) + colunas
+    return matriz
+
+
+def _operacoes(a, b, matriz):
+    """
+    Reconstrói o caminho de menor custo do fim para o início.
+    """
+    i, j = len(a), len(b)
+    operacoes = []
+    while i > 0 or j > 0:
+        custo = matriz[i][j]
+        if i > 0 and j > 0 and a[i - 1] == b[j - 1] and custo == matriz[i - 1][j - 1]:
+            operacoes.append((ACERTO, i - 1, j - 1))
+            i -= 1
+            j -= 1
+        elif i > 0 and j > 0 and custo == matriz[i - 1][j - 1] + _CUSTO_SUB:
+            operacoes.append((SUBSTITUICAO, i - 1, j - 1))
+            i -= 1
+            j -= 1
+        elif i > 0 and custo == matriz[i - 1][j] + _CUSTO_INDEL:
+            operacoes.append((DELECAO, i - 1, -1))
+            i -= 1
+        else:
+            operacoes.append((INSERCAO, -1, j - 1))
+            j -= 1
+    operacoes.reverse()
+    return operacoes
+
+
+def alinhar_tokens(a, b):
+    """
+    Alinhamento de distância de edição entre duas listas de tokens.
+    """
+    if len(a) * len(b) > _LIMIAR_NUMPY:
+        matriz = _matriz_numpy(a, b)
+    else:
+        matriz = _matriz_python(a, b)
+    return _operacoes(a, b, matriz)
+
+
+def alinhar(original, transcrito):
+    """
+    Alinha a frase original com a transcrição em uma única passada e
+    devolve um ResultadoAlinhamento com contagens, palavras faltantes
+    e os spans coloridos da transcrição.
+
+    original pode ser um texto ou uma Frase já compilada, cujos tokens
+    normalizados são reaproveitados sem nova normalização.
+    """
+    if isinstance(original, str):
+        tokens_original = tokens_normalizados(original)
+        conjunto_original = set(tokens_original)
+    else:
+        tokens_original = original.tokens
+        conjunto_original = original.conjunto
+
+    palavras = transcrito.split()
+    normalizadas = [normalizar_palavra(p) for p in palavras]
+    # Posições das palavras que sobram depois de tirar a pontuação
+    posicoes = [k for k, t in enumerate(normalizadas) if t]
+    tokens_transcrito = [normalizadas[k] for k in posicoes]
+
+    operacoes = alinhar_tokens(tokens_original, tokens_transcrito)
+
+    corretas = [False] * len(palavras)
+    acertadas = set()
+    for tipo, i, j in operacoes:
+        if tipo == ACERTO:
+            corretas[posicoes[j]] = True
+            acertadas.add(tokens_original[i])
+
+    # Toda palavra original é acertada, substituída ou deletada
+    spans = list(zip(palavras, corretas))
+    return ResultadoAlinhamento(tokens_original, tokens_transcrito,
+                                operacoes, conjunto_original - acertadas, spans)
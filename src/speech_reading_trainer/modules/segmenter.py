@@ -0,0 +1,110 @@
+#!/usr/bin/python3
+import re
+
+SEPARADORES_PADRAO = ["\n\n", ".", ";", ",", "?"]
+
+# Quantidade de caracteres lidos do arquivo por vez
+TAMANHO_BLOCO = 1 << 20
+
+
+def ler_blocos(caminho_arquivo, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Lê o arquivo de texto em blocos de tamanho fixo, sem carregar
+    o conteúdo inteiro na memória.
+    """
+    with open(caminho_arquivo, "r", encoding="utf-8") as f:
+        while True:
+            bloco = f.read(tamanho_bloco)
+            if not bloco:
+                break
+            yield bloco
+
+
+def iterar_segmentos(blocos, separadores=None):
+    """
+    Percorre o texto uma única vez e devolve tuplas (inicio, fim, segmento),
+    onde segmento é o trecho entre dois separadores, sem espaços nas pontas
+    e terminado pelo seu separador.
+
+    Equivale a dividir recursivamente por cada separador em ordem de
+    prioridade, desde que os separadores não se sobreponham entre si.
+    """
+    if separadores is None:
+        separadores = SEPARADORES_PADRAO
+
+    if separadores:
+        padrao = re.compile("|".join(re.escape(s) for s in separadores))
+        maior = max(len(s) for s in separadores)
+    else:
+        padrao = re.compile("(?!)")
+        maior = 0
+
+    buffer = ""
+    base = 0          # posição de buffer[0] dentro do texto completo
+    blocos = iter(blocos)
+    terminou = False
+
+    while not terminou:
+        bloco = next(blocos, None)
+        if bloco is None:
+            terminou = True
+        else:
+            buffer += bloco
+
+        pos = 0
+        for m in padrao.finditer(buffer):
+            # Um separador no final do bloco pode ser o início de um maior
+            if not terminou and m.start() + maior > len(buffer):
+                break
+            segmento = (buffer[pos:m.start()].strip() + m.group()).strip()
+            if segmento:
+                yield base + pos, base + m.end(), segmento
+            pos = m.end()
+
+        if terminou:
+            segmento = buffer[pos:].strip()
+            if segmento:
+                yield base + pos, base + len(buffer), segmento
+        else:
+            buffer = buffer[pos:]
+            base += pos
+
+
+def dividir_frase_longa(frase, tamanho_maximo=125):
+    """
+    Divide uma frase maior que tamanho_maximo primeiro por vírgulas
+    e, se ainda for longa, por palavras.
+    """
+    partes = frase.split(",")
+    ultima = len(partes) - 1
+    for i, p in enumerate(partes):
+        p = p.strip()
+        if not p:
+            continue
+        pv = p + ("," if i < ultima else "")
+        if len(pv) <= tamanho_maximo:
+            yield pv
+        else:
+            temp = ""
+            for palavra in pv.split():
+                if len(temp) + len(palavra) + 1 <= tamanho_maximo:
+                    temp += (" " if temp else "") + palavra
+                else:
+                    yield temp
+                    temp = palavra
+            if temp:
+                yield temp
+
+
+def segmentar_blocos(blocos, tamanho_maximo=125, separadores=None):
+    """
+    Gera (inicio, fim, frase) a partir de um iterável de blocos de texto.
+    inicio e fim são as posições, em caracteres, do segmento de origem.
+    """
+    for inicio, fim, segmento in iterar_segmentos(blocos, separadores):
+        frase = segmento.replace("\n", " ").strip()
+        if len(frase) <= tamanho_maximo:
+            yield inicio, fim, frase
+        else:
+            for parte in dividir_frase_longa(frase, tamanho_maximo):
+                yield inicio, fim, parte
@@ -0,0 +1,288 @@
+#!/usr/bin/python3
+import os
+import sys
+import json
+import mmap
+import struct
+import hashlib
+import threading
+from array import array
+
+from speech_reading_trainer.modules.segmenter import segmentar_blocos, ler_blocos
+from speech_reading_trainer.modules.sentences import Frase
+from speech_reading_trainer.modules.scoring import tokens_normalizados
+from speech_reading_trainer.modules.word_index import ConstrutorIndicePalavras, IndicePalavras
+
+# Incrementar quando o formato do índice mudar
+VERSAO_INDICE = 4
+
+_OFFSET = struct.Struct("<Q")
+# Posição (inicio, fim) da frase no texto de origem, em caracteres
+_POSICAO = struct.Struct("<QQ")
+# Bytes de frases gravados entre dois avisos de progresso
+_INTERVALO_PROGRESSO = 1 << 20
+
+# Uma trava por arquivo: duas threads nunca constroem o mesmo índice ao mesmo tempo
+_TRAVAS = {}
+_TRAVAS_LOCK = threading.Lock()
+
+
+def _chave(caminho_arquivo):
+    caminho = os.path.abspath(caminho_arquivo)
+    return hashlib.sha1(caminho.encode("utf-8")).hexdigest()
+
+
+def _trava(chave):
+    with _TRAVAS_LOCK:
+        return _TRAVAS.setdefault(chave, threading.Lock())
+
+
+def _caminhos(pasta_indice, chave):
+    base = os.path.join(pasta_indice, chave)
+    return base + ".json", base + ".txt", base + ".idx", base + ".pos", base + ".inv"
+
+
+def _assinatura(caminho_arquivo, tamanho_maximo):
+    st = os.stat(caminho_arquivo)
+    return {
+        "version": VERSAO_INDICE,
+        "path": os.path.abspath(caminho_arquivo),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "max_length": tamanho_maximo,
+    }
+
+
+class IndiceFrases:
+    """
+    Sequência de Frase apoiada em um índice em disco.
+    O texto de cada frase só é lido e compilado quando é acessado.
+    """
+    def __init__(self, caminho_meta, caminho_dados, caminho_offsets, caminho_posicoes,
+                 caminho_palavras, meta):
+        self.caminho_meta = caminho_meta
+        self.caminho_palavras = caminho_palavras
+        self.meta = meta
+        self._palavras = None
+
+        self._f_dados = open(caminho_dados, "rb")
+        self._f_offsets = open(caminho_offsets, "rb")
+        self._f_posicoes = open(caminho_posicoes, "rb")
+        self._dados = self._mapear(self._f_dados)
+        self._offsets = self._mapear(self._f_offsets)
+        self._posicoes = self._mapear(self._f_posicoes)
+        # A frase atual é acessada várias vezes seguidas: compila só uma vez
+        self._ultima = (-1, None)
+
+    @staticmethod
+    def _mapear(f):
+        # mmap não aceita arquivos vazios
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self):
+        return self.meta["count"]
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("sentence index out of range")
+        if self._ultima[0] == i:
+            return self._ultima[1]
+        inicio = _OFFSET.unpack_from(self._offsets, i * _OFFSET.size)[0]
+        fim = _OFFSET.unpack_from(self._offsets, (i + 1) * _OFFSET.size)[0]
+        texto = self._dados[inicio:fim].decode("utf-8")
+        frase = Frase(texto, *_POSICAO.unpack_from(self._posicoes, i * _POSICAO.size))
+        self._ultima = (i, frase)
+        return frase
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def posicao(self):
+        return self.meta.get("position", 0)
+
+    def salvar_posicao(self, posicao):
+        """
+        Guarda a posição de leitura para retomá-la na próxima abertura.
+        """
+        self.meta["position"] = posicao
+        _escrever_json(self.caminho_meta, self.meta)
+
+    def palavras(self):
+        """IndicePalavras do texto (palavra normalizada -> números das frases)."""
+        if self._palavras is None:
+            self._palavras = IndicePalavras(self.caminho_palavras)
+        return self._palavras
+
+    def close(self):
+        if self._palavras is not None:
+            self._palavras.close()
+            self._palavras = None
+        for obj in (self._dados, self._offsets, self._posicoes):
+            if isinstance(obj, mmap.mmap):
+                obj.close()
+        self._f_dados.close()
+        self._f_offsets.close()
+        self._f_posicoes.close()
+
+
+def _escrever_json(caminho, conteudo):
+    # salvar_posicao pode rodar na GUI enquanto outra thread constrói o índice
+    temp = f"{caminho}.{threading.get_ident()}.tmp"
+    with open(temp, "w", encoding="utf-8") as f:
+        json.dump(conteudo, f, ensure_ascii=False)
+    os.replace(temp, caminho)
+
+
+def _gravar_inteiros(f, valores):
+    # O índice é sempre little-endian, como _OFFSET e _POSICAO
+    if sys.byteorder == "big":
+        valores = array("Q", valores)
+        valores.byteswap()
+    valores.tofile(f)
+
+
+def construir_indice(caminho_arquivo, pasta_indice, tamanho_maximo=125, posicao=0,
+                     progresso=None, token=None):
+    """
+    Segmenta o arquivo uma vez e grava as frases, os seus offsets e o
+    índice invertido das palavras em disco.
+    Retorna o dicionário de metadados gravado.
+
+    progresso(fração de 0 a 1) é chamado a cada MB gravado e token
+    (TokenCancelamento) é consultado nos mesmos pontos; se a construção
+    for cancelada, os arquivos temporários são apagados.
+    """
+    os.makedirs(pasta_indice, exist_ok=True)
+    caminhos = _caminhos(pasta_indice, _chave(caminho_arquivo))
+    caminho_meta, caminho_dados, caminho_offsets, caminho_posicoes, caminho_palavras = caminhos
+
+    meta = _assinatura(caminho_arquivo, tamanho_maximo)
+    # Em caracteres lidos contra bytes do arquivo: uma estimativa basta
+    tamanho = max(meta["size"], 1)
+
+    offsets = array("Q", [0])
+    posicoes = array("Q")
+    pos = 0
+    proximo_aviso = _INTERVALO_PROGRESSO
+    palavras = 0
+    numero = 0
+    invertido = ConstrutorIndicePalavras()
+    try:
+        with open(caminho_dados + ".tmp", "wb") as f_dados, \
+             open(caminho_offsets + ".tmp", "wb") as f_offsets, \
+             open(caminho_posicoes + ".tmp", "wb") as f_posicoes:
+            for inicio, fim, frase in segmentar_blocos(ler_blocos(caminho_arquivo), tamanho_maximo):
+                dados = frase.encode("utf-8")
+                palavras += len(frase.split())
+                invertido.adicionar(numero, tokens_normalizados(frase))
+                numero += 1
+                f_dados.write(dados)
+                pos += len(dados)
+                offsets.append(pos)
+                posicoes.append(inicio)
+                posicoes.append(fim)
+                if len(offsets) >= 65536:
+                    _gravar_inteiros(f_offsets, offsets)
+                    _gravar_inteiros(f_posicoes, posicoes)
+                    del offsets[:]
+                    del posicoes[:]
+                if pos >= proximo_aviso:
+                    proximo_aviso += _INTERVALO_PROGRESSO
+                    if token is not None:
+                        token.verificar()
+                    if progresso is not None:
+                        progresso(min(1.0, fim / tamanho))
+            _gravar_inteiros(f_offsets, offsets)
+            _gravar_inteiros(f_posicoes, posicoes)
+        invertido.gravar(caminho_palavras + ".tmp")
+    except BaseException:
+        for caminho in caminhos[1:]:
+            try:
+                os.remove(caminho + ".tmp")
+            except OSError:
+                pass
+        raise
+
+    for caminho in caminhos[1:]:
+        os.replace(caminho + ".tmp", caminho)
+
+    meta["count"] = os.path.getsize(caminho_offsets) // _OFFSET.size - 1
+    meta["words"] = palavras
+    meta["position"] = min(posicao, meta["count"])
+    _escrever_json(caminho_meta, meta)
+    if progresso is not None:
+        progresso(1.0)
+    return meta
+
+
+def _meta_atual(caminho_arquivo, pasta_indice, tamanho_maximo):
+    """
+    (meta, valido): os metadados gravados (ou None) e se o índice
+    corresponde ao arquivo como ele está agora.
+    """
+    caminhos = _caminhos(pasta_indice, _chave(caminho_arquivo))
+    caminho_meta = caminhos[0]
+    assinatura = _assinatura(caminho_arquivo, tamanho_maximo)
+
+    meta = None
+    if os.path.exists(caminho_meta):
+        try:
+            with open(caminho_meta, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            meta = None
+
+    valido = (
+        meta is not None
+        and all(meta.get(k) == v for k, v in assinatura.items())
+        and all(os.path.exists(c) for c in caminhos[1:])
+    )
+    if not valido and meta is not None and not all(
+            meta.get(k) == v for k, v in assinatura.items() if k != "version"):
+        # O texto mudou: nada dos metadados antigos continua valendo
+        meta = None
+    return meta, valido
+
+
+def indice_atualizado(caminho_arquivo, pasta_indice, tamanho_maximo=125):
+    """
+    True se o índice do arquivo já existe e está em dia, ou seja, se
+    abrir_indice não vai precisar segmentar o arquivo.
+    """
+    return _meta_atual(caminho_arquivo, pasta_indice, tamanho_maximo)[1]
+
+
+def metadados_indice(caminho_arquivo, pasta_indice, tamanho_maximo=125,
+                     progresso=None, token=None):
+    """
+    Metadados do índice do arquivo (número de frases e de palavras,
+    posição de leitura, ...), reconstruindo o índice apenas se o arquivo
+    mudou. Com o índice válido, só o JSON de metadados é lido.
+    progresso e token são repassados a construir_indice.
+
+    Pedidos simultâneos do mesmo arquivo (a GUI abrindo o texto enquanto
+    a biblioteca sincroniza) esperam por uma única construção.
+    """
+    with _trava(_chave(caminho_arquivo)):
+        meta, valido = _meta_atual(caminho_arquivo, pasta_indice, tamanho_maximo)
+        if not valido:
+            # Só o formato do índice mudou: o texto é o mesmo e a posição continua valendo
+            posicao = meta.get("position", 0) if meta is not None else 0
+            meta = construir_indice(caminho_arquivo, pasta_indice, tamanho_maximo, posicao,
+                                    progresso, token)
+    return meta
+
+
+def abrir_indice(caminho_arquivo, pasta_indice, tamanho_maximo=125):
+    """
+    Abre o índice de frases do arquivo, reconstruindo-o apenas se o
+    arquivo mudou (caminho, tamanho ou data de modificação).
+    """
+    meta = metadados_indice(caminho_arquivo, pasta_indice, tamanho_maximo)
+    return IndiceFrases(*_caminhos(pasta_indice, _chave(caminho_arquivo)), meta)
@@ -0,0 +1,57 @@
+#!/usr/bin/python3
+import sys
+
+from speech_reading_trainer.modules.scoring import normalizar_palavra
+from speech_reading_trainer.modules.segmenter import segmentar_blocos, ler_blocos
+
+
+class Frase:
+    """
+    Frase pré-compilada: o texto original, os tokens normalizados, o
+    conjunto desses tokens e a posição (inicio, fim), em caracteres, do
+    segmento de origem no texto. Tudo é calculado uma única vez.
+
+    Os tokens são internados, então a mesma palavra repetida ao longo
+    do texto ocupa memória uma só vez.
+    """
+    __slots__ = ("texto", "tokens", "conjunto", "inicio", "fim")
+
+    def __init__(self, texto, inicio=0, fim=None):
+        self.texto = texto
+        self.tokens = tuple(sys.intern(t) for t in
+                            (normalizar_palavra(p) for p in texto.split()) if t)
+        self.conjunto = frozenset(self.tokens)
+        self.inicio = inicio
+        self.fim = len(texto) if fim is None else fim
+
+    def __str__(self):
+        return self.texto
+
+    def __repr__(self):
+        return f"Frase({self.texto!r}, {self.inicio}, {self.fim})"
+
+    def __len__(self):
+        return len(self.texto)
+
+    def __eq__(self, outra):
+        if isinstance(outra, Frase):
+            return (self.texto, self.inicio, self.fim) == (outra.texto, outra.inicio, outra.fim)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.texto, self.inicio, self.fim))
+
+
+def compilar_frases(blocos, tamanho_maximo=125, separadores=None):
+    """
+    Gera uma Frase para cada frase de um iterável de blocos de texto.
+    """
+    for inicio, fim, texto in segmentar_blocos(blocos, tamanho_maximo, separadores):
+        yield Frase(texto, inicio, fim)
+
+
+def carregar_frases(caminho_arquivo, tamanho_maximo=125, separadores=None):
+    """
+    Segmenta o arquivo e retorna a lista de Frase já compiladas.
+    """
+    return list(compilar_frases(ler_blocos(caminho_arquivo), tamanho_maximo, separadores))
@@ -0,0 +1,183 @@
+#!/usr/bin/python3
+import os
+import json
+import time
+import threading
+
+from speech_reading_trainer.modules.sqlite_writer import EscritorSQLite, conectar
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id          INTEGER PRIMARY KEY,
+    file        TEXT NOT NULL,
+    started_at  REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS evaluations (
+    id          INTEGER PRIMARY KEY,
+    session_id  INTEGER NOT NULL REFERENCES sessions(id),
+    sentence    INTEGER NOT NULL,
+    text        TEXT NOT NULL,
+    transcript  TEXT NOT NULL,
+    words       TEXT NOT NULL,
+    matches     INTEGER NOT NULL,
+    total       INTEGER NOT NULL,
+    credit      REAL NOT NULL,
+    missing     TEXT NOT NULL,
+    timings     TEXT NOT NULL,
+    created_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS evaluations_session ON evaluations(session_id);
+CREATE TABLE IF NOT EXISTS state (
+    key         TEXT PRIMARY KEY,
+    value       TEXT NOT NULL
+);
+"""
+
+# Palavras faltantes anteriores a esta avaliação foram apagadas pelo usuário
+_CHAVE_LIMPEZA = "missing_words_cleared_after"
+
+
+class SessaoRestaurada:
+    """
+    Estado de uma sessão de leitura reconstruído a partir do registro.
+    """
+    __slots__ = ("id", "arquivo", "acertos", "palavras", "avaliadas")
+
+    def __init__(self, id, arquivo, acertos=0.0, palavras=0, avaliadas=0):
+        self.id = id
+        self.arquivo = arquivo
+        self.acertos = acertos
+        self.palavras = palavras
+        self.avaliadas = avaliadas
+
+
+class RegistroSessao:
+    """
+    Registro durável das avaliações em SQLite (modo WAL).
+
+    As escritas vão para uma fila e uma thread própria as grava em lotes,
+    com um único commit por lote: quem registra nunca espera pelo disco.
+    As leituras usam outra conexão e só acontecem na abertura.
+    """
+    def __init__(self, caminho, tamanho_lote=64, espera_lote=0.5):
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        self.caminho = caminho
+        self.tamanho_lote = tamanho_lote
+        self.espera_lote = espera_lote
+
+        self._leitura = conectar(caminho)
+        self._leitura.executescript(_ESQUEMA)
+        self._leitura.commit()
+
+        self._lock = threading.Lock()
+        self._ultima_sessao = self._leitura.execute(
+            "SELECT COALESCE(MAX(id), 0) FROM sessions").fetchone()[0]
+
+        self._escritor = EscritorSQLite(caminho, "session-log", tamanho_lote, espera_lote)
+
+    # ---------- escrita ----------
+
+    def _enfileirar(self, sql, parametros):
+        self._escritor.enfileirar(sql, parametros)
+
+    def iniciar_sessao(self, arquivo):
+        """
+        Abre uma nova passada pelo arquivo e retorna o id da sessão.
+        O id é reservado na hora para que as avaliações possam referenciá-lo
+        antes mesmo de a linha ser gravada.
+        """
+        with self._lock:
+            self._ultima_sessao += 1
+            sessao = self._ultima_sessao
+        self._enfileirar("INSERT INTO sessions (id, file, started_at) VALUES (?, ?, ?)",
+                         (sessao, os.path.abspath(arquivo), time.time()))
+        return sessao
+
+    def registrar(self, sessao, numero, texto, resultado, credito=None, tempos=None):
+        """
+        Acrescenta uma avaliação ao registro sem bloquear.
+        resultado é o ResultadoAlinhamento da frase; tempos é um dicionário
+        com as durações medidas (em segundos).
+        """
+        palavras = {
+            "operations": resultado.operacoes,
+            "original": list(resultado.original),
+            "transcribed": list(resultado.transcrito),
+        }
+        self._enfileirar(
+            "INSERT INTO evaluations (session_id, sentence, text, transcript, words, matches,"
+            " total, credit, missing, timings, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (sessao, numero, texto, " ".join(p for p, _ in resultado.spans),
+             json.dumps(palavras, ensure_ascii=False), resultado.acertos, resultado.total,
+             float(resultado.acertos if credito is None else credito),
+             json.dumps(sorted(resultado.faltantes), ensure_ascii=False),
+             json.dumps(tempos or {}), time.time()),
+        )
+
+    def limpar_palavras_faltantes(self):
+        """
+        Esquece as palavras faltantes registradas até agora.
+        """
+        self._enfileirar(
+            "INSERT OR REPLACE INTO state (key, value)"
+            " VALUES (?, (SELECT COALESCE(MAX(id), 0) FROM evaluations))",
+            (_CHAVE_LIMPEZA,),
+        )
+
+    def encerrar(self):
+        self._escritor.encerrar()
+        self._leitura.close()
+
+    # ---------- leitura ----------
+
+    def ultima_sessao(self):
+        """
+        Retorna a SessaoRestaurada mais recente, ou None.
+        """
+        linha = self._leitura.execute(
+            "SELECT id, file FROM sessions ORDER BY id DESC LIMIT 1").fetchone()
+        if linha is None:
+            return None
+        return self._restaurar(*linha)
+
+    def sessao_do_arquivo(self, arquivo):
+        """
+        Retorna a sessão mais recente do arquivo, ou None.
+        """
+        linha = self._leitura.execute(
+            "SELECT id, file FROM sessions WHERE file = ? ORDER BY id DESC LIMIT 1",
+            (os.path.abspath(arquivo),)).fetchone()
+        if linha is None:
+            return None
+        return self._restaurar(*linha)
+
+    def _restaurar(self, sessao, arquivo):
+        acertos, palavras, avaliadas = self._leitura.execute(
+            "SELECT COALESCE(SUM(credit), 0), COALESCE(SUM(total), 0), COUNT(*)"
+            " FROM evaluations WHERE session_id = ?", (sessao,)).fetchone()
+        return SessaoRestaurada(sessao, arquivo, acertos, palavras, avaliadas)
+
+    def acuracias_sessoes(self):
+        """
+        [(arquivo, frases avaliadas, acurácia em %)] de cada sessão com
+        avaliações; quem chama decide quais passadas estão completas.
+        """
+        linhas = self._leitura.execute(
+            "SELECT s.file, COUNT(DISTINCT e.sentence), SUM(e.credit), SUM(e.total)"
+            " FROM sessions s JOIN evaluations e ON e.session_id = s.id"
+            " GROUP BY s.id").fetchall()
+        return [(arquivo, avaliadas, 100.0 * acertos / total if total else 0.0)
+                for arquivo, avaliadas, acertos, total in linhas]
+
+    def palavras_faltantes(self):
+        """
+        Conjunto das palavras faltantes registradas desde a última limpeza.
+        """
+        linha = self._leitura.execute(
+            "SELECT value FROM state WHERE key = ?", (_CHAVE_LIMPEZA,)).fetchone()
+        desde = int(linha[0]) if linha else 0
+        palavras = set()
+        for (faltantes,) in self._leitura.execute(
+                "SELECT missing FROM evaluations WHERE id > ? AND missing != '[]'", (desde,)):
+            palavras.update(json.loads(faltantes))
+        return palavras
@@ -0,0 +1,74 @@
+#!/usr/bin/python3
+import time
+import queue
+import sqlite3
+import threading
+
+_FIM = object()
+
+
+def conectar(caminho):
+    con = sqlite3.connect(caminho, check_same_thread=False)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    return con
+
+
+class EscritorSQLite:
+    """
+    Grava comandos SQL numa thread própria, em lotes, com um único commit
+    por lote: quem enfileira nunca espera pelo disco.
+    """
+    def __init__(self, caminho, nome, tamanho_lote=64, espera_lote=0.5):
+        self.caminho = caminho
+        self.nome = nome
+        self.tamanho_lote = tamanho_lote
+        self.espera_lote = espera_lote
+
+        self._fila = queue.Queue()
+        self._thread = threading.Thread(target=self._escritor, name=nome, daemon=True)
+        self._thread.start()
+
+    def _escritor(self):
+        con = conectar(self.caminho)
+        terminar = False
+        while not terminar:
+            lote = [self._fila.get()]
+            # Junta o que chegar logo em seguida no mesmo commit
+            limite = time.monotonic() + self.espera_lote
+            while len(lote) < self.tamanho_lote:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    break
+                try:
+                    lote.append(self._fila.get(timeout=restante))
+                except queue.Empty:
+                    break
+
+            if _FIM in lote:
+                terminar = True
+            comandos = [c for c in lote if c is not _FIM]
+            try:
+                with con:
+                    for sql, parametros in comandos:
+                        con.execute(sql, parametros)
+            except sqlite3.Error as e:
+                print(f"{self.nome}: write failed: {e}")
+            for _ in lote:
+                self._fila.task_done()
+        con.close()
+
+    def enfileirar(self, sql, parametros=()):
+        self._fila.put((sql, parametros))
+
+    def esperar(self):
+        """
+        Espera até que tudo o que foi enfileirado esteja gravado.
+        Bloqueia: não deve ser chamado na thread da GUI.
+        """
+        self._fila.join()
+
+    def encerrar(self):
+        """Grava o que falta e termina a thread."""
+        self._fila.put(_FIM)
+        self._thread.join()
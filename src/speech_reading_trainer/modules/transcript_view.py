@@ -0,0 +1,103 @@
+#!/usr/bin/python3
+from html import escape
+
+from PyQt5.QtGui import QColor, QTextCharFormat, QTextCursor
+
+# Classe CSS das palavras erradas; as corretas ficam sem marcação
+CLASSE_ERRO = "miss"
+COR_ERRO = "red"
+ESTILO_TRANSCRICAO = f".{CLASSE_ERRO} {{ color: {COR_ERRO}; }}"
+
+_ABRE_ERRO = f'<span class="{CLASSE_ERRO}">'
+_FECHA = "</span>"
+
+
+def html_spans(spans):
+    """
+    HTML da transcrição em tempo linear: uma única junção de partes, com
+    as palavras escapadas e as erradas seguidas agrupadas em um só span
+    da classe CLASSE_ERRO (o estilo vem de ESTILO_TRANSCRICAO).
+    """
+    partes = []
+    em_erro = False
+    for k, (palavra, correta) in enumerate(spans):
+        if correta and em_erro:
+            partes.append(_FECHA)
+            em_erro = False
+        if k:
+            partes.append(" ")
+        if not correta and not em_erro:
+            partes.append(_ABRE_ERRO)
+            em_erro = True
+        partes.append(escape(palavra, quote=False))
+    if em_erro:
+        partes.append(_FECHA)
+    return "".join(partes)
+
+
+class VisaoTranscricao:
+    """
+    Mostra a transcrição colorida em um QTextEdit sem reanalisar HTML.
+
+    Cada atualização compara os spans novos com os já exibidos e, pelo
+    QTextCursor, apaga só a cauda que mudou e insere as palavras novas com
+    o formato de caractere certo. Uma parcial que apenas acrescenta
+    palavras custa o tamanho do acréscimo; repetir os mesmos spans não
+    toca o documento.
+    """
+    def __init__(self, text_edit):
+        self.text_edit = text_edit
+        self.documento = text_edit.document()
+        # Para o HTML de html_spans, se alguém o usar no mesmo widget
+        self.documento.setDefaultStyleSheet(ESTILO_TRANSCRICAO)
+
+        self.formato_certo = QTextCharFormat()
+        self.formato_erro = QTextCharFormat()
+        self.formato_erro.setForeground(QColor(COR_ERRO))
+
+        self._spans = []        # (palavra, correta) exibidos
+        self._fins = []         # posição no documento do fim de cada palavra
+
+    @property
+    def spans(self):
+        return list(self._spans)
+
+    def mostrar(self, spans):
+        """
+        Exibe os spans [(palavra, correta), ...]. Retorna quantas palavras
+        precisaram ser reescritas.
+        """
+        spans = list(spans)
+        antigos = self._spans
+        comum = 0
+        limite = min(len(antigos), len(spans))
+        while comum < limite and antigos[comum] == spans[comum]:
+            comum += 1
+        if comum == len(antigos) == len(spans):
+            return 0
+
+        # A cauda começa no espaço depois da última palavra mantida
+        corte = self._fins[comum - 1] if comum else 0
+
+        cursor = QTextCursor(self.documento)
+        cursor.beginEditBlock()
+        cursor.setPosition(corte)
+        cursor.movePosition(QTextCursor.End, QTextCursor.KeepAnchor)
+        cursor.removeSelectedText()
+
+        del self._spans[comum:]
+        del self._fins[comum:]
+        for k in range(comum, len(spans)):
+            palavra, correta = spans[k]
+            if k:
+                cursor.insertText(" ", self.formato_certo)
+            cursor.insertText(palavra, self.formato_certo if correta else self.formato_erro)
+            self._spans.append(spans[k])
+            self._fins.append(cursor.position())
+        cursor.endEditBlock()
+        return len(spans) - comum
+
+    def limpar(self):
+        self._spans = []
+        self._fins = []
+        self.text_edit.clear()
@@ -0,0 +1,132 @@
+#!/usr/bin/python3
+import io
+import math
+import shutil
+import zlib
+import subprocess
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+from speech_reading_trainer.modules.latency import (
+    MEDIDOR, ETAPA_SINTESE_TTS, ETAPA_DECODIFICACAO_MP3
+)
+
+
+class BackendTTS:
+    """
+    Interface dos motores de síntese de voz.
+    sintetizar devolve um AudioSegment já decodificado.
+    """
+    nome = ""
+
+    def sintetizar(self, texto, idioma="en"):
+        raise NotImplementedError
+
+    def sintetizar_lote(self, textos, idioma="en"):
+        """
+        Sintetiza várias frases em uma chamada, na mesma ordem de textos.
+        """
+        return [self.sintetizar(t, idioma) for t in textos]
+
+
+class BackendGTTS(BackendTTS):
+    """Google Text-to-Speech (requer rede)."""
+    nome = "gtts"
+
+    def __init__(self, max_workers=4):
+        self.max_workers = max_workers
+
+    def sintetizar(self, texto, idioma="en"):
+        from gtts import gTTS
+        from speech_reading_trainer.modules.audio_dsp import decodificar_mp3, array_para_segmento
+
+        mp3_fp = io.BytesIO()
+        with MEDIDOR.medir(ETAPA_SINTESE_TTS):
+            tts = gTTS(text=texto, lang=idioma)
+            tts.write_to_fp(mp3_fp)
+        # Decodifica na memória, sem abrir o ffmpeg
+        with MEDIDOR.medir(ETAPA_DECODIFICACAO_MP3):
+            amostras, taxa = decodificar_mp3(mp3_fp.getvalue())
+        return array_para_segmento(amostras, taxa)
+
+    def sintetizar_lote(self, textos, idioma="en"):
+        # O custo é a ida e volta na rede: paraleliza as requisições
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(lambda t: self.sintetizar(t, idioma), textos))
+
+
+class BackendEspeak(BackendTTS):
+    """espeak-ng local, sem rede."""
+    nome = "espeak"
+
+    def __init__(self, executavel=None, velocidade=160, max_workers=4):
+        if executavel is None:
+            executavel = shutil.which("espeak-ng") or shutil.which("espeak")
+        if executavel is None:
+            raise RuntimeError("espeak-ng was not found. Install the 'espeak-ng' package.")
+        self.executavel = executavel
+        self.velocidade = velocidade
+        self.max_workers = max_workers
+
+    def sintetizar(self, texto, idioma="en"):
+        from pydub import AudioSegment
+
+        # Depois de "--", uma frase que começa com travessão não vira opção
+        with MEDIDOR.medir(ETAPA_SINTESE_TTS):
+            resultado = subprocess.run(
+                [self.executavel, "-v", idioma, "-s", str(self.velocidade), "--stdout",
+                 "--", texto],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                check=True,
+            )
+        return AudioSegment.from_wav(io.BytesIO(resultado.stdout))
+
+    def sintetizar_lote(self, textos, idioma="en"):
+        # Um processo por frase, com concorrência limitada
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(lambda t: self.sintetizar(t, idioma), textos))
+
+
+class BackendFalso(BackendTTS):
+    """
+    Motor determinístico para testes: gera um tom cuja frequência e
+    duração dependem apenas do texto.
+    """
+    nome = "fake"
+
+    def __init__(self, frame_rate=16000, ms_por_caractere=60):
+        self.frame_rate = frame_rate
+        self.ms_por_caractere = ms_por_caractere
+
+    def sintetizar(self, texto, idioma="en"):
+        from pydub import AudioSegment
+
+        frequencia = 200 + zlib.crc32(f"{idioma}\0{texto}".encode("utf-8")) % 600
+        periodo = max(2, round(self.frame_rate / frequencia))
+        ciclo = array("h", (int(8000 * math.sin(2 * math.pi * i / periodo)) for i in range(periodo)))
+
+        amostras = self.frame_rate * self.ms_por_caractere * max(1, len(texto)) // 1000
+        repeticoes = amostras // periodo + 1
+        dados = (ciclo * repeticoes)[:amostras]
+
+        return AudioSegment(data=dados.tobytes(), sample_width=2,
+                            frame_rate=self.frame_rate, channels=1)
+
+
+BACKENDS_TTS = {
+    BackendGTTS.nome: BackendGTTS,
+    BackendEspeak.nome: BackendEspeak,
+    BackendFalso.nome: BackendFalso,
+}
+
+
+def criar_backend_tts(nome, **opcoes):
+    """
+    Cria o backend TTS pelo nome usado no config.json.
+    """
+    try:
+        classe = BACKENDS_TTS[nome]
+    except KeyError:
+        raise ValueError(f"Unknown TTS backend '{nome}'. Options: {', '.join(BACKENDS_TTS)}.")
+    return classe(**opcoes)
@@ -0,0 +1,216 @@
+#!/usr/bin/python3
+import os
+import wave
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+def chave_tts(texto, idioma, fator, backend=""):
+    """
+    Chave de conteúdo de um áudio sintetizado: mesmo texto, idioma,
+    velocidade e backend sempre geram a mesma chave.
+    """
+    conteudo = f"{backend}\0{idioma}\0{fator:.4f}\0{texto}"
+    return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+
+class CacheTTS:
+    """
+    Cache de áudios TTS em dois níveis:
+    - memória: PCM já decodificado, com descarte LRU, em qualquer velocidade;
+    - disco: arquivos WAV da síntese em velocidade normal, com limite de
+      tamanho e descarte LRU.
+    """
+    def __init__(self, pasta, limite_disco=200 * 1024 * 1024, limite_memoria=64 * 1024 * 1024,
+                 backend=""):
+        self.pasta = pasta
+        self.backend = backend
+        self.limite_disco = limite_disco
+        self.limite_memoria = limite_memoria
+
+        self._lock = threading.Lock()
+        self._memoria = OrderedDict()   # chave -> AudioSegment
+        self._bytes_memoria = 0
+        self._em_andamento = {}         # chave -> threading.Event
+
+        os.makedirs(self.pasta, exist_ok=True)
+
+        # chave -> [tamanho, último acesso]; lido uma única vez
+        self._disco = {}
+        self._bytes_disco = 0
+        with os.scandir(self.pasta) as it:
+            for entrada in it:
+                if entrada.is_file() and entrada.name.endswith(".wav"):
+                    st = entrada.stat()
+                    self._disco[entrada.name[:-4]] = [st.st_size, st.st_mtime]
+                    self._bytes_disco += st.st_size
+
+    def _caminho(self, chave):
+        return os.path.join(self.pasta, chave + ".wav")
+
+    # ---------- memória ----------
+
+    def _guardar_memoria(self, chave, audio):
+        if chave in self._memoria:
+            self._memoria.move_to_end(chave)
+            return
+        self._memoria[chave] = audio
+        self._bytes_memoria += len(audio.raw_data)
+        while self._bytes_memoria > self.limite_memoria and len(self._memoria) > 1:
+            _, antigo = self._memoria.popitem(last=False)
+            self._bytes_memoria -= len(antigo.raw_data)
+
+    # ---------- disco ----------
+
+    def _ler_disco(self, chave):
+        from pydub import AudioSegment
+
+        caminho = self._caminho(chave)
+        try:
+            with wave.open(caminho, "rb") as w:
+                audio = AudioSegment(
+                    data=w.readframes(w.getnframes()),
+                    sample_width=w.getsampwidth(),
+                    frame_rate=w.getframerate(),
+                    channels=w.getnchannels(),
+                )
+        except (OSError, EOFError, wave.Error):
+            return None
+
+        # Marca o acesso para a política LRU
+        try:
+            os.utime(caminho)
+        except OSError:
+            pass
+        with self._lock:
+            if chave in self._disco:
+                self._disco[chave][1] = os.path.getmtime(caminho)
+        return audio
+
+    def _gravar_disco(self, chave, audio):
+        caminho = self._caminho(chave)
+        temp = caminho + ".tmp"
+        with wave.open(temp, "wb") as w:
+            w.setnchannels(audio.channels)
+            w.setsampwidth(audio.sample_width)
+            w.setframerate(audio.frame_rate)
+            w.writeframes(audio.raw_data)
+        os.replace(temp, caminho)
+
+        st = os.stat(caminho)
+        with self._lock:
+            antigo = self._disco.get(chave)
+            if antigo:
+                self._bytes_disco -= antigo[0]
+            self._disco[chave] = [st.st_size, st.st_mtime]
+            self._bytes_disco += st.st_size
+            excedentes = self._selecionar_descarte(manter=chave)
+
+        for velho in excedentes:
+            try:
+                os.remove(self._caminho(velho))
+            except OSError:
+                pass
+
+    def _selecionar_descarte(self, manter):
+        """
+        Remove do registro os arquivos menos usados até caber no limite.
+        Deve ser chamado com o lock adquirido.
+        """
+        if self._bytes_disco <= self.limite_disco:
+            return []
+        excedentes = []
+        for chave, (tamanho, _) in sorted(self._disco.items(), key=lambda kv: kv[1][1]):
+            if self._bytes_disco <= self.limite_disco:
+                break
+            if chave == manter:
+                continue
+            del self._disco[chave]
+            self._bytes_disco -= tamanho
+            excedentes.append(chave)
+        return excedentes
+
+    # ---------- interface ----------
+
+    def obter(self, texto, idioma="en", fator=1.0):
+        """
+        Retorna o AudioSegment em cache ou None.
+        """
+        chave = chave_tts(texto, idioma, fator, self.backend)
+        with self._lock:
+            audio = self._memoria.get(chave)
+            if audio is not None:
+                self._memoria.move_to_end(chave)
+                return audio
+            no_disco = fator == 1.0 and chave in self._disco
+
+        if not no_disco:
+            return None
+        audio = self._ler_disco(chave)
+        if audio is not None:
+            with self._lock:
+                self._guardar_memoria(chave, audio)
+        return audio
+
+    def contem(self, texto, idioma="en", fator=1.0):
+        """
+        Verifica se o áudio está em algum nível do cache, sem lê-lo.
+        """
+        chave = chave_tts(texto, idioma, fator, self.backend)
+        with self._lock:
+            return chave in self._memoria or (fator == 1.0 and chave in self._disco)
+
+    def guardar(self, texto, idioma, fator, audio):
+        """
+        Só a velocidade normal vai para o disco; as outras são derivadas
+        dela e ficam apenas na memória.
+        """
+        chave = chave_tts(texto, idioma, fator, self.backend)
+        with self._lock:
+            self._guardar_memoria(chave, audio)
+        if fator == 1.0:
+            self._gravar_disco(chave, audio)
+
+    def _uma_vez(self, texto, idioma, fator, gerar):
+        """
+        Retorna o áudio em cache ou chama gerar() e guarda o resultado.
+        Pedidos simultâneos do mesmo áudio esperam por uma única geração.
+        """
+        chave = chave_tts(texto, idioma, fator, self.backend)
+        while True:
+            audio = self.obter(texto, idioma, fator)
+            if audio is not None:
+                return audio
+            with self._lock:
+                evento = self._em_andamento.get(chave)
+                if evento is None:
+                    evento = threading.Event()
+                    self._em_andamento[chave] = evento
+                    break
+            evento.wait()
+
+        try:
+            audio = gerar()
+            self.guardar(texto, idioma, fator, audio)
+            return audio
+        finally:
+            with self._lock:
+                del self._em_andamento[chave]
+            evento.set()
+
+    def obter_ou_sintetizar(self, texto, idioma, fator, sintetizar, alongar=None):
+        """
+        Retorna o áudio em cache ou o gera: sintetizar(texto, idioma)
+        produz a velocidade normal, e as outras saem dela com
+        alongar(audio, fator) (alongar_segmento por padrão). Assim mudar
+        a velocidade nunca repete a síntese.
+        """
+        def base():
+            return self._uma_vez(texto, idioma, 1.0, lambda: sintetizar(texto, idioma))
+
+        if fator == 1.0:
+            return base()
+        if alongar is None:
+            from speech_reading_trainer.modules.audio_dsp import alongar_segmento as alongar
+        return self._uma_vez(texto, idioma, fator, lambda: alongar(base(), fator))
@@ -0,0 +1,72 @@
+#!/usr/bin/python3
+import threading
+
+from speech_reading_trainer.modules.jobs import PRIORIDADE_PREFETCH, TokenCancelamento
+
+
+class PrefetchTTS:
+    """
+    Sintetiza em segundo plano as próximas frases e as deixa no CacheTTS,
+    já na velocidade pedida, para que o botão de ouvir não espere pela
+    síntese nem pelo alongamento.
+
+    As tarefas rodam no AgendadorTarefas, no grupo "prefetch" e com a
+    menor prioridade; o limite de simultaneidade é o do grupo.
+    """
+    GRUPO = "prefetch"
+
+    def __init__(self, cache, sintetizar, agendador, alongar=None):
+        self.cache = cache
+        self.sintetizar = sintetizar
+        self.alongar = alongar
+        self.agendador = agendador
+
+        self._lock = threading.Lock()
+        self._geracao = 0
+        self._tarefas = {}   # (texto, idioma, fator) -> Tarefa
+
+    def _trabalho(self, geracao, token, texto, idioma, fator):
+        # Pedido obsoleto (novo arquivo aberto): não sintetiza
+        if geracao != self._geracao or token.cancelado:
+            return
+        try:
+            self.cache.obter_ou_sintetizar(texto, idioma, fator, self.sintetizar, self.alongar)
+        except Exception as e:
+            print(f"TTS prefetch failed: {e}")
+
+    def agendar(self, frases, idioma="en", fator=1.0):
+        """
+        Agenda a síntese das frases indicadas. Tarefas pendentes de frases
+        que não estão mais na lista são canceladas.
+        """
+        chaves = [(f, idioma, fator) for f in frases if f]
+        with self._lock:
+            for chave, tarefa in list(self._tarefas.items()):
+                if tarefa.terminou():
+                    del self._tarefas[chave]
+                elif chave not in chaves and tarefa.cancelar():
+                    del self._tarefas[chave]
+
+            for chave in chaves:
+                if chave in self._tarefas:
+                    continue
+                if self.cache.contem(*chave):
+                    continue
+                token = TokenCancelamento()
+                self._tarefas[chave] = self.agendador.submeter(
+                    self._trabalho, self._geracao, token, *chave,
+                    prioridade=PRIORIDADE_PREFETCH, grupo=self.GRUPO, token=token,
+                )
+
+    def cancelar(self):
+        """
+        Descarta todas as tarefas pendentes, por exemplo ao abrir outro arquivo.
+        """
+        with self._lock:
+            self._geracao += 1
+            self._tarefas.clear()
+        # Também pega as tarefas do grupo que ainda não foram registradas aqui
+        self.agendador.cancelar_grupo(self.GRUPO)
+
+    def encerrar(self):
+        self.cancelar()
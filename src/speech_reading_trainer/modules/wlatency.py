@@ -0,0 +1,90 @@
+#!/usr/bin/python3
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem,
+    QPushButton, QHeaderView, QFileDialog, QMessageBox
+)
+from PyQt5.QtCore import Qt, QTimer
+
+from speech_reading_trainer.modules.latency import MEDIDOR, PERCENTIS
+
+
+class PainelLatencia(QWidget):
+    """
+    Tabela com os percentis de latência de cada etapa, atualizada
+    periodicamente enquanto está visível.
+    """
+    COLUNAS = ["Stage", "Count"] + [f"p{p} (ms)" for p in PERCENTIS] + ["Max (ms)"]
+
+    def __init__(self, medidor=MEDIDOR, intervalo_ms=1000,
+                 texto_exportar="Export", texto_limpar="Reset", formato_exportacao="json",
+                 parent=None):
+        super().__init__(parent)
+        self.medidor = medidor
+        self.formato_exportacao = formato_exportacao
+
+        layout = QVBoxLayout(self)
+
+        self.tabela = QTableWidget(0, len(self.COLUNAS))
+        self.tabela.setHorizontalHeaderLabels(self.COLUNAS)
+        self.tabela.verticalHeader().setVisible(False)
+        self.tabela.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.tabela.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        layout.addWidget(self.tabela)
+
+        botoes = QHBoxLayout()
+        self.btn_exportar = QPushButton(texto_exportar)
+        self.btn_exportar.clicked.connect(self.exportar)
+        botoes.addWidget(self.btn_exportar)
+        self.btn_limpar = QPushButton(texto_limpar)
+        self.btn_limpar.clicked.connect(self.limpar)
+        botoes.addWidget(self.btn_limpar)
+        layout.addLayout(botoes)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(intervalo_ms)
+        self.timer.timeout.connect(self.atualizar)
+
+    def showEvent(self, event):
+        self.atualizar()
+        self.timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
+
+    def atualizar(self):
+        resumo = self.medidor.resumo()
+        self.tabela.setRowCount(len(resumo))
+        for linha, (etapa, valores) in enumerate(resumo.items()):
+            celulas = [etapa, str(valores["count"])]
+            celulas += [f"{valores.get(f'p{p}', 0.0) * 1000:.1f}" for p in PERCENTIS]
+            celulas.append(f"{valores['max'] * 1000:.1f}")
+            for coluna, texto in enumerate(celulas):
+                item = self.tabela.item(linha, coluna)
+                if item is None:
+                    item = QTableWidgetItem()
+                    if coluna > 0:
+                        item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                    self.tabela.setItem(linha, coluna, item)
+                item.setText(texto)
+
+    def limpar(self):
+        self.medidor.limpar()
+        self.atualizar()
+
+    def exportar(self):
+        caminho, filtro = QFileDialog.getSaveFileName(
+            self,
+            self.btn_exportar.text(),
+            "",
+            "JSON (*.json);;Prometheus text (*.prom *.txt)",
+            "JSON (*.json)" if self.formato_exportacao == "json" else "Prometheus text (*.prom *.txt)"
+        )
+        if not caminho:
+            return
+        try:
+            self.medidor.exportar(caminho, "json" if filtro.startswith("JSON") else "prometheus")
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, self.btn_exportar.text(),
+                                f"Could not export the latency report: {e}")
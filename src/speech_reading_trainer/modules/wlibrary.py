@@ -0,0 +1,158 @@
+#!/usr/bin/python3
+import os
+
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton,
+    QTableView, QHeaderView, QAbstractItemView, QFileDialog
+)
+from PyQt5.QtCore import (
+    Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel, pyqtSignal
+)
+
+# Ordenação numérica nas colunas de números
+ORDEM_ROLE = Qt.UserRole + 1
+
+
+class ModeloBiblioteca(QAbstractTableModel):
+    """
+    Tabela dos DocumentoBiblioteca de uma pasta.
+    """
+    COLUNAS = ["File", "Sentences", "Words", "Progress", "Best accuracy"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pasta = ""
+        self._documentos = []
+
+    def definir(self, pasta, documentos):
+        self.beginResetModel()
+        self.pasta = pasta
+        self._documentos = list(documentos)
+        self.endResetModel()
+
+    def documento(self, linha):
+        return self._documentos[linha]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._documentos)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUNAS)
+
+    def headerData(self, secao, orientacao, role=Qt.DisplayRole):
+        if orientacao == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.COLUNAS[secao]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        doc = self._documentos[index.row()]
+        coluna = index.column()
+        if role == Qt.DisplayRole:
+            if coluna == 0:
+                return os.path.relpath(doc.caminho, self.pasta) if self.pasta else doc.caminho
+            if coluna == 1:
+                return doc.frases
+            if coluna == 2:
+                return doc.palavras
+            if coluna == 3:
+                return f"{doc.posicao}/{doc.frases} ({doc.progresso:.0%})"
+            if coluna == 4:
+                return "" if doc.melhor_acuracia is None else f"{doc.melhor_acuracia:.2f}%"
+        elif role == ORDEM_ROLE:
+            return (doc.caminho.lower(), doc.frases, doc.palavras, doc.progresso,
+                    -1.0 if doc.melhor_acuracia is None else doc.melhor_acuracia)[coluna]
+        elif role == Qt.ToolTipRole and coluna == 0:
+            return doc.caminho
+        elif role == Qt.TextAlignmentRole and coluna > 0:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+
+class JanelaBiblioteca(QDialog):
+    """
+    Lista os textos de uma pasta a partir do índice da biblioteca.
+    A tabela aparece na hora com o que já está indexado; quem abre a
+    janela sincroniza a pasta em segundo plano e chama mostrar() de novo.
+    Emite arquivo_escolhido(caminho) no duplo clique ou em Open.
+    """
+    arquivo_escolhido = pyqtSignal(str)
+    pasta_escolhida = pyqtSignal(str)
+
+    def __init__(self, textos, parent=None):
+        super().__init__(parent)
+        self.textos = textos
+        self.setWindowTitle(textos["library_dialog_title"])
+        self.resize(800, 500)
+
+        layout = QVBoxLayout(self)
+
+        topo = QHBoxLayout()
+        self.label_pasta = QLabel()
+        self.label_pasta.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        topo.addWidget(self.label_pasta, 1)
+        self.btn_pasta = QPushButton(textos["library_choose_folder"])
+        self.btn_pasta.clicked.connect(self.escolher_pasta)
+        topo.addWidget(self.btn_pasta)
+        layout.addLayout(topo)
+
+        self.filtro = QLineEdit()
+        self.filtro.setPlaceholderText(textos["library_filter_placeholder"])
+        self.filtro.setClearButtonEnabled(True)
+        layout.addWidget(self.filtro)
+
+        self.modelo = ModeloBiblioteca(self)
+        self.proxy = QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(self.modelo)
+        self.proxy.setSortRole(ORDEM_ROLE)
+        self.proxy.setFilterKeyColumn(0)
+        self.proxy.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self.filtro.textChanged.connect(self.proxy.setFilterFixedString)
+
+        self.tabela = QTableView()
+        self.tabela.setModel(self.proxy)
+        self.tabela.setSortingEnabled(True)
+        self.tabela.sortByColumn(0, Qt.AscendingOrder)
+        self.tabela.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.tabela.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.tabela.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tabela.verticalHeader().setVisible(False)
+        cabecalho = self.tabela.horizontalHeader()
+        cabecalho.setSectionResizeMode(0, QHeaderView.Stretch)
+        for coluna in range(1, len(ModeloBiblioteca.COLUNAS)):
+            cabecalho.setSectionResizeMode(coluna, QHeaderView.ResizeToContents)
+        self.tabela.doubleClicked.connect(self.abrir_selecionado)
+        layout.addWidget(self.tabela)
+
+        rodape = QHBoxLayout()
+        self.label_estado = QLabel()
+        rodape.addWidget(self.label_estado, 1)
+        self.btn_abrir = QPushButton(textos["library_open"])
+        self.btn_abrir.setDefault(True)
+        self.btn_abrir.clicked.connect(self.abrir_selecionado)
+        rodape.addWidget(self.btn_abrir)
+        layout.addLayout(rodape)
+
+    def mostrar(self, pasta, documentos, sincronizando=False):
+        self.label_pasta.setText(pasta)
+        self.modelo.definir(pasta, documentos)
+        palavras = sum(d.palavras for d in documentos)
+        estado = self.textos["library_summary"].format(files=len(documentos), words=palavras)
+        if sincronizando:
+            estado += " " + self.textos["library_scanning"]
+        self.label_estado.setText(estado)
+
+    def escolher_pasta(self):
+        pasta = QFileDialog.getExistingDirectory(self, self.textos["library_choose_folder"],
+                                                 self.modelo.pasta)
+        if pasta:
+            self.pasta_escolhida.emit(pasta)
+
+    def abrir_selecionado(self, *args):
+        indices = self.tabela.selectionModel().selectedRows()
+        if not indices:
+            return
+        linha = self.proxy.mapToSource(indices[0]).row()
+        self.arquivo_escolhido.emit(self.modelo.documento(linha).caminho)
+        self.accept()
@@ -0,0 +1,211 @@
+#!/usr/bin/python3
+import sys
+import mmap
+import heapq
+import struct
+from array import array
+
+_MAGICA = b"SRTINV01"
+# magica, número de palavras, tamanho do vocabulário em bytes, número de ocorrências
+_CABECALHO = struct.Struct("<8sIII")
+_SEPARADOR = "\n"
+
+
+def _alinhar4(n):
+    return (n + 3) & ~3
+
+
+def _gravar_uint32(f, valores):
+    # Little-endian, como o resto do índice de frases
+    if sys.byteorder == "big":
+        valores = array("I", valores)
+        valores.byteswap()
+    valores.tofile(f)
+
+
+class ConstrutorIndicePalavras:
+    """
+    Acumula, frase a frase, em quais frases cada palavra normalizada
+    aparece, e grava o resultado para IndicePalavras.
+    """
+    def __init__(self):
+        self._ocorrencias = {}      # palavra -> array("I") de números de frase
+
+    def adicionar(self, numero, tokens):
+        ocorrencias = self._ocorrencias
+        for palavra in set(tokens):
+            lista = ocorrencias.get(palavra)
+            if lista is None:
+                lista = ocorrencias[palavra] = array("I")
+            lista.append(numero)
+
+    def gravar(self, caminho):
+        """
+        Formato: cabeçalho, vocabulário ordenado (UTF-8, uma palavra por
+        linha), offsets uint32 de cada palavra nas ocorrências e as
+        ocorrências (números de frase uint32, crescentes por palavra).
+        """
+        palavras = sorted(self._ocorrencias)
+        vocabulario = _SEPARADOR.join(palavras).encode("utf-8")
+        offsets = array("I", [0])
+        total = 0
+        for palavra in palavras:
+            total += len(self._ocorrencias[palavra])
+            offsets.append(total)
+
+        with open(caminho, "wb") as f:
+            f.write(_CABECALHO.pack(_MAGICA, len(palavras), len(vocabulario), total))
+            f.write(vocabulario)
+            f.write(b"\0" * (_alinhar4(len(vocabulario)) - len(vocabulario)))
+            _gravar_uint32(f, offsets)
+            for palavra in palavras:
+                _gravar_uint32(f, self._ocorrencias[palavra])
+
+
+class IndicePalavras:
+    """
+    Índice invertido de um texto (palavra normalizada -> frases onde ela
+    aparece), mapeado em memória. Só o vocabulário é decodificado, e só
+    na primeira consulta; as ocorrências são lidas direto do mmap.
+    """
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._f = open(caminho, "rb")
+        self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        magica, self.n_palavras, tamanho, self.n_ocorrencias = _CABECALHO.unpack_from(self._mm, 0)
+        if magica != _MAGICA:
+            self.close()
+            raise ValueError(f"Not a word index: {caminho}")
+        self._inicio_vocabulario = _CABECALHO.size
+        self._fim_vocabulario = _CABECALHO.size + tamanho
+        self._inicio_offsets = _CABECALHO.size + _alinhar4(tamanho)
+        self._inicio_ocorrencias = self._inicio_offsets + 4 * (self.n_palavras + 1)
+        self._numeros = None
+
+    def _vocabulario(self):
+        if self._numeros is None:
+            texto = self._mm[self._inicio_vocabulario:self._fim_vocabulario].decode("utf-8")
+            palavras = texto.split(_SEPARADOR) if self.n_palavras else []
+            self._numeros = dict(zip(palavras, range(len(palavras))))
+        return self._numeros
+
+    def __len__(self):
+        return self.n_palavras
+
+    def __contains__(self, palavra):
+        return palavra in self._vocabulario()
+
+    def _intervalo(self, palavra):
+        """(offset em bytes, quantidade) das ocorrências, ou None."""
+        k = self._vocabulario().get(palavra)
+        if k is None:
+            return None
+        inicio, fim = struct.unpack_from("<II", self._mm, self._inicio_offsets + 4 * k)
+        return self._inicio_ocorrencias + 4 * inicio, fim - inicio
+
+    def frases_com(self, palavra):
+        """array("I") com os números das frases que contêm a palavra."""
+        intervalo = self._intervalo(palavra)
+        if intervalo is None:
+            return array("I")
+        offset, n = intervalo
+        resultado = array("I", self._mm[offset:offset + 4 * n])
+        if sys.byteorder == "big":
+            resultado.byteswap()
+        return resultado
+
+    def frases_com_numpy(self, palavra):
+        """Como frases_com, mas um array NumPy que aponta para o mmap (sem cópia)."""
+        import numpy as np
+
+        intervalo = self._intervalo(palavra)
+        if intervalo is None:
+            return np.empty(0, dtype="<u4")
+        offset, n = intervalo
+        return np.frombuffer(self._mm, dtype="<u4", count=n, offset=offset)
+
+    def close(self):
+        self._numeros = None
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._f.close()
+
+
+class ItemTreino:
+    """
+    Uma frase da fila de treino: o texto de origem (chave), o número
+    da frase nele e a soma dos erros das palavras faltantes que ela tem.
+    """
+    __slots__ = ("chave", "numero", "pontuacao")
+
+    def __init__(self, chave, numero, pontuacao):
+        self.chave = chave
+        self.numero = numero
+        self.pontuacao = pontuacao
+
+    def __repr__(self):
+        return f"ItemTreino({self.chave!r}, {self.numero}, {self.pontuacao:g})"
+
+
+class IndiceInvertido:
+    """
+    Palavra normalizada -> frases, sobre vários textos carregados.
+    Cada texto entra com o seu IndicePalavras (gravado junto com o índice
+    de frases), então adicionar um texto não lê as frases dele, e montar
+    uma fila de treino só percorre as ocorrências das palavras pedidas.
+    """
+    def __init__(self):
+        self._documentos = {}       # chave -> (IndicePalavras, número de frases)
+
+    def adicionar(self, chave, indice_palavras, n_frases):
+        self._documentos[chave] = (indice_palavras, n_frases)
+
+    def remover(self, chave):
+        self._documentos.pop(chave, None)
+
+    def __len__(self):
+        return len(self._documentos)
+
+    def __contains__(self, chave):
+        return chave in self._documentos
+
+    def frases_com(self, palavra):
+        """[(chave, número da frase)] de todas as frases que contêm a palavra."""
+        return [(chave, numero) for chave, (indice, _) in self._documentos.items()
+                for numero in indice.frases_com(palavra)]
+
+    def fila_treino(self, contagens, limite=20, max_palavras=50):
+        """
+        As `limite` frases com mais erros acumulados, como [ItemTreino].
+        contagens é {palavra normalizada: erros}; só as `max_palavras`
+        mais erradas contam, e cada frase vale a soma dos erros das
+        palavras faltantes que contém. Empates ficam na ordem do texto.
+        """
+        import numpy as np
+
+        pesos = heapq.nlargest(max_palavras, ((n, p) for p, n in contagens.items() if n > 0))
+        if not pesos or limite <= 0:
+            return []
+
+        candidatos = []
+        for ordem, (chave, (indice, n_frases)) in enumerate(self._documentos.items()):
+            if not n_frases:
+                continue
+            pontos = np.zeros(n_frases, dtype=np.float64)
+            for peso, palavra in pesos:
+                # Cada frase aparece uma vez por palavra: a soma indexada basta
+                pontos[indice.frases_com_numpy(palavra)] += peso
+            marcadas = np.flatnonzero(pontos)
+            if len(marcadas) > limite:
+                # As acima do corte e, entre as empatadas no corte, as primeiras do texto
+                valores = pontos[marcadas]
+                corte = np.partition(valores, len(valores) - limite)[len(valores) - limite]
+                acima = marcadas[valores > corte]
+                iguais = marcadas[valores == corte][:limite - len(acima)]
+                marcadas = np.concatenate((acima, iguais))
+            candidatos.extend((-float(pontos[i]), ordem, int(i), chave) for i in marcadas)
+
+        candidatos.sort(key=lambda c: c[:3])
+        return [ItemTreino(chave, numero, -negativo)
+                for negativo, _, numero, chave in candidatos[:limite]]
@@ -1,38 +1,96 @@
 #!/usr/bin/python3
 import sys
 import os
-import io
+import time
 import signal
-import string
-import threading
+import functools
 import subprocess
 
+# Início da importação, para o relatório de --profile-startup
+_INICIO = time.perf_counter()
+
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QPushButton, QTextEdit, QLabel,
     QProgressBar, QFileDialog, QVBoxLayout, QWidget, QHBoxLayout,
-    QSizePolicy, QAction, QMessageBox, QListView, QSplitter
+    QSizePolicy, QAction, QMessageBox, QListView, QSplitter, QSlider, QDockWidget
 )
-from PyQt5.QtCore import Qt, pyqtSignal, QUrl, QStringListModel
+from PyQt5.QtCore import Qt, pyqtSignal, QUrl, QTimer
 from PyQt5.QtGui import QIcon, QDesktopServices
 
-import speech_recognition as sr
-from gtts import gTTS
-from pydub import AudioSegment
-from pydub.playback import play
-
+# speech_recognition, pydub, gTTS e NumPy são importados no primeiro uso
 
 import speech_reading_trainer.about as about
 import speech_reading_trainer.modules.configure as configure 
 from speech_reading_trainer.modules.resources import resource_path
 from speech_reading_trainer.modules.wabout    import show_about_window
+from speech_reading_trainer.modules.sentences import carregar_frases
+from speech_reading_trainer.modules.sentence_index import (
+    abrir_indice, indice_atualizado, metadados_indice
+)
+from speech_reading_trainer.modules.tts_cache import CacheTTS
+from speech_reading_trainer.modules.tts_prefetch import PrefetchTTS
+from speech_reading_trainer.modules.tts_backends import BackendGTTS, criar_backend_tts
+from speech_reading_trainer.modules.asr_backends import ErroASR, BackendGoogleASR, criar_backend_asr
+from speech_reading_trainer.modules.scoring import alinhar
+from speech_reading_trainer.modules.pronunciation import abrir_lexico, credito_fonetico
+from speech_reading_trainer.modules.session_log import RegistroSessao
+from speech_reading_trainer.modules.missing_words import DiarioPalavras, ModeloPalavrasFaltantes
+from speech_reading_trainer.modules.jobs import (
+    AgendadorTarefas, TarefaCancelada, TokenCancelamento,
+    PRIORIDADE_GRAVACAO, PRIORIDADE_TTS, PRIORIDADE_PREFETCH
+)
+from speech_reading_trainer.modules.playback import MotorReproducao
+from speech_reading_trainer.modules.latency import (
+    MEDIDOR, ETAPA_GRAVACAO, ETAPA_ASR, ETAPA_RENDERIZACAO, ETAPA_GRAVAR_ATE_TRANSCRICAO,
+    ETAPA_PONTUACAO, ETAPA_ALONGAMENTO
+)
+from speech_reading_trainer.modules.wlatency import PainelLatencia
+from speech_reading_trainer.modules.transcript_view import html_spans, VisaoTranscricao
+from speech_reading_trainer.modules.library import Biblioteca
+from speech_reading_trainer.modules.wlibrary import JanelaBiblioteca
+from speech_reading_trainer.modules.word_index import IndiceInvertido
+from speech_reading_trainer.modules.capture import DetectorVoz, SessaoGravacao, ServicoCaptura
 from speech_reading_trainer.desktop import create_desktop_file, create_desktop_directory, create_desktop_menu
 
+# Gravações da posição de leitura: uma por vez, na ordem em que foram pedidas
+GRUPO_POSICAO = "position"
+
 # ---------- Path to config file ----------
 CONFIG_PATH = os.path.join( os.path.expanduser("~"),
                             ".config", 
                             about.__package__, 
                             "config.json" )
 
+# ---------- Path to session log ----------
+SESSION_LOG_PATH = os.path.join( os.path.dirname(CONFIG_PATH),
+                                 "sessions.sqlite3" )
+
+# ---------- Path to missing-words journal ----------
+MISSING_WORDS_PATH = os.path.join( os.path.dirname(CONFIG_PATH),
+                                   "missing_words.tsv" )
+
+# ---------- Path to library index ----------
+LIBRARY_PATH = os.path.join( os.path.dirname(CONFIG_PATH),
+                             "library.sqlite3" )
+
+# ---------- Path to sentence index cache ----------
+INDEX_DIR = os.path.join( os.path.expanduser("~"),
+                          ".cache",
+                          about.__package__,
+                          "index" )
+
+# ---------- Path to compiled pronunciation lexicons ----------
+LEXICON_DIR = os.path.join( os.path.expanduser("~"),
+                            ".cache",
+                            about.__package__,
+                            "lexicon" )
+
+# ---------- Path to TTS audio cache ----------
+TTS_CACHE_DIR = os.path.join( os.path.expanduser("~"),
+                              ".cache",
+                              about.__package__,
+                              "tts" )
+
 DEFAULT_CONTENT={   
     # Toolbar
     "toolbar_configure": "Configure",
@@ -41,6 +99,8 @@ DEFAULT_CONTENT={
     "toolbar_about_tooltip": "Show information about this program",
     "toolbar_coffee": "Coffee",
     "toolbar_coffee_tooltip": "Support the developer (TrucomanX)",
+    "toolbar_latency": "Latency",
+    "toolbar_latency_tooltip": "Show how long each processing stage takes (p50/p95/p99)",
 
     # Window
     "window_width": 1024,
@@ -50,6 +110,9 @@ DEFAULT_CONTENT={
     "button_open_file": "Select Text File",
     "button_open_file_tooltip": "Select a text file to start reading practice",
 
+    "button_open_library": "Open Library",
+    "button_open_library_tooltip": "Browse a folder of practice texts with their progress and best accuracy",
+
     "label_progress": "Progress:",
     "label_progress_tooltip": "Shows how many sentences have been completed",
 
@@ -62,6 +125,13 @@ DEFAULT_CONTENT={
     "button_tts": "Listen (TTS)",
     "button_tts_tooltip": "Play the sentence using text-to-speech",
 
+    "label_tts_speed": "Speed: {value:.2f}x",
+    "label_tts_speed_tooltip": "Text-to-speech speed; the pitch is kept",
+
+    "button_tts_prerender": "Pre-render Text",
+    "button_tts_prerender_tooltip": "Synthesize every sentence of the text in the background so Listen never waits",
+    "button_tts_prerender_stop": "Stop Pre-render",
+
     "button_record": "Record",
     "button_record_tooltip": "Start recording your voice",
 
@@ -71,6 +141,9 @@ DEFAULT_CONTENT={
     "button_play_recording": "Play Recording",
     "button_play_recording_tooltip": "Play your recorded voice",
 
+    "button_save_recording": "Save Recording",
+    "button_save_recording_tooltip": "Save your recorded voice as a WAV file",
+
     "label_transcription": "Transcription:",
     "label_transcription_tooltip": "Automatic speech recognition result",
 
@@ -82,16 +155,95 @@ DEFAULT_CONTENT={
 
     "button_save_missing_words": "Save Missing Words",
     "button_delete_missing_words": "Delete Missing Words",
+
+    "button_drill": "Drill Missed Words",
+    "button_drill_tooltip": "Practise the sentences of the opened texts that contain the words you miss most",
+    "button_drill_stop": "Stop Drill",
+    "label_drill_progress": "Drill:",
+    "msg_drill_empty": "No sentence of the opened texts contains the missed words.",
+    "drill_final_message": "Drill finished! Accuracy: {value:.2f}%",
     
     "msg_confirm": "Confirm",
     "msg_delete_words": "Do you really want to delete all the accumulated words?",
     "msg_save_missing_words": "Save Missing Words",
-
-    "final_message": "Finished! Final Accuracy: {value:.2f}%"
+    "msg_save_recording": "Save Recording",
+
+    # Library
+    "library_folder": "",
+    "library_dialog_title": "Library",
+    "library_choose_folder": "Choose Folder...",
+    "library_filter_placeholder": "Filter by file name",
+    "library_open": "Open",
+    "library_summary": "{files} texts, {words} words.",
+    "library_scanning": "Looking for new or changed files...",
+
+    "final_message": "Finished! Final Accuracy: {value:.2f}%",
+
+    # Drill (sentences with the most-missed words)
+    "drill_size": 20,
+    "drill_max_words": 50,
+
+    # ASR
+    "asr_backend": "google",
+    "asr_language": "en-US",
+    "asr_vosk_model": "",
+    "asr_fake_script": [],
+    "msg_asr_error": "Speech recognition failed: {error}",
+    "msg_tts_error": "Text-to-speech failed: {error}",
+    "msg_tts_fallback": "{error} Using Google text-to-speech instead.",
+    "msg_record_error": "Recording failed: {error}",
+    "msg_indexing": "Indexing {file}: {percent:.0f}%",
+    "msg_index_error": "Could not index the file: {error}",
+    "msg_prerendering": "Pre-rendering speech: {percent:.0f}%",
+    "msg_prerender_done": "Pre-rendered {count} sentences.",
+
+    # Pronunciation (CMUdict-style lexicon; empty disables partial credit)
+    "pronunciation_lexicon": "",
+    "pronunciation_min_similarity": 0.6,
+
+    # Recording
+    "record_max_seconds": 30,
+    "record_preroll_ms": 300,
+    "vad_energy_threshold": 0,
+    "vad_calibration_ms": 300,
+    "vad_silence_ms": 900,
+    "vad_start_timeout_s": 8,
+
+    # TTS
+    "tts_backend": "gtts",
+    "tts_language": "en",
+    "tts_speed": 1.0,
+    "tts_cache_disk_mb": 200,
+    "tts_cache_memory_mb": 64,
+    "tts_prefetch_count": 3,
+    "tts_prefetch_workers": 2,
+
+    # Playback
+    "playback_sample_rate": 44100,
+
+    # Background jobs (recording, ASR, TTS and playback)
+    "jobs_max_threads": 4,
+
+    # Latency instrumentation
+    "latency_history": 1024,
+    "latency_debug_panel": False,
+    "latency_export_path": "",
+    "latency_export_format": "json",
+    "latency_panel_title": "Latency",
+    "button_latency_export": "Export",
+    "button_latency_reset": "Reset"
 }
 
-configure.verify_default_config(CONFIG_PATH, default_content=DEFAULT_CONTENT)
-CONFIG = configure.load_config(CONFIG_PATH)
+# Preenchido por carregar_config(): importar o módulo não lê nem grava arquivos
+CONFIG = {}
+
+def carregar_config():
+    """
+    Lê config.json (acrescentando as chaves padrão que faltarem) para CONFIG.
+    """
+    CONFIG.clear()
+    CONFIG.update(configure.load_config(CONFIG_PATH, default_content=DEFAULT_CONTENT))
+    return CONFIG
 
 # ---------------------------------------
 
@@ -100,59 +252,15 @@ CONFIG = configure.load_config(CONFIG_PATH)
 # ==========================
 
 def ler_e_separar_texto(caminho_arquivo, tamanho_maximo=125, separadores=None):
-    if separadores is None:
-        separadores = ["\n\n", ".", ";", ",", "?"]
-
-    with open(caminho_arquivo, "r", encoding="utf-8") as f:
-        texto = f.read()
-
-    def separar_por(texto, sep_list):
-        if not sep_list:
-            return [texto.strip()]
-        sep = sep_list[0]
-        partes = texto.split(sep)
-        resultado = []
-        for i, parte in enumerate(partes):
-            if i < len(partes) - 1:
-                parte = parte.strip() + sep
-            else:
-                parte = parte.strip()
-            resultado.extend(separar_por(parte, sep_list[1:]))
-        return [r for r in resultado if r]
-
-    frases_iniciais = separar_por(texto, separadores)
-    frases_final = []
-
-    for frase in frases_iniciais:
-        frase = frase.replace("\n", " ").strip()
-        if len(frase) <= tamanho_maximo:
-            frases_final.append(frase)
-        else:
-            partes_virgula = [p.strip() + ("," if i < len(frase.split(",")) - 1 else "")
-                               for i, p in enumerate(frase.split(",")) if p.strip()]
-            for pv in partes_virgula:
-                if len(pv) <= tamanho_maximo:
-                    frases_final.append(pv)
-                else:
-                    palavras = pv.split()
-                    temp = ""
-                    for p in palavras:
-                        if len(temp) + len(p) + 1 <= tamanho_maximo:
-                            temp += (" " if temp else "") + p
-                        else:
-                            frases_final.append(temp)
-                            temp = p
-                    if temp:
-                        frases_final.append(temp)
-    return frases_final
+    """
+    Retorna a lista de Frase do arquivo, com os tokens normalizados
+    calculados uma única vez.
+    """
+    return carregar_frases(caminho_arquivo, tamanho_maximo, separadores)
 
 def comparar_frases_bag_of_words(original, transcrito):
-    trad = str.maketrans("", "", string.punctuation)
-    original_words = set(original.translate(trad).lower().split())
-    transcrito_words = set(transcrito.translate(trad).lower().split())
-    acertos = len(original_words & transcrito_words)
-    total = len(original_words)
-    return acertos, total
+    resultado = alinhar(original, transcrito)
+    return resultado.acertos, resultado.total
 
 
 def palavras_faltantes(original, transcrito):
@@ -160,54 +268,197 @@ def palavras_faltantes(original, transcrito):
     Retorna as palavras que estão na frase original
     mas não apareceram na transcrição.
     """
-    trad = str.maketrans("", "", string.punctuation)
-    original_words = set(original.translate(trad).lower().split())
-    transcrito_words = set(transcrito.translate(trad).lower().split())
-    return original_words - transcrito_words
+    return alinhar(original, transcrito).faltantes
 
 
-def gravar_audio(destino):
-    r = sr.Recognizer()
-    with sr.Microphone() as source:
-        print("Gravando...")
-        audio = r.listen(source)
-        print("Gravação finalizada.")
-    with open(destino, "wb") as f:
-        f.write(audio.get_wav_data())
+def abrir_microfone():
+    """Microfone padrão do speech_recognition."""
+    import speech_recognition as sr
+    return sr.Microphone()
+
 
+def criar_sessao_gravacao(config, servico=None):
+    """
+    Cria uma sessão de gravação do microfone com VAD por energia.
+    Com um ServicoCaptura, o microfone já está aberto e a calibração
+    do ruído é reaproveitada entre as frases.
+    """
+    limiar = config["vad_energy_threshold"]
+    abrir_fonte = abrir_microfone
+    if servico is not None:
+        abrir_fonte = servico.abrir_fonte
+        if not limiar:
+            limiar = servico.limiar()
+
+    detector = DetectorVoz(
+        limiar=limiar,
+        calibracao=config["vad_calibration_ms"] / 1000.0,
+        silencio_final=config["vad_silence_ms"] / 1000.0,
+    )
+    return SessaoGravacao(
+        abrir_fonte,
+        detector=detector,
+        duracao_maxima=config["record_max_seconds"],
+        espera_maxima=config["vad_start_timeout_s"],
+    )
+
+
+def gravar_audio(destino=None, sessao=None):
+    """
+    Grava do microfone e retorna uma Gravacao na memória.
+    O WAV só é escrito em disco se destino for informado.
+    """
+    if sessao is None:
+        sessao = criar_sessao_gravacao(CONFIG or carregar_config())
+    print("Gravando...")
+    inicio = time.perf_counter()
+    gravacao = sessao.executar()
+    print("Gravação finalizada.")
+    if gravacao is not None:
+        MEDIDOR.registrar(ETAPA_GRAVACAO, time.perf_counter() - inicio)
+    if gravacao is not None and destino:
+        gravacao.salvar_wav(destino)
+    return gravacao
+
+
+def gravar_e_transcrever(sessao, backend=None, ao_parcial=None):
+    """
+    Executa a sessão de gravação alimentando o reconhecedor bloco a bloco.
+    ao_parcial(texto) é chamado a cada nova hipótese parcial.
+    Retorna (Gravacao, transcrição final), ou (None, "") se cancelada.
+    """
+    if backend is None:
+        backend = BackendGoogleASR()
+
+    fluxo = None
+    ultimo = ""
+
+    def ao_bloco(pcm):
+        nonlocal fluxo, ultimo
+        if fluxo is None:
+            fluxo = backend.iniciar_fluxo(sessao.taxa, sessao.largura)
+        parcial = fluxo.alimentar(pcm)
+        if parcial and parcial != ultimo and ao_parcial is not None:
+            ultimo = parcial
+            ao_parcial(parcial)
+
+    sessao.ao_bloco = ao_bloco
+    gravacao = gravar_audio(sessao=sessao)
+    if gravacao is None:
+        return None, ""
+    if fluxo is None:
+        fluxo = backend.iniciar_fluxo(gravacao.taxa, gravacao.largura)
+    # Só o que resta depois do fim da fala: as parciais já rodaram durante a gravação
+    with MEDIDOR.medir(ETAPA_ASR):
+        transcricao = fluxo.finalizar()
+    return gravacao, transcricao
+
+
+def criar_backend_asr_config(config):
+    opcoes = {
+        "google": {"idioma": config["asr_language"]},
+        "vosk": {"caminho_modelo": config["asr_vosk_model"]},
+        "fake": {"roteiro": config["asr_fake_script"]},
+    }.get(config["asr_backend"], {})
+    return criar_backend_asr(config["asr_backend"], **opcoes)
+
+
+def transcrever_audio(caminho_audio, backend=None):
+    """
+    Transcreve o arquivo WAV. Retorna "" se nenhuma fala foi reconhecida
+    e lança ErroASR se o motor falhar.
+    """
+    import speech_recognition as sr
 
-def transcrever_audio(caminho_audio):
+    if backend is None:
+        backend = BackendGoogleASR()
     r = sr.Recognizer()
     with sr.AudioFile(caminho_audio) as source:
         audio = r.record(source)
-    try:
-        texto = r.recognize_google(audio)
-        return texto
-    except:
-        return ""
-
-def tts_play(texto, idioma="en", fator=1.0):
-    mp3_fp = io.BytesIO()
-    tts = gTTS(text=texto, lang=idioma)
-    tts.write_to_fp(mp3_fp)
-    mp3_fp.seek(0)
-    audio = AudioSegment.from_file(mp3_fp, format="mp3")
+    with MEDIDOR.medir(ETAPA_ASR):
+        return backend.transcrever(audio)
+
+
+def tts_alongar(audio, fator):
+    from speech_reading_trainer.modules.audio_dsp import alongar_segmento
+    with MEDIDOR.medir(ETAPA_ALONGAMENTO):
+        return alongar_segmento(audio, fator)
+
+def tts_sintetizar(texto, idioma="en", fator=1.0, backend=None):
+    if backend is None:
+        backend = BackendGTTS()
+    audio = backend.sintetizar(texto, idioma)
     if fator != 1.0:
-        audio = audio.speedup(playback_speed=fator)
-    threading.Thread(target=lambda: play(audio), daemon=True).start()
+        audio = tts_alongar(audio, fator)
+    return audio
+
+def tts_sintetizar_lote(textos, idioma="en", fator=1.0, backend=None):
+    if backend is None:
+        backend = BackendGTTS()
+    audios = backend.sintetizar_lote(textos, idioma)
+    if fator != 1.0:
+        audios = [tts_alongar(a, fator) for a in audios]
+    return audios
+
+def tts_pre_renderizar(arquivo, idioma, cache, backend, tamanho_lote=8,
+                       progresso=None, token=None):
+    """
+    Sintetiza em lotes, na velocidade normal, as frases do arquivo que
+    ainda não estão no cache. Bloqueia: deve rodar no AgendadorTarefas.
+    progresso(fração de 0 a 1) é chamado a cada lote e token
+    (TokenCancelamento) é consultado entre um lote e outro.
+    Retorna o número de frases sintetizadas.
+    """
+    # Um índice próprio: a GUI pode fechar o dela enquanto isto roda
+    frases = abrir_indice(arquivo, INDEX_DIR)
+    sintetizadas = 0
+    try:
+        lote = []
+        for i in range(len(frases)):
+            texto = frases[i].texto
+            if texto and texto not in lote and not cache.contem(texto, idioma):
+                lote.append(texto)
+            if lote and (len(lote) == tamanho_lote or i == len(frases) - 1):
+                if token is not None:
+                    token.verificar()
+                for texto, audio in zip(lote, tts_sintetizar_lote(lote, idioma, backend=backend)):
+                    cache.guardar(texto, idioma, 1.0, audio)
+                sintetizadas += len(lote)
+                lote = []
+                if progresso is not None:
+                    progresso((i + 1) / len(frases))
+    finally:
+        frases.close()
+    return sintetizadas
+
+def tts_play(texto, idioma="en", fator=1.0, cache=None, backend=None, motor=None):
+    """
+    Sintetiza (ou busca no cache) e toca o áudio. A síntese bloqueia:
+    deve rodar no AgendadorTarefas, nunca na thread da GUI.
+    Com um MotorReproducao, o áudio interrompe o que estiver tocando;
+    sem ele, toca com pydub até o fim.
+    """
+    sintetizar = functools.partial(tts_sintetizar, backend=backend)
+    if cache is None:
+        audio = sintetizar(texto, idioma, fator)
+    else:
+        # O cache guarda a síntese em 1x; a velocidade é aplicada depois
+        audio = cache.obter_ou_sintetizar(texto, idioma, fator, sintetizar, tts_alongar)
+    if motor is None:
+        from pydub.playback import play
+        play(audio)
+    else:
+        motor.tocar(audio)
+
+def html_transcricao(resultado):
+    """
+    HTML da transcrição com as palavras erradas na classe CSS "miss"
+    (ver transcript_view.ESTILO_TRANSCRICAO).
+    """
+    return html_spans(resultado.spans)
 
 def transcricao_com_cores(transcrito, original):
-    trad = str.maketrans("", "", string.punctuation)
-    orig_words_set = set([w.translate(trad).lower() for w in original.split()])
-    words = transcrito.split()
-    html = ""
-    for w in words:
-        w_clean = w.translate(trad).lower()
-        if w_clean in orig_words_set:
-            html += f'<span style="color:black">{w}</span> '
-        else:
-            html += f'<span style="color:red">{w}</span> '
-    return html.strip()
+    return html_transcricao(alinhar(original, transcrito))
 
 
 # ==========================
@@ -216,11 +467,17 @@ def transcricao_com_cores(transcrito, original):
 
 class SpeechReadingTrainer(QMainWindow):
 
-    transcricao_pronta = pyqtSignal(str)
-    grava_finalizada = pyqtSignal()
+    # Spans [(palavra, correta), ...] de uma transcrição parcial
+    transcricao_pronta = pyqtSignal(object)
+    # (arquivo, fração) da indexação em segundo plano
+    indexacao_progresso = pyqtSignal(str, float)
+    # (token, fração) da pré-renderização do TTS
+    pre_renderizacao_progresso = pyqtSignal(object, float)
 
     def __init__(self):
         super().__init__()
+        if not CONFIG:
+            carregar_config()
 
         self.setWindowTitle(about.__program_name__)
         self.resize(CONFIG["window_width"], CONFIG["window_height"])
@@ -232,17 +489,92 @@ class SpeechReadingTrainer(QMainWindow):
 
         self.frases = []
         self.index_frase = 0
+        # Textos abertos nesta execução, com o índice invertido das palavras deles
+        self.textos_carregados = {}
+        self.indice_invertido = IndiceInvertido()
+        # Fila de treino (ItemTreino); vazia fora do modo de treino
+        self.fila_treino = []
+        self.posicao_treino = 0
+        self.acertos_treino = 0
+        self.palavras_treino = 0
         self.total_palavras = 0
         self.total_acertos = 0
-        self.audio_path = "recorded.wav"
+        self.gravacao = None
+        self.sessao_gravacao = None
+        self.servico_captura = ServicoCaptura(abrir_microfone,
+                                              preroll=CONFIG["record_preroll_ms"] / 1000.0)
         self.ultima_transcricao = ""
+        self.ultimo_alinhamento = None   # (frase, transcrição, ResultadoAlinhamento)
+        self.tempos_gravacao = {}
+        self.inicio_gravacao = None
+
+        MEDIDOR.configurar(capacidade=CONFIG["latency_history"])
+
+        # Registro durável das avaliações, gravado fora da thread da GUI
+        self.registro = RegistroSessao(SESSION_LOG_PATH)
+        self.sessao_id = None
+
+        # Metadados dos textos da biblioteca, atualizados por data de modificação
+        self.biblioteca = Biblioteca(LIBRARY_PATH, INDEX_DIR)
+        self.janela_biblioteca = None
+        self.token_biblioteca = None
+        # Indexação do texto escolhido, quando ele ainda não tem índice
+        self.token_indexacao = None
+        self.arquivo_indexando = None
+        self.arquivo_atual = None
+        # Síntese do texto inteiro para o cache do TTS
+        self.token_pre_renderizacao = None
+        # (IndiceFrases, posição) da última gravação de posição agendada
+        self.posicao_pendente = None
+
+        try:
+            self.backend_asr = criar_backend_asr_config(CONFIG)
+        except (ErroASR, ValueError) as e:
+            print(f"{e} Falling back to Google speech recognition.")
+            self.backend_asr = BackendGoogleASR(idioma=CONFIG["asr_language"])
+
+        # Todo o trabalho bloqueante passa por aqui, fora do laço de eventos
+        self.agendador = AgendadorTarefas(
+            max_threads=CONFIG["jobs_max_threads"],
+            limites={PrefetchTTS.GRUPO: CONFIG["tts_prefetch_workers"], GRUPO_POSICAO: 1},
+        )
+
+        # Compilar o CMUdict na primeira vez leva segundos: fora da thread da GUI.
+        # Até o léxico abrir, as avaliações só contam acertos exatos.
+        self.lexico = None
+        if CONFIG["pronunciation_lexicon"]:
+            self.agendador.submeter(abrir_lexico, CONFIG["pronunciation_lexicon"], LEXICON_DIR,
+                                    prioridade=PRIORIDADE_PREFETCH,
+                                    ao_concluir=self.lexico_aberto,
+                                    ao_falhar=self.falha_lexico)
+
+        # Um único dispositivo de saída para TTS e gravações
+        self.motor_reproducao = MotorReproducao(taxa=CONFIG["playback_sample_rate"])
+
+        try:
+            self.backend_tts = criar_backend_tts(CONFIG["tts_backend"])
+        except (RuntimeError, ValueError) as e:
+            print(f"{e} Falling back to Google text-to-speech.")
+            self.statusBar().showMessage(CONFIG["msg_tts_fallback"].format(error=e))
+            self.backend_tts = BackendGTTS()
+        self.cache_tts = CacheTTS(TTS_CACHE_DIR,
+                                  limite_disco=CONFIG["tts_cache_disk_mb"] * 1024 * 1024,
+                                  limite_memoria=CONFIG["tts_cache_memory_mb"] * 1024 * 1024,
+                                  backend=self.backend_tts.nome)
+        self.prefetch_tts = PrefetchTTS(self.cache_tts,
+                                        functools.partial(tts_sintetizar, backend=self.backend_tts),
+                                        self.agendador, alongar=tts_alongar)
 
         self.transcricao_pronta.connect(self.atualizar_transcricao)
-        self.grava_finalizada.connect(self.gravacao_finalizada)
+        self.indexacao_progresso.connect(self.mostrar_progresso_indexacao)
+        self.pre_renderizacao_progresso.connect(self.mostrar_progresso_pre_renderizacao)
 
-        # SET acumulativo de palavras erradas
-        self.palavras_erradas = set()
-        self.model_palavras = QStringListModel()
+        # Palavras erradas acumuladas, com contagem, persistidas por acréscimo
+        diario = DiarioPalavras(MISSING_WORDS_PATH)
+        novo_diario = not diario.existe()
+        self.model_palavras = ModeloPalavrasFaltantes(diario, self)
+        if novo_diario:
+            self.model_palavras.adicionar(sorted(self.registro.palavras_faltantes()))
 
         self._create_toolbar()
 
@@ -258,7 +590,16 @@ class SpeechReadingTrainer(QMainWindow):
         self.btn_abrir.setIcon(QIcon.fromTheme("document-send"))
         self.btn_abrir.setToolTip(CONFIG["button_open_file_tooltip"])
         self.btn_abrir.clicked.connect(self.abrir_arquivo)
-        layout.addWidget(self.btn_abrir)
+
+        self.btn_biblioteca = QPushButton(CONFIG["button_open_library"])
+        self.btn_biblioteca.setIcon(QIcon.fromTheme("folder-open"))
+        self.btn_biblioteca.setToolTip(CONFIG["button_open_library_tooltip"])
+        self.btn_biblioteca.clicked.connect(self.abrir_biblioteca)
+
+        abrir_layout = QHBoxLayout()
+        abrir_layout.addWidget(self.btn_abrir, 1)
+        abrir_layout.addWidget(self.btn_biblioteca, 1)
+        layout.addLayout(abrir_layout)
 
         # Barra de progresso e acurácia
         self.label_progresso = QLabel(CONFIG["label_progress"])
@@ -289,7 +630,38 @@ class SpeechReadingTrainer(QMainWindow):
         self.btn_tts.setToolTip(CONFIG["button_tts_tooltip"])
         self.btn_tts.setEnabled(False)
         self.btn_tts.clicked.connect(self.ouvir_tts)
-        layout.addWidget(self.btn_tts)
+
+        # Velocidade do TTS, de 0.5x a 2x
+        self.fator_tts = min(2.0, max(0.5, float(CONFIG["tts_speed"])))
+        self.label_velocidade = QLabel()
+        self.label_velocidade.setToolTip(CONFIG["label_tts_speed_tooltip"])
+        self.slider_velocidade = QSlider(Qt.Horizontal)
+        self.slider_velocidade.setRange(50, 200)
+        self.slider_velocidade.setSingleStep(5)
+        self.slider_velocidade.setPageStep(25)
+        self.slider_velocidade.setValue(int(round(self.fator_tts * 100)))
+        self.slider_velocidade.setToolTip(CONFIG["label_tts_speed_tooltip"])
+        self.slider_velocidade.valueChanged.connect(self.mudar_velocidade_tts)
+        self.slider_velocidade.sliderReleased.connect(self.salvar_velocidade_tts)
+        # Mouse, teclado ou roda: a velocidade é salva quando para de mudar
+        self.timer_velocidade = QTimer(self)
+        self.timer_velocidade.setSingleShot(True)
+        self.timer_velocidade.setInterval(500)
+        self.timer_velocidade.timeout.connect(self.salvar_velocidade_tts)
+        self.atualizar_label_velocidade()
+
+        tts_layout = QHBoxLayout()
+        tts_layout.addWidget(self.btn_tts, 1)
+        tts_layout.addWidget(self.label_velocidade)
+        tts_layout.addWidget(self.slider_velocidade)
+
+        self.btn_pre_renderizar = QPushButton(CONFIG["button_tts_prerender"])
+        self.btn_pre_renderizar.setIcon(QIcon.fromTheme("document-save"))
+        self.btn_pre_renderizar.setToolTip(CONFIG["button_tts_prerender_tooltip"])
+        self.btn_pre_renderizar.setEnabled(False)
+        self.btn_pre_renderizar.clicked.connect(self.alternar_pre_renderizacao)
+        tts_layout.addWidget(self.btn_pre_renderizar)
+        layout.addLayout(tts_layout)
 
         # Botões gravação
         h_layout = QHBoxLayout()
@@ -315,6 +687,13 @@ class SpeechReadingTrainer(QMainWindow):
         self.btn_ouvir.clicked.connect(self.ouvir_gravado)
         h_layout.addWidget(self.btn_ouvir)
 
+        self.btn_salvar_gravacao = QPushButton(CONFIG["button_save_recording"])
+        self.btn_salvar_gravacao.setIcon(QIcon.fromTheme("document-save"))
+        self.btn_salvar_gravacao.setToolTip(CONFIG["button_save_recording_tooltip"])
+        self.btn_salvar_gravacao.setEnabled(False)
+        self.btn_salvar_gravacao.clicked.connect(self.salvar_gravacao)
+        h_layout.addWidget(self.btn_salvar_gravacao)
+
         layout.addLayout(h_layout)
 
         # Texto transcrito
@@ -326,6 +705,8 @@ class SpeechReadingTrainer(QMainWindow):
         self.text_transcrito.setReadOnly(True)
         self.text_transcrito.setToolTip(CONFIG["label_transcription_tooltip"])
         layout.addWidget(self.text_transcrito)
+        # Atualizações incrementais por QTextCursor, sem setHtml
+        self.visao_transcricao = VisaoTranscricao(self.text_transcrito)
 
         # Botão Avaliar
         self.btn_avaliar = QPushButton(CONFIG["button_evaluate"])
@@ -340,6 +721,11 @@ class SpeechReadingTrainer(QMainWindow):
         self.list_view.setModel(self.model_palavras)
         right_layout.addWidget(self.list_view)
 
+        self.btn_treino = QPushButton(CONFIG["button_drill"])
+        self.btn_treino.setIcon(QIcon.fromTheme("media-playlist-repeat"))
+        self.btn_treino.setToolTip(CONFIG["button_drill_tooltip"])
+        self.btn_treino.clicked.connect(self.alternar_treino)
+        right_layout.addWidget(self.btn_treino)
 
         self.btn_salvar_lista = QPushButton(CONFIG["button_save_missing_words"])
         self.btn_salvar_lista.setIcon(QIcon.fromTheme("document-save"))
@@ -374,6 +760,12 @@ class SpeechReadingTrainer(QMainWindow):
 
         central_widget.setLayout(main_layout)
 
+        # Painel opcional com os percentis de latência
+        if CONFIG["latency_debug_panel"]:
+            self._create_latency_panel()
+
+        self.restaurar_sessao()
+
 
     def _create_toolbar(self):
         self.toolbar = self.addToolBar("Main")
@@ -412,6 +804,23 @@ class SpeechReadingTrainer(QMainWindow):
         self.toolbar.orientationChanged.connect(self.on_update_spacer_policy)
         self.on_update_spacer_policy()
 
+    def _create_latency_panel(self):
+        self.painel_latencia = PainelLatencia(
+            texto_exportar=CONFIG["button_latency_export"],
+            texto_limpar=CONFIG["button_latency_reset"],
+            formato_exportacao=CONFIG["latency_export_format"],
+        )
+        self.dock_latencia = QDockWidget(CONFIG["latency_panel_title"], self)
+        self.dock_latencia.setObjectName("latency_panel")
+        self.dock_latencia.setWidget(self.painel_latencia)
+        self.addDockWidget(Qt.BottomDockWidgetArea, self.dock_latencia)
+
+        self.latency_action = self.dock_latencia.toggleViewAction()
+        self.latency_action.setIcon(QIcon.fromTheme("utilities-system-monitor"))
+        self.latency_action.setText(CONFIG["toolbar_latency"])
+        self.latency_action.setToolTip(CONFIG["toolbar_latency_tooltip"])
+        self.toolbar.insertAction(self.configure_action, self.latency_action)
+
     def apagar_lista_palavras(self):
 
         resposta = QMessageBox.question(
@@ -423,8 +832,8 @@ class SpeechReadingTrainer(QMainWindow):
         )
 
         if resposta == QMessageBox.Yes:
-            self.palavras_erradas.clear()
-            self.atualizar_lista_palavras()
+            self.model_palavras.limpar()
+            self.registro.limpar_palavras_faltantes()
         
     def on_update_spacer_policy(self):
         """Atualiza a política do espaçador baseado na orientação da toolbar"""
@@ -474,99 +883,451 @@ class SpeechReadingTrainer(QMainWindow):
             CONFIG["file_dialog_filter"]
         )
         if arquivo:
-            self.ultima_transcricao = ""
-            
-            # Reset estatísticas (mas NÃO as palavras erradas)
-            self.total_acertos = 0
-            self.total_palavras = 0
-            self.atualizar_acuracia()
+            self.carregar_arquivo(arquivo)
 
-            self.frases = ler_e_separar_texto(arquivo)
-            self.index_frase = 0
-            
-            if not self.frases:
-                QMessageBox.warning(self, "Warning", "The selected file has no valid sentences.")
+    def abrir_biblioteca(self):
+        pasta = CONFIG["library_folder"]
+        if not pasta or not os.path.isdir(pasta):
+            pasta = QFileDialog.getExistingDirectory(self, CONFIG["library_choose_folder"])
+            if not pasta:
                 return
-            
-            self.progress.setMaximum(len(self.frases))
-            self.progress.setValue(0)
+            self.salvar_pasta_biblioteca(pasta)
+
+        if self.janela_biblioteca is None:
+            self.janela_biblioteca = JanelaBiblioteca(CONFIG, self)
+            self.janela_biblioteca.arquivo_escolhido.connect(self.carregar_arquivo)
+            self.janela_biblioteca.pasta_escolhida.connect(self.trocar_pasta_biblioteca)
+        self.sincronizar_biblioteca(pasta)
+        self.janela_biblioteca.exec_()
+
+    def salvar_pasta_biblioteca(self, pasta):
+        CONFIG["library_folder"] = pasta
+        configure.save_config(CONFIG_PATH, CONFIG)
+
+    def trocar_pasta_biblioteca(self, pasta):
+        self.salvar_pasta_biblioteca(pasta)
+        self.sincronizar_biblioteca(pasta)
+
+    def sincronizar_biblioteca(self, pasta):
+        """
+        Mostra na hora o que já está indexado e, em segundo plano, indexa
+        só os arquivos novos ou modificados da pasta.
+        """
+        self.janela_biblioteca.mostrar(pasta, self.biblioteca.documentos(pasta), sincronizando=True)
+        if self.token_biblioteca is not None:
+            self.token_biblioteca.cancelar()
+        self.token_biblioteca = TokenCancelamento()
+        # Passadas completas já registradas contam como melhor acurácia
+        self.agendador.submeter(self.biblioteca.sincronizar, pasta, self.token_biblioteca,
+                                self.registro.acuracias_sessoes(),
+                                token=self.token_biblioteca,
+                                prioridade=PRIORIDADE_PREFETCH,
+                                ao_concluir=self.biblioteca_sincronizada,
+                                ao_falhar=lambda e: print(f"Library scan failed: {e}"))
+
+    def biblioteca_sincronizada(self, resultado):
+        for caminho, mensagem in resultado.falhas:
+            print(f"Could not index {caminho}: {mensagem}")
+        if self.janela_biblioteca is not None and \
+                os.path.abspath(CONFIG["library_folder"]) == resultado.pasta:
+            self.janela_biblioteca.mostrar(resultado.pasta, resultado.documentos)
+
+    def restaurar_sessao(self):
+        """Reabre o arquivo da última sessão registrada, se ele ainda existir."""
+        sessao = self.registro.ultima_sessao()
+        if sessao is not None and os.path.isfile(sessao.arquivo):
+            self.carregar_arquivo(sessao.arquivo)
+
+    def carregar_arquivo(self, arquivo):
+        self.ultima_transcricao = ""
 
-            self.text_frase.setText(self.frases[self.index_frase])
-            
-            self.btn_tts.setEnabled(True)
-            self.btn_gravar.setEnabled(True)
-            self.btn_parar.setEnabled(True)
-            self.btn_ouvir.setEnabled(True)
-            self.btn_avaliar.setEnabled(True)
+        self.prefetch_tts.cancelar()
+        self.cancelar_pre_renderizacao()
+        self.motor_reproducao.parar()
+        self.cancelar_gravacao()
+        self.limpar_treino()
+        self.cancelar_indexacao()
+
+        # Um recente ou item da biblioteca pode apontar para um arquivo apagado
+        try:
+            # Primeira abertura (ou texto modificado): segmenta fora da thread da GUI
+            if not indice_atualizado(arquivo, INDEX_DIR):
+                self.indexar_arquivo(arquivo)
+                return
+            # Índice em disco: só re-segmenta se o arquivo mudou
+            frases = abrir_indice(arquivo, INDEX_DIR)
+        except OSError as e:
+            QMessageBox.warning(self, about.__program_name__,
+                                CONFIG["msg_index_error"].format(error=e))
+            return
+
+        # Os textos abertos antes continuam mapeados: o treino usa todos eles
+        chave = os.path.abspath(arquivo)
+        anterior = self.textos_carregados.pop(chave, None)
+        if anterior is not None:
+            self.indice_invertido.remover(chave)
+            anterior.close()
+
+        self.frases = frases
+        self.textos_carregados[chave] = self.frases
+        self.index_frase = self.frases.posicao
+        self.arquivo_atual = arquivo
+        
+        if not self.frases:
+            QMessageBox.warning(self, "Warning", "The selected file has no valid sentences.")
+            return
+        self.indice_invertido.adicionar(chave, self.frases.palavras(), len(self.frases))
+
+        # Texto já concluído: recomeça do início
+        if self.index_frase >= len(self.frases):
+            self.index_frase = 0
+        self.biblioteca.registrar_abertura(arquivo)
+        self.biblioteca.registrar_progresso(arquivo, self.index_frase)
+
+        # Estatísticas (mas NÃO as palavras erradas): continua a sessão
+        # registrada do arquivo, ou começa uma nova no início do texto
+        sessao = None
+        if self.index_frase > 0:
+            sessao = self.registro.sessao_do_arquivo(arquivo)
+        if sessao is not None:
+            self.sessao_id = sessao.id
+            self.total_acertos = sessao.acertos
+            self.total_palavras = sessao.palavras
+        else:
+            self.sessao_id = self.registro.iniciar_sessao(arquivo)
+            self.total_acertos = 0
+            self.total_palavras = 0
+        self.atualizar_acuracia()
+        
+        self.progress.setMaximum(len(self.frases))
+        self.progress.setValue(self.index_frase)
+
+        self.text_frase.setText(self.frases[self.index_frase].texto)
+        self.agendar_prefetch_tts()
+        
+        self.btn_tts.setEnabled(True)
+        self.btn_pre_renderizar.setEnabled(True)
+        self.btn_gravar.setEnabled(True)
+        self.btn_parar.setEnabled(True)
+        self.btn_ouvir.setEnabled(True)
+        self.btn_avaliar.setEnabled(True)
+
+    def indexar_arquivo(self, arquivo):
+        """
+        Constrói o índice do arquivo no agendador, com o progresso na barra
+        de status; a navegação fica desligada até carregar_arquivo rodar
+        de novo, com o índice pronto.
+        """
+        self.habilitar_navegacao(False)
+        self.btn_treino.setEnabled(False)
+        self.arquivo_indexando = arquivo
+        self.token_indexacao = TokenCancelamento()
+        self.mostrar_progresso_indexacao(arquivo, 0.0)
+        progresso = functools.partial(self.indexacao_progresso.emit, arquivo)
+        self.agendador.submeter(metadados_indice, arquivo, INDEX_DIR, 125,
+                                progresso, self.token_indexacao,
+                                token=self.token_indexacao,
+                                prioridade=PRIORIDADE_TTS,
+                                ao_concluir=functools.partial(self.indexacao_concluida, arquivo),
+                                ao_falhar=self.falha_indexacao)
+
+    def cancelar_indexacao(self):
+        if self.token_indexacao is not None:
+            self.token_indexacao.cancelar()
+            self.token_indexacao = None
+            self.arquivo_indexando = None
+            self.statusBar().clearMessage()
+            self.btn_treino.setEnabled(True)
+
+    def mostrar_progresso_indexacao(self, arquivo, fracao):
+        # Avisos atrasados de uma indexação já cancelada são ignorados
+        if arquivo == self.arquivo_indexando:
+            self.statusBar().showMessage(CONFIG["msg_indexing"].format(
+                file=os.path.basename(arquivo), percent=fracao * 100))
+
+    def indexacao_concluida(self, arquivo, meta):
+        if arquivo != self.arquivo_indexando:
+            return
+        self.cancelar_indexacao()
+        self.carregar_arquivo(arquivo)
+
+    def falha_indexacao(self, erro):
+        self.cancelar_indexacao()
+        self.mostrar_frase_atual()
+        QMessageBox.warning(self, about.__program_name__,
+                            CONFIG["msg_index_error"].format(error=erro))
+
+    def frase_atual(self):
+        """A frase a ler: a da fila de treino, no modo de treino, ou a do texto."""
+        return self.proximas_frases(1)[0]
+
+    def proximas_frases(self, n):
+        """A frase atual e as seguintes, até n frases."""
+        if self.fila_treino:
+            itens = self.fila_treino[self.posicao_treino:self.posicao_treino + n]
+            return [self.textos_carregados[item.chave][item.numero] for item in itens]
+        fim = min(self.index_frase + n, len(self.frases))
+        return [self.frases[i] for i in range(self.index_frase, fim)]
+
+    def agendar_prefetch_tts(self):
+        """Sintetiza em segundo plano a frase atual e as próximas."""
+        frases = self.proximas_frases(1 + CONFIG["tts_prefetch_count"])
+        self.prefetch_tts.agendar([frase.texto for frase in frases],
+                                  idioma=CONFIG["tts_language"], fator=self.fator_tts)
+
+    def atualizar_label_velocidade(self):
+        self.label_velocidade.setText(CONFIG["label_tts_speed"].format(value=self.fator_tts))
+
+    def mudar_velocidade_tts(self, valor):
+        self.fator_tts = valor / 100.0
+        self.atualizar_label_velocidade()
+        self.timer_velocidade.start()
+
+    def salvar_velocidade_tts(self):
+        # Durante o arraste só o rótulo muda; salvar e o prefetch esperam o fim
+        if self.slider_velocidade.isSliderDown():
+            return
+        self.timer_velocidade.stop()
+        if CONFIG["tts_speed"] == self.fator_tts:
+            return
+        CONFIG["tts_speed"] = self.fator_tts
+        configure.save_config(CONFIG_PATH, CONFIG)
+        if self.frases:
+            self.agendar_prefetch_tts()
 
     def ouvir_tts(self):
-        frase = self.frases[self.index_frase]
-        tts_play(frase)
+        frase = self.frase_atual()
+        self.agendador.submeter(tts_play, frase.texto, idioma=CONFIG["tts_language"],
+                                fator=self.fator_tts,
+                                cache=self.cache_tts, backend=self.backend_tts,
+                                motor=self.motor_reproducao,
+                                prioridade=PRIORIDADE_TTS,
+                                ao_falhar=self.mostrar_erro_tts)
 
     def gravar(self):
+        # Uma única sessão por vez: evita threads presas ao microfone
+        if self.sessao_gravacao is not None and self.sessao_gravacao.ativa:
+            return
         self.btn_gravar.setEnabled(False)
         self.btn_parar.setEnabled(True)
-        threading.Thread(target=self._gravar_thread, daemon=True).start()
+        # O microfone não deve captar o próprio TTS
+        self.motor_reproducao.parar()
+        self.inicio_gravacao = time.perf_counter()
+        self.sessao_gravacao = criar_sessao_gravacao(CONFIG, self.servico_captura)
+        frase = self.frase_atual()
+        self.agendador.submeter(self._tarefa_gravar, self.sessao_gravacao, frase,
+                                prioridade=PRIORIDADE_GRAVACAO,
+                                ao_concluir=functools.partial(self.gravacao_concluida, frase),
+                                ao_falhar=self.falha_gravacao,
+                                ao_cancelar=self.gravacao_finalizada)
+
+    def _tarefa_gravar(self, sessao, frase):
+        """
+        Roda no agendador: grava e transcreve, emitindo as parciais.
+        Retorna (gravacao, transcricao, erro, tempos).
+        """
+        def ao_parcial(parcial):
+            # O alinhamento roda aqui; a GUI só aplica a diferença
+            self.transcricao_pronta.emit(alinhar(frase, parcial).spans)
+
+        inicio = time.perf_counter()
+        erro = None
+        try:
+            gravacao, transcricao = gravar_e_transcrever(sessao, self.backend_asr, ao_parcial)
+        except ErroASR as e:
+            gravacao, transcricao = sessao.gravacao, ""
+            erro = str(e)
+
+        if sessao.estado == SessaoGravacao.CANCELADA:
+            raise TarefaCancelada()
+
+        tempos = {
+            "audio_s": gravacao.duracao if gravacao is not None else 0.0,
+            "record_asr_s": time.perf_counter() - inicio,
+        }
+        return gravacao, transcricao, erro, tempos
+
+    def gravacao_concluida(self, frase, resultado):
+        gravacao, transcricao, erro, tempos = resultado
+        self.gravacao = gravacao
+        self.ultima_transcricao = transcricao
+        self.tempos_gravacao = tempos
+        resultado_alinhamento = alinhar(frase, transcricao)
+        self.ultimo_alinhamento = (frase, transcricao, resultado_alinhamento)
+        self.atualizar_transcricao(resultado_alinhamento.spans)
+        if self.inicio_gravacao is not None and transcricao:
+            MEDIDOR.registrar(ETAPA_GRAVAR_ATE_TRANSCRICAO,
+                              time.perf_counter() - self.inicio_gravacao)
+        self.gravacao_finalizada()
+        if erro:
+            self.mostrar_erro_asr(erro)
+
+    def falha_gravacao(self, erro):
+        self.gravacao_finalizada()
+        QMessageBox.warning(self, about.__program_name__,
+                            CONFIG["msg_record_error"].format(error=erro))
+
+    def atualizar_transcricao(self, spans):
+        with MEDIDOR.medir(ETAPA_RENDERIZACAO):
+            self.visao_transcricao.mostrar(spans)
+
+    def mostrar_erro_asr(self, mensagem):
+        QMessageBox.warning(self, about.__program_name__,
+                            CONFIG["msg_asr_error"].format(error=mensagem))
+
+    def lexico_aberto(self, lexico):
+        self.lexico = lexico
+
+    def falha_lexico(self, erro):
+        # OSError (arquivo) ou ValueError (linha malformada no dicionário)
+        print(f"Could not open the pronunciation lexicon: {erro}")
+
+    def salvar_posicao(self):
+        """
+        Grava a posição de leitura no índice do texto fora da thread da GUI.
+        """
+        self.posicao_pendente = (self.frases, self.index_frase)
+        self.agendador.submeter(self.frases.salvar_posicao, self.index_frase,
+                                prioridade=PRIORIDADE_PREFETCH, grupo=GRUPO_POSICAO,
+                                ao_falhar=lambda e: print(f"Could not save the reading position: {e}"))
+
+    def alternar_pre_renderizacao(self):
+        if self.token_pre_renderizacao is not None:
+            self.cancelar_pre_renderizacao()
+            return
+        token = self.token_pre_renderizacao = TokenCancelamento()
+        self.btn_pre_renderizar.setText(CONFIG["button_tts_prerender_stop"])
+        self.mostrar_progresso_pre_renderizacao(token, 0.0)
+        progresso = functools.partial(self.pre_renderizacao_progresso.emit, token)
+        # Um passo atrás do prefetch: a frase atual e as próximas vêm antes
+        self.agendador.submeter(tts_pre_renderizar, self.arquivo_atual, CONFIG["tts_language"],
+                                self.cache_tts, self.backend_tts, 8, progresso, token,
+                                token=token,
+                                prioridade=PRIORIDADE_PREFETCH,
+                                ao_concluir=functools.partial(self.pre_renderizacao_concluida, token),
+                                ao_falhar=functools.partial(self.falha_pre_renderizacao, token))
+
+    def cancelar_pre_renderizacao(self):
+        if self.token_pre_renderizacao is not None:
+            self.token_pre_renderizacao.cancelar()
+            self.token_pre_renderizacao = None
+            self.btn_pre_renderizar.setText(CONFIG["button_tts_prerender"])
+            self.statusBar().clearMessage()
+
+    def mostrar_progresso_pre_renderizacao(self, token, fracao):
+        # Avisos atrasados de uma pré-renderização já cancelada são ignorados
+        if token is self.token_pre_renderizacao:
+            self.statusBar().showMessage(CONFIG["msg_prerendering"].format(percent=fracao * 100))
+
+    def pre_renderizacao_concluida(self, token, sintetizadas):
+        if token is not self.token_pre_renderizacao:
+            return
+        self.cancelar_pre_renderizacao()
+        self.statusBar().showMessage(CONFIG["msg_prerender_done"].format(count=sintetizadas), 5000)
 
-    def _gravar_thread(self):
-        gravar_audio(self.audio_path)
-        frase = self.frases[self.index_frase]
-        self.ultima_transcricao = transcrever_audio(self.audio_path)
-        html = transcricao_com_cores(self.ultima_transcricao, frase)
-        self.transcricao_pronta.emit(html)
-        self.grava_finalizada.emit()
+    def falha_pre_renderizacao(self, token, erro):
+        if token is not self.token_pre_renderizacao:
+            return
+        self.cancelar_pre_renderizacao()
+        self.mostrar_erro_tts(erro)
 
-    def atualizar_transcricao(self, html):
-        self.text_transcrito.setHtml(html)
+    def mostrar_erro_tts(self, erro):
+        QMessageBox.warning(self, about.__program_name__,
+                            CONFIG["msg_tts_error"].format(error=erro))
 
     def gravacao_finalizada(self):
         self.btn_gravar.setEnabled(True)
         self.btn_parar.setEnabled(False)
         self.btn_ouvir.setEnabled(True)
+        self.btn_salvar_gravacao.setEnabled(self.gravacao is not None)
 
     def parar_gravacao(self):
-        self.btn_gravar.setEnabled(True)
+        self.motor_reproducao.parar()
+        if self.sessao_gravacao is not None:
+            self.sessao_gravacao.parar()
         self.btn_parar.setEnabled(False)
 
+    def cancelar_gravacao(self):
+        if self.sessao_gravacao is not None:
+            self.sessao_gravacao.cancelar()
+
     def ouvir_gravado(self):
-        if os.path.exists(self.audio_path):
-            audio = AudioSegment.from_wav(self.audio_path)
-            threading.Thread(target=lambda: play(audio), daemon=True).start()
+        if self.gravacao is not None:
+            self.motor_reproducao.tocar(self.gravacao)
+
+    def salvar_gravacao(self):
+        if self.gravacao is None:
+            return
+
+        caminho, _ = QFileDialog.getSaveFileName(
+            self,
+            CONFIG["msg_save_recording"],
+            "",
+            "WAV Files (*.wav)"
+        )
+
+        if caminho:
+            self.gravacao.salvar_wav(caminho)
 
     def avaliar(self):
-        if not os.path.exists(self.audio_path):
+        if self.gravacao is None:
             return
 
-        frase = self.frases[self.index_frase]
+        frase = self.frase_atual()
         transcrito = self.ultima_transcricao
         if not self.ultima_transcricao:
             return
 
-        # Exibe transcrição colorida imediatamente
-        html = transcricao_com_cores(transcrito, frase)
-        self.text_transcrito.setHtml(html)
+        # Um único alinhamento serve para cores, acertos e faltantes;
+        # o da transcrição final já exibida é reaproveitado
+        inicio = time.perf_counter()
+        if (self.ultimo_alinhamento is not None and self.ultimo_alinhamento[0] == frase
+                and self.ultimo_alinhamento[1] == transcrito):
+            resultado = self.ultimo_alinhamento[2]
+        else:
+            resultado = alinhar(frase, transcrito)
+        credito = resultado.acertos
+        if self.lexico is not None:
+            credito = credito_fonetico(resultado, self.lexico,
+                                       CONFIG["pronunciation_min_similarity"])[0]
+        tempos = dict(self.tempos_gravacao, score_s=time.perf_counter() - inicio)
+        MEDIDOR.registrar(ETAPA_PONTUACAO, tempos["score_s"])
+
+        # Exibe transcrição colorida imediatamente (nada muda se já está na tela)
+        self.atualizar_transcricao(resultado.spans)
+
+        # No treino, o texto aberto, a sessão e a acurácia dele ficam como estão
+        if self.fila_treino:
+            self.avaliar_treino(frase, resultado, credito)
+            return
 
-        # Atualiza acertos
-        acertos, total = comparar_frases_bag_of_words(frase, transcrito)
-        self.total_acertos += acertos
-        self.total_palavras += total
+        # Atualiza acertos; com o léxico, quase acertos valem crédito parcial
+        self.total_acertos += credito
+        self.total_palavras += resultado.total
         self.atualizar_acuracia()
 
-        faltantes = palavras_faltantes(frase, transcrito)
-        self.palavras_erradas.update(faltantes)
-        self.atualizar_lista_palavras()
+        # Enfileirado: a gravação em disco acontece na thread do registro
+        self.registro.registrar(self.sessao_id, self.index_frase, frase.texto,
+                                resultado, credito, tempos)
+
+        # Só as palavras novas viram linhas novas; a lista mantém a rolagem
+        self.model_palavras.adicionar(sorted(resultado.faltantes))
 
         # Avança para próxima frase
         self.index_frase += 1
         self.progress.setValue(self.index_frase)
+        self.salvar_posicao()
+        self.biblioteca.registrar_progresso(self.arquivo_atual, self.index_frase)
 
         if self.index_frase < len(self.frases):
-            self.text_frase.setText(self.frases[self.index_frase])
-            self.text_transcrito.clear()
+            self.text_frase.setText(self.frases[self.index_frase].texto)
+            self.visao_transcricao.limpar()
+            self.agendar_prefetch_tts()
         else:
             precisao = (self.total_acertos / self.total_palavras) * 100 if self.total_palavras else 0
 
             mensagem_final = CONFIG["final_message"].format(value=precisao)
+            self.biblioteca.registrar_acuracias([(self.arquivo_atual, precisao)])
 
             msg = QMessageBox(self)
             msg.setWindowTitle(about.__program_name__)
@@ -590,20 +1351,101 @@ class SpeechReadingTrainer(QMainWindow):
             msg.exec_()
 
             self.text_frase.setText(mensagem_final)
-            self.text_transcrito.clear()
+            self.visao_transcricao.limpar()
 
             self.btn_tts.setEnabled(False)
             self.btn_gravar.setEnabled(False)
             self.btn_parar.setEnabled(False)
             self.btn_ouvir.setEnabled(False)
+            self.btn_salvar_gravacao.setEnabled(False)
             self.btn_avaliar.setEnabled(False)
 
-    def atualizar_lista_palavras(self):
-        lista_ordenada = sorted(self.palavras_erradas)
-        self.model_palavras.setStringList(lista_ordenada)
+    # ---------- treino das palavras erradas ----------
+
+    def alternar_treino(self):
+        if self.fila_treino:
+            self.encerrar_treino()
+        else:
+            self.iniciar_treino()
+
+    def iniciar_treino(self):
+        """
+        Monta, pelo índice invertido, a fila das frases dos textos abertos
+        que têm as palavras mais erradas e passa a praticá-las no lugar
+        do texto.
+        """
+        fila = self.indice_invertido.fila_treino(self.model_palavras.contagens(),
+                                                 limite=CONFIG["drill_size"],
+                                                 max_palavras=CONFIG["drill_max_words"])
+        if not fila:
+            QMessageBox.information(self, about.__program_name__, CONFIG["msg_drill_empty"])
+            return
+
+        self.prefetch_tts.cancelar()
+        self.motor_reproducao.parar()
+        self.cancelar_gravacao()
+        self.fila_treino = fila
+        self.posicao_treino = 0
+        self.acertos_treino = 0
+        self.palavras_treino = 0
+        self.btn_treino.setText(CONFIG["button_drill_stop"])
+        self.label_progresso.setText(CONFIG["label_drill_progress"])
+        self.progress.setMaximum(len(fila))
+        self.mostrar_frase_atual()
+
+    def avaliar_treino(self, frase, resultado, credito):
+        # Erros contam mais um; palavras da lista lidas certo contam um a menos
+        self.model_palavras.adicionar(sorted(resultado.faltantes))
+        self.model_palavras.descontar(sorted(frase.conjunto - resultado.faltantes))
+        self.acertos_treino += credito
+        self.palavras_treino += resultado.total
+
+        self.posicao_treino += 1
+        if self.posicao_treino < len(self.fila_treino):
+            self.mostrar_frase_atual()
+            return
+
+        precisao = (self.acertos_treino / self.palavras_treino) * 100 if self.palavras_treino else 0
+        QMessageBox.information(self, about.__program_name__,
+                                CONFIG["drill_final_message"].format(value=precisao))
+        self.encerrar_treino()
+
+    def encerrar_treino(self):
+        """Volta ao texto aberto, na frase em que ele parou."""
+        self.prefetch_tts.cancelar()
+        self.motor_reproducao.parar()
+        self.cancelar_gravacao()
+        self.limpar_treino()
+        self.progress.setMaximum(len(self.frases))
+        self.mostrar_frase_atual()
+
+    def limpar_treino(self):
+        self.fila_treino = []
+        self.posicao_treino = 0
+        self.btn_treino.setText(CONFIG["button_drill"])
+        self.label_progresso.setText(CONFIG["label_progress"])
+
+    def mostrar_frase_atual(self):
+        ativo = bool(self.fila_treino) or self.index_frase < len(self.frases)
+        self.progress.setValue(self.posicao_treino if self.fila_treino else self.index_frase)
+        self.visao_transcricao.limpar()
+        if ativo:
+            self.text_frase.setText(self.frase_atual().texto)
+            self.agendar_prefetch_tts()
+        else:
+            self.text_frase.clear()
+        self.habilitar_navegacao(ativo)
+
+    def habilitar_navegacao(self, ativo):
+        self.btn_tts.setEnabled(ativo)
+        self.btn_pre_renderizar.setEnabled(ativo)
+        self.btn_gravar.setEnabled(ativo)
+        self.btn_parar.setEnabled(ativo)
+        self.btn_ouvir.setEnabled(ativo)
+        self.btn_avaliar.setEnabled(ativo)
 
     def salvar_palavras_erradas(self):
-        if not self.palavras_erradas:
+        if not self.model_palavras:
             return
         
         caminho, _ = QFileDialog.getSaveFileName(
@@ -614,24 +1456,101 @@ class SpeechReadingTrainer(QMainWindow):
         )
 
         if caminho:
-            with open(caminho, "w", encoding="utf-8") as f:
-                for palavra in sorted(self.palavras_erradas):
-                    f.write(palavra + "\n")
+            self.model_palavras.salvar_lista(caminho)
+
+    def closeEvent(self, event):
+        if self.timer_velocidade.isActive():
+            self.salvar_velocidade_tts()
+        self.cancelar_gravacao()
+        self.servico_captura.encerrar()
+        self.prefetch_tts.encerrar()
+        self.agendador.encerrar()
+        # O encerramento descarta gravações pendentes: a última é refeita aqui
+        if self.posicao_pendente is not None:
+            frases, posicao = self.posicao_pendente
+            frases.salvar_posicao(posicao)
+        self.motor_reproducao.encerrar()
+        if self.lexico is not None:
+            self.lexico.close()
+        self.registro.encerrar()
+        self.biblioteca.close()
+        for frases in self.textos_carregados.values():
+            frases.close()
+        self.model_palavras.fechar()
+        if CONFIG["latency_export_path"]:
+            try:
+                MEDIDOR.exportar(CONFIG["latency_export_path"], CONFIG["latency_export_format"])
+            except (OSError, ValueError) as e:
+                print(f"Could not export the latency report: {e}")
+        super().closeEvent(event)
 
     def atualizar_acuracia(self):
         perc = (self.total_acertos / self.total_palavras) * 100 if self.total_palavras else 0
         self.label_acuracia.setText(f"Current Accuracy: {perc:.2f}%")
 
+# ==========================
+# Perfil da inicialização
+# ==========================
+
+# Módulos que não devem ser carregados antes de a janela aparecer
+MODULOS_PESADOS = ("numpy", "speech_recognition", "pydub", "gtts", "miniaudio")
+
+class PerfilInicializacao:
+    """
+    Duração de cada etapa da inicialização, desde o início da importação
+    deste módulo, para --profile-startup.
+    """
+    def __init__(self, inicio=_INICIO):
+        self.inicio = inicio
+        self.etapas = []
+        self._anterior = inicio
+
+    def marcar(self, etapa):
+        agora = time.perf_counter()
+        self.etapas.append((etapa, agora - self._anterior))
+        self._anterior = agora
+
+    @property
+    def total(self):
+        return self._anterior - self.inicio
+
+    def relatorio(self, alvo_ms=300):
+        linhas = ["Startup profile:"]
+        for etapa, duracao in self.etapas:
+            linhas.append(f"  {etapa:<20} {duracao * 1000:8.1f} ms")
+        total_ms = self.total * 1000
+        situacao = "OK" if total_ms <= alvo_ms else "SLOW"
+        linhas.append(f"  {'total':<20} {total_ms:8.1f} ms  (target {alvo_ms} ms: {situacao})")
+        carregados = [m for m in MODULOS_PESADOS if m in sys.modules]
+        linhas.append("  heavy modules loaded: " + (", ".join(carregados) or "none"))
+        return "\n".join(linhas)
+
 # ==========================
 # Executar aplicação
 # ==========================
 def main():
     signal.signal(signal.SIGINT, signal.SIG_DFL)
-    
+
+    # Subcomandos sem interface gráfica
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        from speech_reading_trainer import batch
+        sys.exit(batch.main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == "benchmark":
+        from speech_reading_trainer import benchmark
+        sys.exit(benchmark.main(sys.argv[2:]))
+
+    perfil = PerfilInicializacao()
+    perfil.marcar("imports")
+
+    carregar_config()
+    perfil.marcar("config")
+
+    # Só escrevem (e só chamam update-desktop-database) se algo mudou
     create_desktop_directory()    
     create_desktop_menu()
     create_desktop_file(os.path.join("~",".local","share","applications"), 
                         program_name=about.__program_name__)
+    perfil.marcar("desktop integration")
     
     for n in range(len(sys.argv)):
         if sys.argv[n] == "--autostart":
@@ -652,9 +1571,21 @@ def main():
     
     app = QApplication(sys.argv)
     app.setApplicationName(about.__package__)
+    perfil.marcar("QApplication")
 
     janela = SpeechReadingTrainer()
+    perfil.marcar("main window")
     janela.show()
+    perfil.marcar("show")
+
+    if "--profile-startup" in sys.argv:
+        def encerrar_perfil():
+            # Primeira volta do laço de eventos: a janela já foi exposta
+            perfil.marcar("first event loop")
+            print(perfil.relatorio(), file=sys.stderr)
+            janela.close()
+            app.quit()
+        QTimer.singleShot(0, encerrar_perfil)
 
     sys.exit(app.exec_())
     
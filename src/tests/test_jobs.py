@@ -0,0 +1,131 @@
+#!/usr/bin/python3
+"""
+Agendador de tarefas: ordem por prioridade dentro de um grupo limitado,
+cancelamento de tarefas pendentes, em execução e de grupos inteiros, e
+entrega das falhas.
+"""
+import time
+import threading
+import unittest
+
+from PyQt5.QtCore import QCoreApplication
+
+from speech_reading_trainer.modules.jobs import AgendadorTarefas, TokenCancelamento
+
+_app = QCoreApplication.instance() or QCoreApplication([])
+
+
+def _processar_ate(condicao, timeout=5.0):
+    """Processa eventos do Qt (os sinais das tarefas) até condicao() valer."""
+    limite = time.monotonic() + timeout
+    while not condicao():
+        if time.monotonic() > limite:
+            return False
+        _app.processEvents()
+        time.sleep(0.005)
+    return True
+
+
+class TestAgendadorTarefas(unittest.TestCase):
+
+    def setUp(self):
+        self.agendador = AgendadorTarefas(max_threads=4, limites={"g": 1})
+        self.liberar = threading.Event()
+        self.eventos = []
+
+    def tearDown(self):
+        self.liberar.set()
+        self.agendador.encerrar()
+
+    def bloquear(self):
+        self.liberar.wait(5)
+        return "bloqueio"
+
+    def registrar(self, nome):
+        self.eventos.append(nome)
+        return nome
+
+    def test_prioridade_dentro_do_grupo(self):
+        bloqueio = self.agendador.submeter(self.bloquear, grupo="g")
+        concluidas = []
+        for nome, prioridade in (("baixa1", 0), ("alta", 10), ("baixa2", 0)):
+            self.agendador.submeter(self.registrar, nome, prioridade=prioridade, grupo="g",
+                                    ao_concluir=concluidas.append)
+        self.liberar.set()
+
+        self.assertTrue(_processar_ate(lambda: len(concluidas) == 3))
+        self.assertTrue(bloqueio.terminou())
+        self.assertEqual(self.eventos, ["alta", "baixa1", "baixa2"])
+        self.assertEqual(concluidas, ["alta", "baixa1", "baixa2"])
+
+    def test_cancelar_pendente(self):
+        self.agendador.submeter(self.bloquear, grupo="g")
+        canceladas = []
+        tarefa = self.agendador.submeter(self.registrar, "pendente", grupo="g",
+                                         ao_cancelar=lambda: canceladas.append(True))
+        self.assertTrue(tarefa.cancelar())
+        depois = self.agendador.submeter(self.registrar, "depois", grupo="g")
+        self.liberar.set()
+
+        self.assertTrue(depois.esperar(5))
+        self.assertTrue(_processar_ate(lambda: canceladas))
+        self.assertTrue(tarefa.terminou())
+        self.assertEqual(self.eventos, ["depois"])
+
+    def test_cancelar_em_execucao(self):
+        comecou = threading.Event()
+        resultados = []
+
+        def trabalhar(token):
+            comecou.set()
+            while True:
+                token.verificar()
+                time.sleep(0.005)
+
+        token = TokenCancelamento()
+        tarefa = self.agendador.submeter(
+            trabalhar, token, token=token,
+            ao_concluir=lambda r: resultados.append("concluida"),
+            ao_falhar=lambda e: resultados.append("falhou"),
+            ao_cancelar=lambda: resultados.append("cancelada"))
+        self.assertTrue(comecou.wait(5))
+        # Já rodando: não sai da fila, só o token é marcado
+        self.assertFalse(tarefa.cancelar())
+
+        self.assertTrue(_processar_ate(lambda: resultados))
+        self.assertEqual(resultados, ["cancelada"])
+
+    def test_cancelar_grupo(self):
+        canceladas = []
+        for _ in range(3):
+            self.agendador.submeter(self.bloquear, grupo="g",
+                                    ao_cancelar=lambda: canceladas.append(True))
+        outra = self.agendador.submeter(self.registrar, "fora", grupo="h")
+        self.agendador.cancelar_grupo("g")
+        self.liberar.set()
+
+        self.assertTrue(_processar_ate(lambda: len(canceladas) == 3))
+        self.assertTrue(outra.esperar(5))
+        self.assertEqual(self.eventos, ["fora"])
+
+    def test_excecao_chega_em_ao_falhar(self):
+        erros = []
+
+        def falhar():
+            raise ValueError("bad input")
+
+        self.agendador.submeter(falhar, ao_falhar=erros.append,
+                                ao_concluir=lambda r: self.fail("concluída"))
+        self.assertTrue(_processar_ate(lambda: erros))
+        self.assertIsInstance(erros[0], ValueError)
+
+    def test_encerrado_nao_executa(self):
+        self.agendador.encerrar()
+        tarefa = self.agendador.submeter(self.registrar, "tarde")
+        self.assertTrue(tarefa.terminou())
+        self.assertTrue(tarefa.token.cancelado)
+        self.assertEqual(self.eventos, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+#!/usr/bin/python3
+"""
+Crédito parcial por pronúncia: o léxico compilado de um dicionário no
+formato do CMUdict e credito_fonetico sobre o alinhamento.
+"""
+import os
+import tempfile
+import unittest
+
+from speech_reading_trainer.modules.pronunciation import (
+    SIMILARIDADE_MINIMA, abrir_lexico, credito_fonetico
+)
+from speech_reading_trainer.modules.scoring import alinhar
+
+_DICIONARIO = """;;; teste
+BIG  B IH1 G
+PIN  P IH1 N
+LEAVES  L IY1 V Z
+LEAFS  L IY1 F S
+CAT  K AE1 T
+DOG  D AO1 G
+SUN  S AH1 N
+MOON  M UW1 N
+READ  R EH1 D
+READ(2)  R IY1 D
+RED  R EH1 D
+"""
+
+
+class TestCreditoFonetico(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pasta = tempfile.TemporaryDirectory()
+        caminho = os.path.join(cls.pasta.name, "cmudict.dict")
+        with open(caminho, "w", encoding="latin-1") as f:
+            f.write(_DICIONARIO)
+        cls.lexico = abrir_lexico(caminho, os.path.join(cls.pasta.name, "index"))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.lexico.close()
+        cls.pasta.cleanup()
+
+    def credito(self, original, transcrito, **kwargs):
+        return credito_fonetico(alinhar(original, transcrito), self.lexico, **kwargs)
+
+    def test_leitura_perfeita_vale_os_acertos(self):
+        self.assertEqual(self.credito("the big cat", "the big cat"), (3.0, []))
+
+    def test_quase_acerto_recebe_credito_parcial(self):
+        credito, quase = self.credito("falling leaves", "falling leafs")
+        self.assertAlmostEqual(credito, 1.75)
+        self.assertEqual(quase, [("leaves", "leafs", 0.75)])
+
+    def test_homofono_vale_um_acerto(self):
+        credito, quase = self.credito("I read it", "I red it")
+        self.assertAlmostEqual(credito, 3.0)
+        self.assertEqual([(o, t) for o, t, _ in quase], [("read", "red")])
+
+    def test_abaixo_da_similaridade_minima_nao_ha_credito(self):
+        self.assertEqual(self.credito("big", "pin"), (0.0, []))
+        self.assertEqual(self.credito("sun", "moon"), (0.0, []))
+        self.assertEqual(self.credito("cat", "dog"), (0.0, []))
+
+    def test_minima_configuravel(self):
+        self.assertGreater(SIMILARIDADE_MINIMA, 0.5)
+        credito, quase = self.credito("big", "pin", minima=0.5)
+        self.assertAlmostEqual(credito, 0.5)
+        self.assertEqual(len(quase), 1)
+
+    def test_palavra_fora_do_lexico_nao_recebe_credito(self):
+        self.assertEqual(self.credito("big cat", "big kat"), (1.0, []))
+
+    def test_insercoes_e_delecoes_nao_recebem_credito(self):
+        self.assertEqual(self.credito("big cat", "big"), (1.0, []))
+        self.assertEqual(self.credito("big", "big cat"), (1.0, []))
+
+    def test_indice_reaproveitado(self):
+        caminho = os.path.join(self.pasta.name, "cmudict.dict")
+        outro = abrir_lexico(caminho, os.path.join(self.pasta.name, "index"))
+        try:
+            self.assertIn("leaves", outro)
+            self.assertEqual(outro.similaridade("leaves", "leafs"), 0.75)
+        finally:
+            outro.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+#!/usr/bin/python3
+"""
+Alinhamento palavra a palavra entre a frase e a transcrição: contagens,
+palavras faltantes, spans coloridos e a precisão.
+"""
+import random
+import unittest
+
+from speech_reading_trainer.modules.scoring import (
+    ACERTO, SUBSTITUICAO, INSERCAO, DELECAO,
+    alinhar, _matriz_numpy, _matriz_python, _operacoes
+)
+from speech_reading_trainer.modules.sentences import Frase
+
+
+class TestAlinhar(unittest.TestCase):
+
+    def test_leitura_perfeita(self):
+        resultado = alinhar("The cat sat on the mat.", "the cat sat on the mat")
+        self.assertEqual(resultado.acertos, 6)
+        self.assertEqual(resultado.distancia, 0)
+        self.assertEqual(resultado.faltantes, set())
+        self.assertEqual(resultado.precisao, 1.0)
+        self.assertTrue(all(tipo == ACERTO for tipo, _, _ in resultado.operacoes))
+
+    def test_pontuacao_e_maiusculas_sao_ignoradas(self):
+        resultado = alinhar("Hello, World!", "hello world")
+        self.assertEqual(resultado.precisao, 1.0)
+
+    def test_insercao_reduz_a_precisao(self):
+        resultado = alinhar("the cat sat on the mat", "the cat sat on the the mat")
+        self.assertEqual(resultado.acertos, 6)
+        self.assertEqual(resultado.insercoes, 1)
+        self.assertEqual(resultado.faltantes, set())
+        self.assertEqual(resultado.total_pontuado, 7)
+        self.assertAlmostEqual(resultado.precisao, 6 / 7)
+
+    def test_delecao_vira_palavra_faltante(self):
+        resultado = alinhar("the cat sat", "the sat")
+        self.assertEqual(resultado.delecoes, 1)
+        self.assertEqual(resultado.faltantes, {"cat"})
+        self.assertIn((DELECAO, 1, -1), resultado.operacoes)
+        self.assertAlmostEqual(resultado.precisao, 2 / 3)
+
+    def test_substituicao_e_spans(self):
+        resultado = alinhar("the cat sat", "the dog sat")
+        self.assertEqual(resultado.substituicoes, 1)
+        self.assertEqual(resultado.faltantes, {"cat"})
+        self.assertEqual(resultado.spans, [("the", True), ("dog", False), ("sat", True)])
+
+    def test_spans_mantem_as_palavras_originais_da_transcricao(self):
+        resultado = alinhar("one two", "One, - two!")
+        self.assertEqual(resultado.spans, [("One,", True), ("-", False), ("two!", True)])
+
+    def test_frase_vazia(self):
+        resultado = alinhar("", "something")
+        self.assertEqual(resultado.total, 0)
+        self.assertEqual(resultado.insercoes, 1)
+        self.assertEqual(resultado.precisao, 0.0)
+
+    def test_frase_compilada(self):
+        texto = "She sells sea shells, by the sea shore."
+        transcricao = "she sells see shells by the shore"
+        direto = alinhar(texto, transcricao)
+        compilado = alinhar(Frase(texto), transcricao)
+        self.assertEqual(compilado.operacoes, direto.operacoes)
+        self.assertEqual(compilado.faltantes, direto.faltantes)
+
+    def test_numpy_igual_ao_python(self):
+        rng = random.Random(7)
+        vocabulario = ["a", "b", "c", "d", "e"]
+        for _ in range(200):
+            a = [rng.choice(vocabulario) for _ in range(rng.randint(0, 40))]
+            b = [rng.choice(vocabulario) for _ in range(rng.randint(0, 40))]
+            python = _matriz_python(a, b)
+            numpy = _matriz_numpy(a, b)
+            self.assertEqual(_operacoes(a, b, numpy), _operacoes(a, b, python))
+
+    def test_operacoes_cobrem_as_duas_sequencias(self):
+        resultado = alinhar("a b c d e f", "a x c e f g")
+        originais = sorted(i for tipo, i, _ in resultado.operacoes if tipo != INSERCAO)
+        transcritas = sorted(j for tipo, _, j in resultado.operacoes if tipo != DELECAO)
+        self.assertEqual(originais, list(range(6)))
+        self.assertEqual(transcritas, list(range(6)))
+        self.assertEqual(resultado.acertos + resultado.substituicoes + resultado.delecoes,
+                         resultado.total)
+        self.assertIn(SUBSTITUICAO, {tipo for tipo, _, _ in resultado.operacoes})
+
+
+if __name__ == "__main__":
+    unittest.main()
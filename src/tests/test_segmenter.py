@@ -0,0 +1,119 @@
+#!/usr/bin/python3
+"""
+O segmentador de uma passada deve produzir exatamente as mesmas frases
+que o antigo ler_e_separar_texto recursivo, copiado abaixo sem mudanças
+(exceto por receber o texto em vez do caminho).
+"""
+import os
+import random
+import tempfile
+import unittest
+
+from speech_reading_trainer.modules.segmenter import ler_blocos, segmentar_blocos
+
+
+def separar_texto_antigo(texto, tamanho_maximo=125, separadores=None):
+    if separadores is None:
+        separadores = ["\n\n", ".", ";", ",", "?"]
+
+    def separar_por(texto, sep_list):
+        if not sep_list:
+            return [texto.strip()]
+        sep = sep_list[0]
+        partes = texto.split(sep)
+        resultado = []
+        for i, parte in enumerate(partes):
+            if i < len(partes) - 1:
+                parte = parte.strip() + sep
+            else:
+                parte = parte.strip()
+            resultado.extend(separar_por(parte, sep_list[1:]))
+        return [r for r in resultado if r]
+
+    frases_iniciais = separar_por(texto, separadores)
+    frases_final = []
+
+    for frase in frases_iniciais:
+        frase = frase.replace("\n", " ").strip()
+        if len(frase) <= tamanho_maximo:
+            frases_final.append(frase)
+        else:
+            partes_virgula = [p.strip() + ("," if i < len(frase.split(",")) - 1 else "")
+                               for i, p in enumerate(frase.split(",")) if p.strip()]
+            for pv in partes_virgula:
+                if len(pv) <= tamanho_maximo:
+                    frases_final.append(pv)
+                else:
+                    palavras = pv.split()
+                    temp = ""
+                    for p in palavras:
+                        if len(temp) + len(p) + 1 <= tamanho_maximo:
+                            temp += (" " if temp else "") + p
+                        else:
+                            frases_final.append(temp)
+                            temp = p
+                    if temp:
+                        frases_final.append(temp)
+    return frases_final
+
+
+_PEDACOS = ["a", "bc", "def", "word", "Lorem", "ipsumdolorsitamet", " ", " ", "  ",
+            "\n", "\n\n", "\n\n\n", ".", "..", ";", ",", "?", "!", "\t", "é", " "]
+
+
+def texto_aleatorio(rng):
+    return "".join(rng.choice(_PEDACOS) for _ in range(rng.randint(0, 120)))
+
+
+def em_blocos(texto, tamanho):
+    return [texto[i:i + tamanho] for i in range(0, len(texto), tamanho)]
+
+
+def frases_novas(blocos, tamanho_maximo, separadores=None):
+    return [frase for _, _, frase in segmentar_blocos(blocos, tamanho_maximo, separadores)]
+
+
+class TestEquivalenciaSegmentador(unittest.TestCase):
+
+    def test_textos_aleatorios(self):
+        rng = random.Random(1234)
+        for _ in range(5000):
+            texto = texto_aleatorio(rng)
+            tamanho_maximo = rng.choice((1, 3, 8, 20, 125))
+            tamanho_bloco = rng.choice((1, 2, 3, 7, 64, 1 << 20))
+            esperado = separar_texto_antigo(texto, tamanho_maximo)
+            obtido = frases_novas(em_blocos(texto, tamanho_bloco), tamanho_maximo)
+            self.assertEqual(obtido, esperado,
+                             f"texto={texto!r} max={tamanho_maximo} bloco={tamanho_bloco}")
+
+    def test_separadores_personalizados(self):
+        rng = random.Random(99)
+        for separadores in (["\n\n"], [".", "?"], [";"]):
+            for _ in range(500):
+                texto = texto_aleatorio(rng)
+                esperado = separar_texto_antigo(texto, 20, separadores)
+                obtido = frases_novas(em_blocos(texto, rng.choice((1, 5, 64))), 20, separadores)
+                self.assertEqual(obtido, esperado, f"texto={texto!r} separadores={separadores!r}")
+
+    def test_arquivo_de_exemplo(self):
+        caminho = os.path.join(os.path.dirname(__file__), "..", "..", "data", "example1.txt")
+        if not os.path.exists(caminho):
+            self.skipTest("data/example1.txt not found")
+        with open(caminho, "r", encoding="utf-8") as f:
+            texto = f.read()
+        for tamanho_bloco in (17, 4096):
+            self.assertEqual(frases_novas(ler_blocos(caminho, tamanho_bloco), 125),
+                             separar_texto_antigo(texto))
+
+    def test_ler_blocos(self):
+        texto = "First line.\n\nSecond; third, fourth? " * 50
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, "texto.txt")
+            with open(caminho, "w", encoding="utf-8") as f:
+                f.write(texto)
+            self.assertEqual(frases_novas(ler_blocos(caminho, 10), 125),
+                             separar_texto_antigo(texto))
+
+
+if __name__ == "__main__":
+    unittest.main()
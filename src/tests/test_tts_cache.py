@@ -0,0 +1,139 @@
+#!/usr/bin/python3
+"""
+Cache de áudios TTS: uma síntese por texto em qualquer velocidade, só a
+velocidade normal no disco, descarte LRU do disco e pedidos simultâneos
+do mesmo áudio resolvidos por uma única síntese.
+"""
+import os
+import time
+import tempfile
+import threading
+import unittest
+
+from pydub import AudioSegment
+
+from speech_reading_trainer.modules.tts_cache import CacheTTS, chave_tts
+
+
+def _audio(n_amostras, valor=1):
+    return AudioSegment(data=valor.to_bytes(2, "little", signed=True) * n_amostras,
+                        sample_width=2, frame_rate=16000, channels=1)
+
+
+class Sintetizador:
+    """Conta as chamadas; `espera` segura cada síntese para simular a rede."""
+    def __init__(self, n_amostras=1600, espera=0.0):
+        self.n_amostras = n_amostras
+        self.espera = espera
+        self.chamadas = []
+        self._lock = threading.Lock()
+
+    def __call__(self, texto, idioma):
+        with self._lock:
+            self.chamadas.append((texto, idioma))
+        time.sleep(self.espera)
+        return _audio(self.n_amostras)
+
+
+def _alongar(audio, fator):
+    return _audio(int(len(audio.raw_data) // 2 / fator), valor=2)
+
+
+class TestCacheTTS(unittest.TestCase):
+
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.pasta.cleanup()
+
+    def wavs(self):
+        return sorted(nome for nome in os.listdir(self.pasta.name) if nome.endswith(".wav"))
+
+    def test_uma_sintese_para_todas_as_velocidades(self):
+        cache = CacheTTS(self.pasta.name, backend="fake")
+        sintetizar = Sintetizador()
+        normal = cache.obter_ou_sintetizar("hello", "en", 1.0, sintetizar, _alongar)
+        lento = cache.obter_ou_sintetizar("hello", "en", 0.5, sintetizar, _alongar)
+        de_novo = cache.obter_ou_sintetizar("hello", "en", 0.5, sintetizar, _alongar)
+
+        self.assertEqual(sintetizar.chamadas, [("hello", "en")])
+        self.assertEqual(len(lento.raw_data), 2 * len(normal.raw_data))
+        self.assertIs(de_novo, lento)
+
+    def test_so_a_velocidade_normal_vai_para_o_disco(self):
+        cache = CacheTTS(self.pasta.name, backend="fake")
+        sintetizar = Sintetizador()
+        cache.obter_ou_sintetizar("hello", "en", 0.75, sintetizar, _alongar)
+        self.assertEqual(self.wavs(), [chave_tts("hello", "en", 1.0, "fake") + ".wav"])
+
+        # Outra instância (nova execução) acha a velocidade normal no disco
+        outro = CacheTTS(self.pasta.name, backend="fake")
+        self.assertTrue(outro.contem("hello", "en", 1.0))
+        self.assertFalse(outro.contem("hello", "en", 0.75))
+        self.assertEqual(outro.obter("hello", "en", 1.0).raw_data, _audio(1600).raw_data)
+        outro.obter_ou_sintetizar("hello", "en", 0.75, sintetizar, _alongar)
+        self.assertEqual(len(sintetizar.chamadas), 1)
+
+    def test_backend_faz_parte_da_chave(self):
+        CacheTTS(self.pasta.name, backend="gtts").guardar("hello", "en", 1.0, _audio(10))
+        self.assertFalse(CacheTTS(self.pasta.name, backend="espeak").contem("hello", "en", 1.0))
+
+    def test_descarte_lru_no_disco(self):
+        cache = CacheTTS(self.pasta.name, backend="fake")
+        cache.guardar("a", "en", 1.0, _audio(1600))
+        tamanho = os.path.getsize(cache._caminho(chave_tts("a", "en", 1.0, "fake")))
+
+        cache = CacheTTS(self.pasta.name, limite_disco=2 * tamanho, backend="fake")
+        cache.guardar("b", "en", 1.0, _audio(1600))
+        # Ler "a" do disco faz de "b" o menos usado
+        time.sleep(0.01)
+        self.assertIsNotNone(cache.obter("a", "en", 1.0))
+        cache.guardar("c", "en", 1.0, _audio(1600))
+
+        self.assertEqual(self.wavs(), sorted(chave_tts(t, "en", 1.0, "fake") + ".wav"
+                                             for t in ("a", "c")))
+        self.assertEqual(CacheTTS(self.pasta.name, backend="fake")._bytes_disco, 2 * tamanho)
+
+    def test_descarte_lru_na_memoria(self):
+        tamanho = len(_audio(1600).raw_data)
+        cache = CacheTTS(self.pasta.name, limite_memoria=2 * tamanho, backend="fake")
+        for texto in ("a", "b", "c"):
+            cache.guardar(texto, "en", 0.5, _audio(1600))
+        self.assertFalse(cache.contem("a", "en", 0.5))
+        self.assertTrue(cache.contem("b", "en", 0.5))
+        self.assertTrue(cache.contem("c", "en", 0.5))
+
+    def test_pedidos_simultaneos_sintetizam_uma_vez(self):
+        cache = CacheTTS(self.pasta.name, backend="fake")
+        sintetizar = Sintetizador(espera=0.2)
+        resultados = []
+
+        def pedir():
+            resultados.append(cache.obter_ou_sintetizar("hello", "en", 1.0, sintetizar))
+
+        threads = [threading.Thread(target=pedir) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(sintetizar.chamadas), 1)
+        self.assertEqual(len(resultados), 8)
+        self.assertTrue(all(r.raw_data == resultados[0].raw_data for r in resultados))
+
+    def test_falha_na_sintese_libera_os_outros_pedidos(self):
+        cache = CacheTTS(self.pasta.name, backend="fake")
+
+        def falhar(texto, idioma):
+            raise RuntimeError("offline")
+
+        with self.assertRaises(RuntimeError):
+            cache.obter_ou_sintetizar("hello", "en", 1.0, falhar)
+        sintetizar = Sintetizador()
+        cache.obter_ou_sintetizar("hello", "en", 1.0, sintetizar)
+        self.assertEqual(len(sintetizar.chamadas), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
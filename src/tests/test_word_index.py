@@ -0,0 +1,114 @@
+#!/usr/bin/python3
+"""
+Índice invertido de palavras: o arquivo gravado por
+ConstrutorIndicePalavras e a fila de treino de IndiceInvertido.
+"""
+import os
+import tempfile
+import unittest
+
+from speech_reading_trainer.modules.word_index import (
+    ConstrutorIndicePalavras, IndicePalavras, IndiceInvertido
+)
+
+_TEXTO_A = [
+    "the cat sat",
+    "a dog ran",
+    "the dog and the cat",
+    "nothing here",
+    "cat",
+]
+_TEXTO_B = [
+    "dog days",
+    "the cat again",
+]
+
+
+class TestIndiceInvertido(unittest.TestCase):
+
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        self.indices = []
+        self.invertido = IndiceInvertido()
+
+    def tearDown(self):
+        for indice in self.indices:
+            indice.close()
+        self.pasta.cleanup()
+
+    def abrir(self, chave, frases):
+        construtor = ConstrutorIndicePalavras()
+        for numero, frase in enumerate(frases):
+            construtor.adicionar(numero, frase.split())
+        caminho = os.path.join(self.pasta.name, chave + ".words")
+        construtor.gravar(caminho)
+        indice = IndicePalavras(caminho)
+        self.indices.append(indice)
+        self.invertido.adicionar(chave, indice, len(frases))
+        return indice
+
+    def fila(self, contagens, **kwargs):
+        return [(item.chave, item.numero, item.pontuacao)
+                for item in self.invertido.fila_treino(contagens, **kwargs)]
+
+    def test_indice_gravado(self):
+        indice = self.abrir("a", _TEXTO_A)
+        self.assertIn("cat", indice)
+        self.assertNotIn("bird", indice)
+        self.assertEqual(list(indice.frases_com("cat")), [0, 2, 4])
+        self.assertEqual(list(indice.frases_com("the")), [0, 2])
+        self.assertEqual(list(indice.frases_com("bird")), [])
+        self.assertEqual(list(indice.frases_com_numpy("dog")), [1, 2])
+
+    def test_arquivo_invalido(self):
+        caminho = os.path.join(self.pasta.name, "invalido.words")
+        with open(caminho, "wb") as f:
+            f.write(b"\0" * 64)
+        with self.assertRaises(ValueError):
+            IndicePalavras(caminho)
+
+    def test_frases_com_em_varios_textos(self):
+        self.abrir("a", _TEXTO_A)
+        self.abrir("b", _TEXTO_B)
+        self.assertEqual(self.invertido.frases_com("dog"), [("a", 1), ("a", 2), ("b", 0)])
+        self.assertEqual(len(self.invertido), 2)
+        self.invertido.remover("a")
+        self.assertNotIn("a", self.invertido)
+        self.assertEqual(self.invertido.frases_com("dog"), [("b", 0)])
+
+    def test_pontuacao_e_a_soma_dos_erros(self):
+        self.abrir("a", _TEXTO_A)
+        self.assertEqual(self.fila({"cat": 2, "dog": 3}),
+                         [("a", 2, 5.0), ("a", 1, 3.0), ("a", 0, 2.0), ("a", 4, 2.0)])
+
+    def test_empates_ficam_na_ordem_do_texto(self):
+        self.abrir("a", _TEXTO_A)
+        self.abrir("b", _TEXTO_B)
+        self.assertEqual(self.fila({"cat": 1}),
+                         [("a", 0, 1.0), ("a", 2, 1.0), ("a", 4, 1.0), ("b", 1, 1.0)])
+
+    def test_limite(self):
+        self.abrir("a", _TEXTO_A)
+        self.abrir("b", _TEXTO_B)
+        self.assertEqual(self.fila({"cat": 1}, limite=2), [("a", 0, 1.0), ("a", 2, 1.0)])
+        self.assertEqual(self.fila({"cat": 1, "the": 1}, limite=1), [("a", 0, 2.0)])
+        self.assertEqual(self.fila({"cat": 1}, limite=0), [])
+
+    def test_max_palavras_considera_as_mais_erradas(self):
+        self.abrir("a", _TEXTO_A)
+        self.assertEqual(self.fila({"cat": 1, "dog": 5}, max_palavras=1),
+                         [("a", 1, 5.0), ("a", 2, 5.0)])
+
+    def test_contagens_zeradas_e_palavras_desconhecidas(self):
+        self.abrir("a", _TEXTO_A)
+        self.assertEqual(self.fila({"cat": 0, "bird": 4}), [])
+        self.assertEqual(self.fila({}), [])
+
+    def test_texto_sem_frases(self):
+        self.abrir("vazio", [])
+        self.abrir("a", _TEXTO_A)
+        self.assertEqual(self.fila({"dog": 1}), [("a", 1, 1.0), ("a", 2, 1.0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -49,7 +49,9 @@ dependencies = [
     "SpeechRecognition",
     "gTTS",
     "pydub",
-    "PyAudio"
+    "PyAudio",
+    "numpy",
+    "miniaudio"
 ]
 
 [project.urls]